@@ -0,0 +1,56 @@
+"""
+Benchmark de latence de AIAnalyticsService.analyze_workout sur des historiques longs
+(historique déjà chronologique et historique envoyé dans le désordre)
+Lancement : python -m benchmarks.bench_analyze_workout
+"""
+import time
+import asyncio
+import numpy as np
+
+from models.workout_frame import WorkoutFrame
+from services.ai_analytics import AIAnalyticsService
+
+HISTORY_SIZES = [100, 1_000, 10_000, 100_000]
+WORKOUT_TYPE_VALUES = ["course", "fractionné", "endurance", "récupération"]
+
+
+def build_frame(count: int, shuffled: bool) -> WorkoutFrame:
+    """Historique synthétique : une séance par jour jusqu'à aujourd'hui"""
+    rng = np.random.default_rng(7)
+    timestamp = np.datetime64("now", "s") - np.arange(count)[::-1] * np.timedelta64(1, "D")
+    if shuffled:
+        # La séance analysée reste la dernière envoyée
+        timestamp[:-1] = rng.permutation(timestamp[:-1])
+
+    return WorkoutFrame.from_columns({
+        "id": [f"workout_{i}" for i in range(count)],
+        "timestamp": timestamp,
+        "type": rng.choice(WORKOUT_TYPE_VALUES, count),
+        "duration": rng.integers(20, 120, count),
+        "distance": np.round(rng.uniform(3, 25, count), 2),
+        "pace_seconds": rng.integers(210, 420, count),
+        "heart_rate": rng.integers(120, 185, count),
+    })
+
+
+def timed(func, repeat: int = 50) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return float(np.median(timings))
+
+
+if __name__ == "__main__":
+    service = AIAnalyticsService()
+    loop = asyncio.new_event_loop()
+
+    for count in HISTORY_SIZES:
+        for shuffled in (False, True):
+            frame = build_frame(count, shuffled)
+            latency = timed(lambda: loop.run_until_complete(service.analyze_workout(frame)))
+            label = "désordonné" if shuffled else "chronologique"
+            print(f"{count:>8} séances {label:<14} médiane {latency * 1e6:9.1f} µs")
+
+    loop.close()
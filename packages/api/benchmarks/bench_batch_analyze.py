@@ -0,0 +1,59 @@
+"""
+Benchmark de débit de BatchAnalysisService : athlètes analysés par seconde selon le nombre de workers
+(référence : boucle séquentielle dans le processus courant)
+Lancement : python -m benchmarks.bench_batch_analyze [athlètes] [séances par athlète]
+"""
+import os
+import sys
+import time
+import asyncio
+import numpy as np
+
+from services.batch_analysis import BatchAnalysisService, BATCH_ANALYSES, _analyze_chunk
+
+DEFAULT_ATHLETES = 400
+DEFAULT_WORKOUTS = 200
+WORKOUT_TYPE_VALUES = ["course", "fractionné", "endurance", "récupération"]
+
+
+def build_history(count: int, seed: int) -> dict:
+    """Historique colonnaire synthétique : une séance par jour jusqu'à aujourd'hui"""
+    rng = np.random.default_rng(seed)
+    pace = rng.integers(210, 420, count)
+    dates = np.datetime64("now", "s") - np.arange(count)[::-1] * np.timedelta64(1, "D")
+    return {
+        "id": [f"workout_{i}" for i in range(count)],
+        "date": [f"{date}Z" for date in dates],
+        "type": rng.choice(WORKOUT_TYPE_VALUES, count).tolist(),
+        "duration": rng.integers(20, 120, count).tolist(),
+        "distance": np.round(rng.uniform(3, 25, count), 2).tolist(),
+        "pace": [f"{p // 60}:{p % 60:02d}" for p in pace.tolist()],
+        "heart_rate": rng.integers(120, 185, count).tolist(),
+    }
+
+
+if __name__ == "__main__":
+    athlete_count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ATHLETES
+    workout_count = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_WORKOUTS
+    athletes = [(f"athlete_{i}", build_history(workout_count, i)) for i in range(athlete_count)]
+    analyses = list(BATCH_ANALYSES)
+    print(f"{athlete_count} athlètes x {workout_count} séances, {len(analyses)} analyses chacun")
+
+    started = time.perf_counter()
+    _analyze_chunk(athletes, analyses)
+    baseline = athlete_count / (time.perf_counter() - started)
+    print(f"séquentiel      {baseline:8.0f} athlètes/s")
+
+    cpu_count = os.cpu_count() or 1
+    for workers in sorted({1, 2, 4, 8, cpu_count} & set(range(1, cpu_count + 1))):
+        service = BatchAnalysisService(workers)
+        # Démarrage des workers hors mesure (pool persistant en production)
+        asyncio.run(service.analyze_athletes(athletes[:workers], analyses))
+        started = time.perf_counter()
+        summary = asyncio.run(service.analyze_athletes(athletes, analyses))
+        rate = athlete_count / (time.perf_counter() - started)
+        service.shutdown()
+        print(
+            f"{workers:>2} worker(s)    {rate:8.0f} athlètes/s  (x{rate / baseline:4.2f} vs séquentiel, "
+            f"{summary['failed']} échecs)"
+        )
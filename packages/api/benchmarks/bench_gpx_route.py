@@ -0,0 +1,54 @@
+"""
+Benchmark du moteur de traces GPX : trace de 3h échantillonnée à 1s
+Lancement : python -m benchmarks.bench_gpx_route
+"""
+import time
+import numpy as np
+
+from services.gpx_route import GpxTrack
+
+DURATION_SECONDS = 3 * 3600
+
+
+def build_gpx(points: int) -> bytes:
+    """Génération d'un GPX synthétique (~3 m/s, relief sinusoïdal)"""
+    rng = np.random.default_rng(42)
+    lat = 48.85 + np.cumsum(rng.normal(2e-5, 5e-6, points))
+    lon = 2.35 + np.cumsum(rng.normal(1e-5, 5e-6, points))
+    elevation = 50 + 20 * np.sin(np.arange(points) / 600)
+    start = np.datetime64("2024-01-15T08:00:00")
+
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>',
+             '<gpx version="1.1" xmlns="http://www.topografix.com/GPX/1/1"><trk><trkseg>']
+    for i in range(points):
+        lines.append(
+            f'<trkpt lon="{lon[i]:.7f}" lat="{lat[i]:.7f}"><ele>{elevation[i]:.2f}</ele>'
+            f'<time>{start + np.timedelta64(i, "s")}Z</time></trkpt>'
+        )
+    lines.append("</trkseg></trk></gpx>")
+    return "\n".join(lines).encode()
+
+
+def timed(label: str, func, repeat: int = 20):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    print(f"{label:<28} médiane {np.median(timings) * 1000:8.2f} ms")
+    return result
+
+
+if __name__ == "__main__":
+    data = build_gpx(DURATION_SECONDS)
+    print(f"Trace: {DURATION_SECONDS} points, {len(data) / 1e6:.1f} MB")
+
+    track = timed("décodage GPX", lambda: GpxTrack.from_bytes(data))
+    timed("distances haversine", track.cumulative_distance)
+    timed("temps de passage /km", track.splits)
+    timed("temps en mouvement", track.moving_time)
+    timed("dénivelé positif", track.elevation_gain)
+    summary = timed("résumé complet", track.route_summary)
+    print(f"{summary['gps_distance']} km, {len(summary['splits'])} splits, "
+          f"D+ {summary['elevation_gain']:.0f} m, mouvement {summary['moving_time']:.0f} s")
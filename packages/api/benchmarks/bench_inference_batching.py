@@ -0,0 +1,78 @@
+"""
+Benchmark du micro-batching des inférences ML : prédictions par seconde selon la concurrence,
+sans regroupement (un predict par requête) puis avec plusieurs réglages attente / taille de lot
+Les requêtes passent par la couche d'exécution en mode thread, comme dans l'API
+Lancement : python -m benchmarks.bench_inference_batching [requêtes] [arbres]
+"""
+import sys
+import time
+import asyncio
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+
+from models.workout_codec import workout_frame_from_python
+from services.execution import ExecutionLayer
+from services.inference_batcher import InferenceBatcher
+from services.ml_predictor import MLPredictorService
+from services.model_registry import ModelSet
+from benchmarks.bench_batch_analyze import build_history
+
+DEFAULT_REQUESTS = 2000
+DEFAULT_TREES = 100
+CONCURRENCY_LEVELS = (1, 8, 32)
+# (attente max en ms, lignes max par lot) ; (0, 1) = sans regroupement
+BATCH_SETTINGS = ((0, 1), (1, 16), (2, 64), (5, 64))
+
+
+def build_service(trees: int) -> MLPredictorService:
+    """Service avec un modèle 10K entraîné sur des données synthétiques (10 features)"""
+    rng = np.random.default_rng(0)
+    features = rng.normal(size=(5000, 10))
+    target = features @ rng.normal(size=10) * 60 + 2700
+    model = RandomForestRegressor(n_estimators=trees, max_depth=10, random_state=0).fit(features, target)
+    service = MLPredictorService()
+    service.registry_poll_seconds = float("inf")
+    service.model_set = ModelSet("bench", {"10k_model": model})
+    return service
+
+
+async def run(service: MLPredictorService, execution: ExecutionLayer, history, requests: int, concurrency: int) -> float:
+    """Requêtes de prédiction 10K avec au plus `concurrency` en cours ; retourne les prédictions/s"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def predict() -> None:
+        async with semaphore:
+            await execution.run(service.predict_race_time, history, 10.0, "2030-06-01", pool="ml")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(predict() for _ in range(requests)))
+    return requests / (time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    request_count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_REQUESTS
+    tree_count = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_TREES
+    service = build_service(tree_count)
+    history = workout_frame_from_python(build_history(50, 0))
+    execution = ExecutionLayer(mode="thread", max_workers=max(CONCURRENCY_LEVELS))
+    print(f"{request_count} prédictions 10K, forêt de {tree_count} arbres, exécution thread")
+
+    for concurrency in CONCURRENCY_LEVELS:
+        baseline = None
+        for max_wait_ms, max_batch in BATCH_SETTINGS:
+            # Échauffement (threads, cache des caractéristiques) hors mesure
+            service.batcher = InferenceBatcher(max_wait_ms, max_batch)
+            asyncio.run(run(service, execution, history, concurrency, concurrency))
+            service.batcher.shutdown()
+
+            service.batcher = InferenceBatcher(max_wait_ms, max_batch)
+            rate = asyncio.run(run(service, execution, history, request_count, concurrency))
+            service.batcher.shutdown()
+            baseline = baseline or rate
+            stats = service.batcher.metrics()
+            label = "sans lot" if not service.batcher.enabled else f"{max_wait_ms} ms / {max_batch}"
+            print(
+                f"concurrence {concurrency:>2}  {label:<12} {rate:8.0f} prédictions/s  "
+                f"(x{rate / baseline:4.2f}, lots de {stats['avg_batch_rows']:5.1f} lignes en moyenne)"
+            )
+    execution.shutdown()
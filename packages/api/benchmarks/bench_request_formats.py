@@ -0,0 +1,97 @@
+"""
+Benchmark des formats de corps de requête : liste JSON de WorkoutData vs formats colonnaires
+Mesure le décodage jusqu'au WorkoutFrame (validation incluse) puis une analyse complète
+Lancement : python -m benchmarks.bench_request_formats [nombre_entraînements]
+"""
+import sys
+import json
+import time
+import asyncio
+import numpy as np
+
+from models.workout_codec import (
+    CONTENT_TYPE_JSON, CONTENT_TYPE_COLUMNAR_JSON, CONTENT_TYPE_MSGPACK, CONTENT_TYPE_ARROW,
+    decode_workout_frame
+)
+from services.ai_analytics import AIAnalyticsService
+
+DEFAULT_WORKOUTS = 20_000
+WORKOUT_TYPE_VALUES = ["course", "fractionné", "endurance", "récupération"]
+
+
+def build_columns(count: int) -> dict:
+    """Historique synthétique : une séance par jour depuis 2020"""
+    rng = np.random.default_rng(42)
+    pace = rng.integers(210, 420, count)
+    distance = np.round(rng.uniform(3, 25, count), 2)
+    dates = np.datetime64("2020-01-01T07:00:00") + np.arange(count) * np.timedelta64(1, "D")
+    heart_rate = rng.integers(120, 185, count).astype(object)
+    heart_rate[rng.random(count) < 0.2] = None
+
+    return {
+        "id": [f"workout_{i}" for i in range(count)],
+        "date": [str(date) for date in dates],
+        "type": [WORKOUT_TYPE_VALUES[code] for code in rng.integers(0, 4, count)],
+        "duration": (pace * distance / 60).astype(int).tolist(),
+        "distance": distance.tolist(),
+        "pace": [f"{p // 60}:{p % 60:02d}" for p in pace.tolist()],
+        "heart_rate": heart_rate.tolist(),
+    }
+
+
+def encode_bodies(columns: dict) -> dict:
+    """Encodage du même historique dans chaque format disponible"""
+    rows = [dict(zip(columns, values)) for values in zip(*columns.values())]
+    bodies = {
+        CONTENT_TYPE_JSON: json.dumps(rows).encode(),
+        CONTENT_TYPE_COLUMNAR_JSON: json.dumps(columns).encode(),
+    }
+
+    try:
+        import msgpack
+        bodies[CONTENT_TYPE_MSGPACK] = msgpack.packb(columns)
+    except ImportError:
+        print(f"{CONTENT_TYPE_MSGPACK}: msgpack non installé, ignoré")
+
+    try:
+        import pyarrow as pa
+        table = pa.table({
+            **columns,
+            "type": pa.array(columns["type"]).dictionary_encode(),
+            "heart_rate": pa.array(columns["heart_rate"], type=pa.int16()),
+        })
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        bodies[CONTENT_TYPE_ARROW] = sink.getvalue().to_pybytes()
+    except ImportError:
+        print(f"{CONTENT_TYPE_ARROW}: pyarrow non installé, ignoré")
+
+    return bodies
+
+
+def timed(func, repeat: int = 5):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return float(np.median(timings)), result
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_WORKOUTS
+    bodies = encode_bodies(build_columns(count))
+    service = AIAnalyticsService()
+    print(f"{count} entraînements")
+
+    baseline = None
+    for content_type, body in bodies.items():
+        decode_time, frame = timed(lambda: decode_workout_frame(body, content_type))
+        analysis_time, _ = timed(lambda: asyncio.run(service.analyze_injury_risk(frame)))
+        baseline = baseline or decode_time
+        print(
+            f"{content_type:<40} {len(body) / 1e6:6.2f} MB  décodage {decode_time * 1000:8.1f} ms "
+            f"(x{baseline / decode_time:5.1f})  analyse {analysis_time * 1000:6.1f} ms"
+        )
@@ -0,0 +1,91 @@
+"""
+Benchmark de démarrage à froid : durée d'import de main (services construits compris),
+délai jusqu'à la première réponse de /health d'un serveur uvicorn et mémoire résidente
+Chaque mesure part d'un nouveau processus Python ; budget visé : /health en moins d'une seconde
+Lancement : python -m benchmarks.bench_startup [répétitions]
+"""
+import os
+import sys
+import json
+import time
+import statistics
+import subprocess
+import httpx
+
+DEFAULT_RUNS = 5
+STARTUP_BUDGET_SECONDS = 1.0
+PORT = 8766
+HEALTH_URL = f"http://127.0.0.1:{PORT}/health"
+
+# Modules coûteux qui ne doivent pas être chargés au démarrage
+HEAVY_MODULES = ("pandas", "sklearn", "scipy", "joblib", "pyarrow")
+
+IMPORT_PROBE = f"""
+import sys, json, time
+started = time.perf_counter()
+import main
+elapsed = time.perf_counter() - started
+from services.model_registry import current_rss_bytes
+print(json.dumps({{
+    "import_ms": elapsed * 1000,
+    "rss_bytes": current_rss_bytes(),
+    "heavy_modules": [name for name in {HEAVY_MODULES!r} if name in sys.modules]
+}}))
+"""
+
+
+def process_rss_bytes(pid: int) -> int:
+    """Mémoire résidente d'un autre processus (VmRSS, Linux)"""
+    try:
+        with open(f"/proc/{pid}/status", "r", encoding="ascii") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def measure_import(env: dict) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_PROBE], env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure_health(env: dict) -> dict:
+    """Délai entre le lancement d'uvicorn et la première réponse 200 de /health"""
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(PORT), "--log-level", "warning"],
+        env=env
+    )
+    try:
+        while time.perf_counter() - started < 30:
+            try:
+                if httpx.get(HEALTH_URL, timeout=1).status_code == 200:
+                    return {"health_ms": (time.perf_counter() - started) * 1000, "rss_bytes": process_rss_bytes(server.pid)}
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.005)
+        raise RuntimeError("Le serveur n'a pas démarré")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_RUNS
+    env = {**os.environ, "DATABASE_URL": "memory://"}
+
+    imports = [measure_import(env) for _ in range(runs)]
+    healths = [measure_health(env) for _ in range(runs)]
+
+    import_ms = statistics.median(run["import_ms"] for run in imports)
+    health_ms = statistics.median(run["health_ms"] for run in healths)
+    print(f"{runs} démarrages à froid (médiane)")
+    print(f"import main          {import_ms:8.0f} ms   RSS {statistics.median(run['rss_bytes'] for run in imports) / 2**20:6.1f} Mo")
+    print(f"uvicorn -> /health   {health_ms:8.0f} ms   RSS {statistics.median(run['rss_bytes'] for run in healths) / 2**20:6.1f} Mo")
+    print(f"modules lourds chargés à l'import: {', '.join(imports[0]['heavy_modules']) or 'aucun'}")
+    verdict = "respecté" if health_ms / 1000 < STARTUP_BUDGET_SECONDS else "DÉPASSÉ"
+    print(f"budget /health < {STARTUP_BUDGET_SECONDS:.1f} s : {verdict}")
@@ -0,0 +1,60 @@
+"""
+Benchmark de WorkoutService.detect_training_patterns sur 10 ans de sorties quotidiennes
+Mesure séparément les agrégats calendaires (WorkoutCalendar) et la détection complète
+Lancement : python -m benchmarks.bench_training_patterns [années]
+"""
+import sys
+import time
+import asyncio
+import numpy as np
+
+from models.workout_frame import WorkoutFrame, WorkoutCalendar
+from services.workout_service import WorkoutService
+
+DEFAULT_YEARS = 10
+WORKOUT_TYPE_VALUES = ["course", "fractionné", "endurance", "récupération"]
+
+
+def build_frame(years: int) -> WorkoutFrame:
+    """Une sortie par jour pendant `years` années, à heure variable"""
+    rng = np.random.default_rng(11)
+    count = years * 365 + years // 4
+    timestamp = (
+        np.datetime64("2015-01-01T06:00:00")
+        + np.arange(count) * np.timedelta64(1, "D")
+        + rng.integers(0, 12 * 3600, count) * np.timedelta64(1, "s")
+    )
+
+    return WorkoutFrame.from_columns({
+        "id": [f"workout_{i}" for i in range(count)],
+        "timestamp": timestamp,
+        "type": rng.choice(WORKOUT_TYPE_VALUES, count),
+        "duration": rng.integers(20, 120, count),
+        "distance": np.round(rng.uniform(3, 25, count), 2),
+        "pace_seconds": rng.integers(210, 420, count),
+        "heart_rate": rng.integers(120, 185, count),
+    })
+
+
+def timed(func, repeat: int = 20) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return float(np.median(timings))
+
+
+if __name__ == "__main__":
+    years = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_YEARS
+    frame = build_frame(years)
+    service = WorkoutService()
+    loop = asyncio.new_event_loop()
+
+    calendar_time = timed(lambda: WorkoutCalendar(frame))
+    patterns_time = timed(lambda: loop.run_until_complete(service.detect_training_patterns(frame)))
+    loop.close()
+
+    print(f"{len(frame)} séances sur {years} ans")
+    print(f"agrégats calendaires        médiane {calendar_time * 1000:8.2f} ms")
+    print(f"detect_training_patterns    médiane {patterns_time * 1000:8.2f} ms")
@@ -0,0 +1,122 @@
+"""
+Test de charge de la couche d'exécution : latence des petites requêtes pendant que de
+gros historiques sont analysés, pour chaque EXECUTION_MODE (inline, thread, process)
+Chaque mode est servi par un serveur uvicorn distinct (requêtes HTTP réelles)
+Lancement : python -m benchmarks.load_test_execution [secondes par mode] [séances des gros historiques]
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import subprocess
+import numpy as np
+import httpx
+from typing import Optional
+
+from models.workout_codec import CONTENT_TYPE_COLUMNAR_JSON
+from services.execution import EXECUTION_MODES
+
+DEFAULT_DURATION = 5.0
+DEFAULT_LARGE_WORKOUTS = 200_000
+SMALL_WORKOUTS = 20
+LARGE_CONCURRENCY = 2
+WORKOUT_TYPE_VALUES = ["course", "fractionné", "endurance", "récupération"]
+PORT = 8765
+BASE_URL = f"http://127.0.0.1:{PORT}"
+
+
+def columnar_body(count: int) -> bytes:
+    """Historique colonnaire synthétique : une séance par jour jusqu'à aujourd'hui"""
+    rng = np.random.default_rng(count)
+    pace = rng.integers(210, 420, count)
+    timestamp = np.datetime64("now", "s") - np.arange(count)[::-1] * np.timedelta64(1, "D")
+    return json.dumps({
+        "id": [f"workout_{i}" for i in range(count)],
+        "timestamp": timestamp.astype(np.int64).tolist(),
+        "type": rng.choice(WORKOUT_TYPE_VALUES, count).tolist(),
+        "duration": rng.integers(20, 120, count).tolist(),
+        "distance": np.round(rng.uniform(3, 25, count), 2).tolist(),
+        "pace_seconds": pace.tolist(),
+        "heart_rate": rng.integers(120, 185, count).tolist(),
+    }).encode()
+
+
+async def small_requests(client: httpx.AsyncClient, body: bytes, deadline: float) -> list:
+    latencies = []
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        response = await client.post("/analyze/workout", content=body, headers={"content-type": CONTENT_TYPE_COLUMNAR_JSON})
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+async def large_requests(client: httpx.AsyncClient, body: bytes, deadline: float) -> int:
+    done = 0
+    while time.perf_counter() < deadline:
+        response = await client.post("/analyze/performance-trend", content=body, headers={"content-type": CONTENT_TYPE_COLUMNAR_JSON})
+        response.raise_for_status()
+        done += 1
+    return done
+
+
+def start_server(mode: str) -> subprocess.Popen:
+    """Serveur uvicorn dans un processus séparé, avec le mode d'exécution demandé"""
+    env = {**os.environ, "EXECUTION_MODE": mode, "DATABASE_URL": "memory://"}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(PORT), "--log-level", "warning"],
+        env=env
+    )
+    for _ in range(200):
+        try:
+            httpx.get(f"{BASE_URL}/health").raise_for_status()
+            return server
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError("Le serveur n'a pas démarré")
+
+
+async def run_scenario(small_body: bytes, large_body: Optional[bytes], duration: float):
+    async with httpx.AsyncClient(base_url=BASE_URL, timeout=None) as client:
+        # Échauffement (démarrage des workers, imports)
+        await small_requests(client, small_body, time.perf_counter() + 0.5)
+        deadline = time.perf_counter() + duration
+        large = [large_requests(client, large_body, deadline) for _ in range(LARGE_CONCURRENCY)] if large_body else []
+        results = await asyncio.gather(small_requests(client, small_body, deadline), *large)
+        metrics = (await client.get("/metrics/execution")).json()
+    return np.array(results[0]) * 1000, sum(results[1:]), metrics
+
+
+def report(label: str, latencies: np.ndarray, large_done: int) -> None:
+    print(
+        f"{label:<22} petites requêtes: {len(latencies):5d}  p50 {np.percentile(latencies, 50):8.1f} ms  "
+        f"p99 {np.percentile(latencies, 99):8.1f} ms  | gros historiques traités: {large_done}"
+    )
+
+
+
+if __name__ == "__main__":
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_DURATION
+    large_count = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_LARGE_WORKOUTS
+    small_body = columnar_body(SMALL_WORKOUTS)
+    large_body = columnar_body(large_count)
+    print(f"petites requêtes: {SMALL_WORKOUTS} séances, gros historiques: {large_count} séances x{LARGE_CONCURRENCY} en parallèle")
+
+    for mode in EXECUTION_MODES:
+        server = start_server(mode)
+        try:
+            latencies, large_done, _ = asyncio.run(run_scenario(small_body, None, duration / 2))
+            report(f"{mode} (sans charge)", latencies, large_done)
+            latencies, large_done, metrics = asyncio.run(run_scenario(small_body, large_body, duration))
+            report(f"{mode} (sous charge)", latencies, large_done)
+            for name in ("analytics", "bulk"):
+                pool = metrics[name]
+                print(
+                    f"{'':<22} pool {name:<9}: {pool['completed']:4d} tâches, pic {pool['peak_in_flight']} en cours, "
+                    f"attente moyenne {pool['avg_queue_wait_ms']:.1f} ms, max {pool['max_queue_wait_ms']:.1f} ms"
+                )
+        finally:
+            server.terminate()
+            server.wait()
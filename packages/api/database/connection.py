@@ -1,28 +1,35 @@
 import os
+import time
 import asyncio
 import logging
-from typing import Dict, Any, Optional, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .sqlite_store import SQLiteStore, sqlite_path_from_url
 
 logger = logging.getLogger(__name__)
 
 class DatabaseConnection:
     """
     Gestionnaire de connexion base de données
-    Pour cette version, utilise un stockage simulé en mémoire
-    Peut être étendu pour SQLite, PostgreSQL, etc.
+    Backend choisi par DATABASE_URL : SQLite (sqlite:///chemin.db, sqlite:///:memory:)
+    ou stockage en mémoire pour toute autre URL (memory://)
+    Les écritures SQLite passent par un thread dédié et ne bloquent pas la boucle d'événements
     """
 
     def __init__(self):
         self.db_url = os.getenv("DATABASE_URL", "sqlite:///./runcoach.db")
-        self.connection = None
+        self.connection: Optional[SQLiteStore] = None
         self.is_connected = False
+        self._writer: Optional[ThreadPoolExecutor] = None
 
-        # Stockage temporaire en mémoire pour cette version
+        # Stockage en mémoire (backend sans SQLite, ou données à migrer)
         self.memory_store = {
             "users": {},
             "workouts": {},
             "analyses": {},
-            "predictions": {}
+            "predictions": {},
+            "training_loads": {}
         }
 
     async def connect(self) -> bool:
@@ -30,10 +37,16 @@ class DatabaseConnection:
         Établissement de la connexion à la base de données
         """
         try:
-            # Dans une vraie implémentation, ici on se connecterait à la DB
-            # For now, simulate connection
+            sqlite_path = sqlite_path_from_url(self.db_url)
+            if sqlite_path is not None:
+                self.connection = SQLiteStore(sqlite_path)
+                # SQLite n'accepte qu'un écrivain à la fois : un seul thread d'écriture
+                self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-writer")
+                logger.info(f"Connexion SQLite (WAL) à la base de données: {self.db_url}")
+            else:
+                logger.info(f"Stockage en mémoire pour la base de données: {self.db_url}")
+
             self.is_connected = True
-            logger.info(f"Connexion simulée à la base de données: {self.db_url}")
             return True
 
         except Exception as e:
@@ -43,18 +56,34 @@ class DatabaseConnection:
 
     async def disconnect(self):
         """
-        Fermeture de la connexion
+        Fermeture de la connexion (après écriture des opérations en attente)
         """
+        if self._writer is not None:
+            self._writer.shutdown(wait=True)
+            self._writer = None
+        if self.connection is not None:
+            self.connection.close()
+
         self.is_connected = False
         self.connection = None
         logger.info("Déconnexion base de données")
 
+    async def _write(self, func, *args):
+        """
+        Exécution d'une écriture SQLite sur le thread d'écriture, sans bloquer la boucle
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._writer, func, *args)
+
     async def store_user_data(self, user_id: str, data: Dict[str, Any]) -> bool:
         """
         Stockage des données utilisateur
         """
         try:
-            self.memory_store["users"][user_id] = data
+            if self.connection is not None:
+                await self._write(self.connection.put_user, user_id, data, time.time())
+            else:
+                self.memory_store["users"][user_id] = data
             logger.info(f"Données utilisateur stockées pour: {user_id}")
             return True
         except Exception as e:
@@ -66,20 +95,32 @@ class DatabaseConnection:
         Récupération des données utilisateur
         """
         try:
+            if self.connection is not None:
+                return self.connection.get_user(user_id)
             return self.memory_store["users"].get(user_id)
         except Exception as e:
             logger.error(f"Erreur récupération données utilisateur: {e}")
             return None
 
-    async def store_workout_analysis(self, workout_id: str, analysis: Dict[str, Any]) -> bool:
+    async def store_workout_analysis(
+        self,
+        workout_id: str,
+        analysis: Dict[str, Any],
+        user_id: Optional[str] = None
+    ) -> bool:
         """
-        Stockage d'une analyse d'entraînement
+        Stockage d'une analyse d'entraînement (user_id optionnel, indexé avec la date)
         """
         try:
-            self.memory_store["analyses"][workout_id] = {
-                "analysis": analysis,
-                "created_at": asyncio.get_event_loop().time()
-            }
+            created_at = time.time()
+            if self.connection is not None:
+                await self._write(self.connection.put_analysis, workout_id, user_id, analysis, created_at)
+            else:
+                self.memory_store["analyses"][workout_id] = {
+                    "analysis": analysis,
+                    "user_id": user_id,
+                    "created_at": created_at
+                }
             logger.info(f"Analyse stockée pour workout: {workout_id}")
             return True
         except Exception as e:
@@ -91,6 +132,8 @@ class DatabaseConnection:
         Récupération d'une analyse d'entraînement
         """
         try:
+            if self.connection is not None:
+                return self.connection.get_analysis(workout_id)
             stored_data = self.memory_store["analyses"].get(workout_id)
             return stored_data["analysis"] if stored_data else None
         except Exception as e:
@@ -102,13 +145,14 @@ class DatabaseConnection:
         Stockage d'une prédiction de performance
         """
         try:
-            if user_id not in self.memory_store["predictions"]:
-                self.memory_store["predictions"][user_id] = []
-
-            self.memory_store["predictions"][user_id].append({
-                "prediction": prediction,
-                "created_at": asyncio.get_event_loop().time()
-            })
+            created_at = time.time()
+            if self.connection is not None:
+                await self._write(self.connection.add_prediction, user_id, prediction, created_at)
+            else:
+                self.memory_store["predictions"].setdefault(user_id, []).append({
+                    "prediction": prediction,
+                    "created_at": created_at
+                })
 
             logger.info(f"Prédiction stockée pour utilisateur: {user_id}")
             return True
@@ -121,19 +165,77 @@ class DatabaseConnection:
         Récupération des prédictions d'un utilisateur
         """
         try:
+            if self.connection is not None:
+                return self.connection.get_predictions(user_id)
             predictions = self.memory_store["predictions"].get(user_id, [])
             return [p["prediction"] for p in predictions]
         except Exception as e:
             logger.error(f"Erreur récupération prédictions: {e}")
             return []
 
+    async def store_training_load(self, athlete_id: str, state: Dict[str, Any]) -> bool:
+        """
+        Stockage de l'état de charge d'entraînement d'un athlète (ATL/CTL/ACWR)
+        """
+        try:
+            if self.connection is not None:
+                await self._write(self.connection.put_training_load, athlete_id, state, time.time())
+            else:
+                self.memory_store["training_loads"][athlete_id] = state
+            return True
+        except Exception as e:
+            logger.error(f"Erreur stockage charge d'entraînement: {e}")
+            return False
+
+    async def update_training_load(
+        self,
+        athlete_id: str,
+        update: Callable[[Optional[Dict[str, Any]]], Tuple[Optional[Dict[str, Any]], Any]]
+    ) -> Any:
+        """
+        Mise à jour atomique de l'état de charge d'un athlète :
+        update(état stocké ou None) -> (nouvel état à écrire ou None, résultat renvoyé)
+        - SQLite : transaction BEGIN IMMEDIATE sur le thread d'écriture, sûre entre workers
+        - mémoire : lecture et écriture sans await intermédiaire, atomiques dans la boucle ;
+          ce stockage est propre à chaque processus (non partagé entre workers)
+        Les erreurs sont journalisées puis propagées (l'état n'a pas été enregistré)
+        """
+        try:
+            if self.connection is not None:
+                return await self._write(self.connection.update_training_load, athlete_id, update, time.time())
+            state, result = update(self.memory_store["training_loads"].get(athlete_id))
+            if state is not None:
+                self.memory_store["training_loads"][athlete_id] = state
+            return result
+        except Exception as e:
+            logger.error(f"Erreur mise à jour charge d'entraînement: {e}")
+            raise
+
+    async def get_training_load(self, athlete_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Récupération de l'état de charge d'entraînement d'un athlète
+        """
+        try:
+            if self.connection is not None:
+                return self.connection.get_training_load(athlete_id)
+            return self.memory_store["training_loads"].get(athlete_id)
+        except Exception as e:
+            logger.error(f"Erreur récupération charge d'entraînement: {e}")
+            return None
+
     async def cleanup_old_data(self, max_age_hours: int = 24) -> int:
         """
         Nettoyage des données anciennes
         """
         try:
-            current_time = asyncio.get_event_loop().time()
+            current_time = time.time()
             max_age_seconds = max_age_hours * 3600
+
+            if self.connection is not None:
+                cleaned_count = await self._write(self.connection.delete_older_than, current_time - max_age_seconds)
+                logger.info(f"Nettoyage terminé: {cleaned_count} entrées supprimées")
+                return cleaned_count
+
             cleaned_count = 0
 
             # Nettoyage des analyses
@@ -172,14 +274,20 @@ class DatabaseConnection:
         Statistiques de la base de données
         """
         try:
-            stats = {
-                "users_count": len(self.memory_store["users"]),
-                "analyses_count": len(self.memory_store["analyses"]),
-                "predictions_count": sum(len(preds) for preds in self.memory_store["predictions"].values()),
-                "is_connected": self.is_connected,
-                "database_type": "memory_store",
-                "database_url": self.db_url
-            }
+            if self.connection is not None:
+                stats = self.connection.counts()
+                stats["database_type"] = "sqlite"
+            else:
+                stats = {
+                    "users_count": len(self.memory_store["users"]),
+                    "analyses_count": len(self.memory_store["analyses"]),
+                    "predictions_count": sum(len(preds) for preds in self.memory_store["predictions"].values()),
+                    "training_loads_count": len(self.memory_store["training_loads"]),
+                    "database_type": "memory_store"
+                }
+
+            stats["is_connected"] = self.is_connected
+            stats["database_url"] = self.db_url
             return stats
         except Exception as e:
             logger.error(f"Erreur récupération stats DB: {e}")
@@ -187,11 +295,35 @@ class DatabaseConnection:
 
     async def migrate_to_persistent_storage(self) -> bool:
         """
-        Migration vers un stockage persistant (SQLite, PostgreSQL, etc.)
-        À implémenter selon les besoins futurs
+        Migration du stockage en mémoire vers SQLite (une seule transaction)
         """
         try:
-            logger.info("Migration vers stockage persistant - non implémentée dans cette version")
+            if self.connection is None:
+                logger.info("Migration ignorée: aucun backend SQLite configuré (DATABASE_URL)")
+                return False
+
+            now = time.time()
+            users = [(user_id, data, now) for user_id, data in self.memory_store["users"].items()]
+            analyses = [
+                (workout_id, stored.get("user_id"), stored["analysis"], stored["created_at"])
+                for workout_id, stored in self.memory_store["analyses"].items()
+            ]
+            predictions = [
+                (user_id, stored["prediction"], stored["created_at"])
+                for user_id, stored_predictions in self.memory_store["predictions"].items()
+                for stored in stored_predictions
+            ]
+
+            training_loads = [(athlete_id, state, now) for athlete_id, state in self.memory_store["training_loads"].items()]
+
+            await self._write(self.connection.import_rows, users, analyses, predictions, training_loads)
+            for table in self.memory_store.values():
+                table.clear()
+
+            logger.info(
+                f"Migration vers SQLite terminée: {len(users)} utilisateurs, "
+                f"{len(analyses)} analyses, {len(predictions)} prédictions"
+            )
             return True
         except Exception as e:
             logger.error(f"Erreur migration: {e}")
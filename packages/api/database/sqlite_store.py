@@ -0,0 +1,198 @@
+import json
+import sqlite3
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS analyses (
+    workout_id TEXT PRIMARY KEY,
+    user_id TEXT,
+    analysis TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS predictions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    prediction TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS training_loads (
+    athlete_id TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_analyses_user_created ON analyses (user_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_predictions_user_created ON predictions (user_id, created_at);
+"""
+
+# Requêtes paramétrées constantes : compilées une fois puis réutilisées
+# depuis le cache de statements préparés de chaque connexion sqlite3
+UPSERT_USER = (
+    "INSERT INTO users (user_id, data, created_at) VALUES (?, ?, ?) "
+    "ON CONFLICT(user_id) DO UPDATE SET data = excluded.data"
+)
+SELECT_USER = "SELECT data FROM users WHERE user_id = ?"
+UPSERT_ANALYSIS = (
+    "INSERT INTO analyses (workout_id, user_id, analysis, created_at) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT(workout_id) DO UPDATE SET user_id = excluded.user_id, "
+    "analysis = excluded.analysis, created_at = excluded.created_at"
+)
+SELECT_ANALYSIS = "SELECT analysis FROM analyses WHERE workout_id = ?"
+INSERT_PREDICTION = "INSERT INTO predictions (user_id, prediction, created_at) VALUES (?, ?, ?)"
+SELECT_USER_PREDICTIONS = "SELECT prediction FROM predictions WHERE user_id = ? ORDER BY created_at, id"
+UPSERT_TRAINING_LOAD = (
+    "INSERT INTO training_loads (athlete_id, state, updated_at) VALUES (?, ?, ?) "
+    "ON CONFLICT(athlete_id) DO UPDATE SET state = excluded.state, updated_at = excluded.updated_at"
+)
+SELECT_TRAINING_LOAD = "SELECT state FROM training_loads WHERE athlete_id = ?"
+DELETE_OLD_ANALYSES = "DELETE FROM analyses WHERE created_at < ?"
+DELETE_OLD_PREDICTIONS = "DELETE FROM predictions WHERE created_at < ?"
+COUNT_ROWS = {
+    "users_count": "SELECT COUNT(*) FROM users",
+    "analyses_count": "SELECT COUNT(*) FROM analyses",
+    "predictions_count": "SELECT COUNT(*) FROM predictions",
+    "training_loads_count": "SELECT COUNT(*) FROM training_loads",
+}
+
+
+def sqlite_path_from_url(db_url: str) -> Optional[str]:
+    """
+    Chemin SQLite extrait de DATABASE_URL (sqlite:///./runcoach.db, sqlite:///:memory:)
+    None si l'URL ne désigne pas une base SQLite
+    """
+    prefix = "sqlite:///"
+    if not db_url.startswith(prefix):
+        return None
+    return db_url[len(prefix):] or ":memory:"
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, default=str)
+
+
+class SQLiteStore:
+    """
+    Stockage SQLite en mode WAL
+    Une connexion d'écriture (utilisée depuis un unique thread d'écriture) et une connexion
+    de lecture distincte : en WAL les lectures ne sont jamais bloquées par une écriture en cours
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.in_memory = path == ":memory:"
+
+        self.writer = self._open()
+        self.writer.executescript(SCHEMA)
+        # Une base en mémoire n'est visible que par sa propre connexion
+        self.reader = self.writer if self.in_memory else self._open()
+
+    def _open(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("PRAGMA busy_timeout=5000")
+        return connection
+
+    def close(self) -> None:
+        if self.reader is not self.writer:
+            self.reader.close()
+        self.writer.close()
+
+    # Écritures (thread d'écriture)
+
+    def put_user(self, user_id: str, data: Dict[str, Any], created_at: float) -> None:
+        self.writer.execute(UPSERT_USER, (user_id, _dumps(data), created_at))
+
+    def put_analysis(self, workout_id: str, user_id: Optional[str], analysis: Dict[str, Any], created_at: float) -> None:
+        self.writer.execute(UPSERT_ANALYSIS, (workout_id, user_id, _dumps(analysis), created_at))
+
+    def add_prediction(self, user_id: str, prediction: Dict[str, Any], created_at: float) -> None:
+        self.writer.execute(INSERT_PREDICTION, (user_id, _dumps(prediction), created_at))
+
+    def put_training_load(self, athlete_id: str, state: Dict[str, Any], updated_at: float) -> None:
+        self.writer.execute(UPSERT_TRAINING_LOAD, (athlete_id, _dumps(state), updated_at))
+
+    def update_training_load(
+        self,
+        athlete_id: str,
+        update: Callable[[Optional[Dict[str, Any]]], Tuple[Optional[Dict[str, Any]], Any]],
+        updated_at: float
+    ) -> Any:
+        """
+        Lecture-modification-écriture de l'état d'un athlète dans une transaction BEGIN IMMEDIATE :
+        le verrou d'écriture SQLite est pris avant la lecture, les mises à jour concurrentes
+        (autres workers uvicorn compris) sont donc sérialisées sans perte
+        update(état stocké ou None) -> (nouvel état à écrire ou None, résultat renvoyé)
+        """
+        with self._transaction():
+            row = self.writer.execute(SELECT_TRAINING_LOAD, (athlete_id,)).fetchone()
+            state, result = update(json.loads(row[0]) if row else None)
+            if state is not None:
+                self.writer.execute(UPSERT_TRAINING_LOAD, (athlete_id, _dumps(state), updated_at))
+        return result
+
+    def delete_older_than(self, cutoff: float) -> int:
+        with self._transaction():
+            removed = self.writer.execute(DELETE_OLD_ANALYSES, (cutoff,)).rowcount
+            removed += self.writer.execute(DELETE_OLD_PREDICTIONS, (cutoff,)).rowcount
+        return removed
+
+    def import_rows(
+        self,
+        users: Iterable[Tuple[str, Dict[str, Any], float]],
+        analyses: Iterable[Tuple[str, Optional[str], Dict[str, Any], float]],
+        predictions: Iterable[Tuple[str, Dict[str, Any], float]],
+        training_loads: Iterable[Tuple[str, Dict[str, Any], float]] = ()
+    ) -> None:
+        """Import groupé en une seule transaction (migration depuis le stockage mémoire)"""
+        with self._transaction():
+            self.writer.executemany(UPSERT_USER, ((u, _dumps(d), t) for u, d, t in users))
+            self.writer.executemany(UPSERT_ANALYSIS, ((w, u, _dumps(a), t) for w, u, a, t in analyses))
+            self.writer.executemany(INSERT_PREDICTION, ((u, _dumps(p), t) for u, p, t in predictions))
+            self.writer.executemany(UPSERT_TRAINING_LOAD, ((a, _dumps(d), t) for a, d, t in training_loads))
+
+    def _transaction(self):
+        return _Transaction(self.writer)
+
+    # Lectures (connexion de lecture, point d'accès par clé indexée)
+
+    def get_user(self, user_id: str) -> Optional[Dict[str, Any]]:
+        row = self.reader.execute(SELECT_USER, (user_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_analysis(self, workout_id: str) -> Optional[Dict[str, Any]]:
+        row = self.reader.execute(SELECT_ANALYSIS, (workout_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_training_load(self, athlete_id: str) -> Optional[Dict[str, Any]]:
+        row = self.reader.execute(SELECT_TRAINING_LOAD, (athlete_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_predictions(self, user_id: str) -> List[Dict[str, Any]]:
+        rows = self.reader.execute(SELECT_USER_PREDICTIONS, (user_id,)).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        return {name: self.reader.execute(query).fetchone()[0] for name, query in COUNT_ROWS.items()}
+
+
+class _Transaction:
+    """Transaction explicite sur une connexion en mode autocommit"""
+
+    def __init__(self, connection: sqlite3.Connection):
+        self.connection = connection
+
+    def __enter__(self):
+        self.connection.execute("BEGIN IMMEDIATE")
+        return self.connection
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.connection.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
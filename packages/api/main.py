@@ -1,28 +1,55 @@
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, HTTPException, Depends, Query, Request, status
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, Field, ValidationError
+from typing import Any, Callable, Dict, List, Optional
 import uvicorn
 import os
 from dotenv import load_dotenv
+import asyncio
 import logging
+from contextlib import asynccontextmanager
 
 # Import des modules internes
-from models.workout import WorkoutData, WorkoutCreate, WorkoutAnalysis
+from models.workout import WorkoutData, WorkoutCreate, WorkoutAnalysis, BatchAnalysisRequest
+from models.workout_frame import WorkoutFrame, utc_now
+from models.workout_codec import (
+    CONTENT_TYPE_JSON, CONTENT_TYPE_COLUMNAR_JSON, CONTENT_TYPE_MSGPACK, CONTENT_TYPE_ARROW,
+    UnsupportedFormatError, decode_batch_request, decode_workout_frame
+)
 from models.user import User, UserCreate
 from services.ai_analytics import AIAnalyticsService
 from services.workout_service import WorkoutService
-from services.ml_predictor import MLPredictorService
+from services.ml_predictor import MLPredictorService, STANDARD_RACE_DISTANCES
+from services.training_load import TrainingLoadService
+from services.batch_analysis import BatchAnalysisService
+from services.execution import ExecutionLayer, BODY_BYTES_PER_WORKOUT
+from services.result_cache import ResultCache
 from database.connection import get_database_connection
 
 # Configuration
 load_dotenv()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Chargement des modèles ML en tâche de fond : /health répond sans attendre le registre
+    warm_up = None
+    if ml_service.registry.current_version() is not None:
+        warm_up = asyncio.create_task(execution.run(ml_service.reload_models, pool="ml"))
+    yield
+    if warm_up is not None and not warm_up.done():
+        warm_up.cancel()
+    # Arrêt des pools de calcul, du pool de processus des analyses par lot et du regroupement des inférences
+    execution.shutdown()
+    batch_service.shutdown()
+    ml_service.batcher.shutdown()
+
 app = FastAPI(
     title="RunCoach AI API",
     description="API backend pour analyses avancées de données de course à pied avec IA",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configuration CORS
@@ -39,6 +66,14 @@ app.add_middleware(
 ai_service = AIAnalyticsService()
 workout_service = WorkoutService()
 ml_service = MLPredictorService()
+training_load_service = TrainingLoadService()
+batch_service = BatchAnalysisService()
+
+# Exécution des calculs hors de la boucle d'événements (EXECUTION_MODE: inline, thread, process)
+execution = ExecutionLayer()
+
+# Cache des résultats d'analyse adressé par contenu (RESULT_CACHE_* pour les bornes, TTL et niveau disque)
+result_cache = ResultCache()
 
 # Security
 security = HTTPBearer()
@@ -47,6 +82,70 @@ security = HTTPBearer()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def _inline_json_schema(model: type) -> Dict[str, Any]:
+    """Schéma JSON d'un modèle avec ses définitions imbriquées résolues (pour openapi_extra)"""
+    schema = model.model_json_schema()
+    definitions = schema.pop("$defs", {})
+    for name, field_schema in schema["properties"].items():
+        reference = field_schema.get("$ref")
+        if reference:
+            schema["properties"][name] = definitions[reference.rsplit("/", 1)[-1]]
+        elif "$ref" in field_schema.get("items", {}):
+            field_schema["items"] = definitions[field_schema["items"]["$ref"].rsplit("/", 1)[-1]]
+    return schema
+
+# Corps de requête des endpoints d'analyse : liste JSON de WorkoutData ou formats colonnaires
+WORKOUTS_BODY_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "description": "Historique d'entraînements (format choisi par Content-Type)",
+        "content": {
+            CONTENT_TYPE_JSON: {"schema": {"type": "array", "items": _inline_json_schema(WorkoutData)}},
+            CONTENT_TYPE_COLUMNAR_JSON: {"schema": {"type": "object", "additionalProperties": {"type": "array"}}},
+            CONTENT_TYPE_MSGPACK: {"schema": {"type": "string", "format": "binary"}},
+            CONTENT_TYPE_ARROW: {"schema": {"type": "string", "format": "binary"}},
+        }
+    }
+}
+
+# Corps de requête des analyses par lot, décodé hors de la boucle d'événements
+BATCH_BODY_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {CONTENT_TYPE_JSON: {"schema": _inline_json_schema(BatchAnalysisRequest)}}
+    }
+}
+
+async def _decode_body(request: Request, decoder: Callable[[bytes, str], Any]) -> Any:
+    """
+    Décodage du corps de requête selon son Content-Type sur le pool de calcul
+    (le pool bulk au-delà de BULK_THRESHOLD_WORKOUTS séances estimées)
+    """
+    body = await request.body()
+    try:
+        return await execution.run(
+            decoder, body, request.headers.get("content-type", CONTENT_TYPE_JSON),
+            size=len(body) // BODY_BYTES_PER_WORKOUT
+        )
+    except UnsupportedFormatError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    except ValidationError as e:
+        raise RequestValidationError(e.errors(include_url=False))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+async def workouts_body(request: Request) -> WorkoutFrame:
+    """
+    Décodage du corps de requête en WorkoutFrame selon son Content-Type
+    """
+    return await _decode_body(request, decode_workout_frame)
+
+async def batch_body(request: Request) -> BatchAnalysisRequest:
+    """
+    Décodage d'une analyse par lot (tous les athlètes) sans bloquer la boucle d'événements
+    """
+    return await _decode_body(request, decode_batch_request)
+
 @app.get("/")
 async def root():
     return {"message": "RunCoach AI API - Advanced Analytics Backend"}
@@ -55,98 +154,269 @@ async def root():
 async def health_check():
     return {"status": "healthy", "version": "1.0.0"}
 
+@app.get("/metrics/execution")
+async def execution_metrics():
+    """
+    Métriques des pools de calcul : profondeur de file, attente et durée moyennes
+    """
+    return execution.metrics()
+
+@app.get("/metrics/cache")
+async def cache_metrics():
+    """
+    Métriques du cache de résultats : entrées, octets, hits/misses, évictions
+    """
+    return result_cache.metrics()
+
+@app.get("/models")
+async def model_status():
+    """
+    Registre des modèles : version chargée, versions disponibles, durée de chargement et mémoire par modèle
+    Lu dans un worker du pool ml, là où les modèles sont chargés (en EXECUTION_MODE=process,
+    état du processus worker qui répond, identifié par worker_pid)
+    """
+    return await execution.run(ml_service.model_status, pool="ml")
+
+@app.post("/models/reload")
+async def reload_models(version: Optional[str] = None):
+    """
+    Activation d'une version du registre (la version active sans paramètre) puis rechargement
+    Les autres processus basculent à leur prochaine vérification (MODEL_REGISTRY_POLL)
+    """
+    try:
+        if version is not None:
+            ml_service.registry.activate(version)
+        model_set = await execution.run(ml_service.reload_models, version, pool="ml")
+        return model_set.summary()
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        logger.error(f"Erreur rechargement des modèles: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/metrics/ml")
+async def ml_metrics():
+    """
+    Métriques du service de prédiction : cache des caractéristiques et durées par étape
+    Lues dans un worker du pool ml (en EXECUTION_MODE=process, celui identifié par worker_pid)
+    """
+    return await execution.run(ml_service.metrics, pool="ml")
+
+@app.get("/metrics/benchmarks")
+async def benchmark_metrics():
+    """
+    Version de l'instantané des données de référence chargée par ce worker
+    """
+    return ai_service.kaggle_service.store.metrics()
+
 # Endpoints d'analyse IA
-@app.post("/analyze/workout", response_model=WorkoutAnalysis)
-async def analyze_workout(workout_data: List[WorkoutData]):
+@app.post("/analyze/workout", response_model=WorkoutAnalysis, openapi_extra=WORKOUTS_BODY_OPENAPI)
+async def analyze_workout(workout_data: WorkoutFrame = Depends(workouts_body)):
     """
     Analyse avancée d'un entraînement avec IA
     """
     try:
-        analysis = await ai_service.analyze_workout(workout_data)
+        if not workout_data:
+            raise ValueError("Aucune donnée d'entraînement fournie")
+        # L'allure affichée de la séance analysée est celle envoyée : elle fait partie de la clé
+        key = result_cache.key("analyze/workout", workout_data, workout_data.workout(-1).pace)
+        analysis = await result_cache.get_or_compute(
+            key, lambda: execution.run(ai_service.analyze_workout, workout_data, size=len(workout_data))
+        )
         return analysis
     except Exception as e:
         logger.error(f"Erreur analyse workout: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/analyze/performance-trend")
-async def analyze_performance_trend(workouts: List[WorkoutData]):
+@app.post("/analyze/performance-trend", openapi_extra=WORKOUTS_BODY_OPENAPI)
+async def analyze_performance_trend(
+    athlete_id: Optional[str] = None,
+    workouts: WorkoutFrame = Depends(workouts_body)
+):
     """
     Analyse des tendances de performance sur plusieurs entraînements
+    Avec athlete_id, la charge aiguë/chronique provient de l'état persistant de l'athlète
     """
     try:
-        trend_analysis = await ai_service.analyze_performance_trend(workouts)
+        load_state = await _athlete_load_state(athlete_id)
+        trend_analysis = await execution.run(ai_service.analyze_performance_trend, workouts, load_state, size=len(workouts))
         return trend_analysis
     except Exception as e:
         logger.error(f"Erreur analyse tendance: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/predict/performance")
+@app.post("/predict/performance", openapi_extra=WORKOUTS_BODY_OPENAPI)
 async def predict_performance(
-    workout_history: List[WorkoutData],
     target_distance: float,
-    target_date: str
+    target_date: str,
+    athlete_id: Optional[str] = None,
+    workout_history: WorkoutFrame = Depends(workouts_body)
 ):
     """
     Prédiction de performance basée sur l'historique
     """
     try:
-        prediction = await ml_service.predict_race_time(
-            workout_history, target_distance, target_date
+        load_state = await _athlete_load_state(athlete_id)
+        prediction = await execution.run(
+            ml_service.predict_race_time, workout_history, target_distance, target_date,
+            load_state=load_state, pool="ml", size=len(workout_history)
         )
         return prediction
     except Exception as e:
         logger.error(f"Erreur prédiction: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/analyze/training-zones")
-async def analyze_training_zones(workouts: List[WorkoutData]):
+@app.post("/predict/performances", openapi_extra=WORKOUTS_BODY_OPENAPI)
+async def predict_performances(
+    target_dates: List[str] = Query(..., description="Dates des compétitions : une par distance, ou une seule pour toutes"),
+    distances: Optional[List[float]] = Query(None, description="Distances cibles en km (5K, 10K, semi et marathon par défaut)"),
+    athlete_id: Optional[str] = None,
+    workout_history: WorkoutFrame = Depends(workouts_body)
+):
+    """
+    Prédictions de performance pour plusieurs distances et dates en un appel
+    L'historique n'est envoyé, validé et analysé qu'une fois pour tous les objectifs
+    """
+    try:
+        distances = distances or list(STANDARD_RACE_DISTANCES)
+        if len(target_dates) == 1:
+            target_dates = target_dates * len(distances)
+        if len(target_dates) != len(distances):
+            raise ValueError(
+                f"{len(target_dates)} dates pour {len(distances)} distances (une date par distance ou une seule)"
+            )
+
+        load_state = await _athlete_load_state(athlete_id)
+        predictions = await execution.run(
+            ml_service.predict_race_times, workout_history, list(zip(distances, target_dates)),
+            load_state=load_state, pool="ml", size=len(workout_history)
+        )
+        return predictions
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        logger.error(f"Erreur prédictions multiples: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/analyze/training-zones", openapi_extra=WORKOUTS_BODY_OPENAPI)
+async def analyze_training_zones(workouts: WorkoutFrame = Depends(workouts_body)):
     """
     Analyse des zones d'entraînement et recommandations
     """
     try:
-        zones_analysis = await ai_service.analyze_training_zones(workouts)
+        zones_analysis = await result_cache.get_or_compute(
+            result_cache.key("analyze/training-zones", workouts),
+            lambda: execution.run(ai_service.analyze_training_zones, workouts, size=len(workouts))
+        )
         return zones_analysis
     except Exception as e:
         logger.error(f"Erreur analyse zones: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/analyze/injury-risk")
-async def analyze_injury_risk(workouts: List[WorkoutData]):
+@app.post("/analyze/injury-risk", openapi_extra=WORKOUTS_BODY_OPENAPI)
+async def analyze_injury_risk(
+    athlete_id: Optional[str] = None,
+    workouts: WorkoutFrame = Depends(workouts_body)
+):
     """
     Évaluation du risque de blessure basée sur l'IA
+    Avec athlete_id, le score est lu dans l'état de charge persistant de l'athlète
     """
     try:
-        risk_analysis = await ai_service.analyze_injury_risk(workouts)
+        load_state = await _athlete_load_state(athlete_id)
+        compute = lambda: execution.run(ai_service.analyze_injury_risk, workouts, load_state, size=len(workouts))
+        if load_state is None:
+            risk_analysis = await result_cache.get_or_compute(result_cache.key("analyze/injury-risk", workouts), compute)
+        else:
+            # Score lu dans l'état persistant de l'athlète : pas de mise en cache par contenu
+            risk_analysis = await compute()
         return risk_analysis
     except Exception as e:
         logger.error(f"Erreur analyse risque: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# Charge d'entraînement par athlète (ATL/CTL/ACWR incrémentaux)
+async def _athlete_load_state(athlete_id: Optional[str]):
+    """
+    État de charge persistant de l'athlète, en lecture seule (None sans athlete_id ou si
+    l'athlète est inconnu : la charge est alors calculée depuis l'historique envoyé)
+    Les analyses n'écrivent jamais l'état : les ajouts passent par POST /athletes/{id}/workouts
+    """
+    if athlete_id is None:
+        return None
+    state = await training_load_service.get_state(athlete_id)
+    return state if state.workout_count else None
+
+@app.post("/athletes/{athlete_id}/workouts", openapi_extra=WORKOUTS_BODY_OPENAPI)
+async def append_athlete_workouts(athlete_id: str, workouts: WorkoutFrame = Depends(workouts_body)):
+    """
+    Ajout de séances à l'historique de charge d'un athlète
+    Seules les séances postérieures à la dernière séance connue sont intégrées ; un historique
+    complet contenant des séances antérieures jamais intégrées reconstruit l'état
+    Réponse : état de charge et bilan (séances intégrées, ignorées, reconstruction)
+    """
+    try:
+        state, update = await training_load_service.append_workouts(athlete_id, workouts)
+        return {**state.summary(), **update}
+    except Exception as e:
+        logger.error(f"Erreur ajout séances athlète: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/athletes/{athlete_id}/training-load")
+async def get_athlete_training_load(athlete_id: str):
+    """
+    Charge d'entraînement courante d'un athlète (charges projetées à aujourd'hui)
+    """
+    try:
+        state = await training_load_service.get_state(athlete_id)
+        return {**state.summary(), "current": state.loads_at(utc_now())}
+    except Exception as e:
+        logger.error(f"Erreur récupération charge athlète: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/batch/analyze", openapi_extra=BATCH_BODY_OPENAPI)
+async def batch_analyze(request: BatchAnalysisRequest = Depends(batch_body)):
+    """
+    Analyses de plusieurs athlètes en un appel, réparties sur un pool de processus
+    Chaque athlète réussit ou échoue indépendamment (statut et erreur par athlète)
+    """
+    try:
+        return await batch_service.analyze_athletes(
+            [(athlete.athlete_id, athlete.workouts) for athlete in request.athletes],
+            request.analyses
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        logger.error(f"Erreur analyse par lot: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/datasets/running-benchmarks")
 async def get_running_benchmarks():
     """
     Récupération des données de référence issues de datasets publics
     """
     try:
-        benchmarks = await ai_service.get_running_benchmarks()
+        benchmarks = await execution.run(ai_service.get_running_benchmarks)
         return benchmarks
     except Exception as e:
         logger.error(f"Erreur récupération benchmarks: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/compare/athlete-profile")
+@app.post("/compare/athlete-profile", openapi_extra=WORKOUTS_BODY_OPENAPI)
 async def compare_athlete_profile(
-    user_workouts: List[WorkoutData],
     age: int,
     gender: str,
-    experience_level: str
+    experience_level: str,
+    user_workouts: WorkoutFrame = Depends(workouts_body)
 ):
     """
     Comparaison du profil athlète avec des données de référence
     """
     try:
-        comparison = await ai_service.compare_athlete_profile(
-            user_workouts, age, gender, experience_level
+        comparison = await execution.run(
+            ai_service.compare_athlete_profile, user_workouts, age, gender, experience_level,
+            size=len(user_workouts)
         )
         return comparison
     except Exception as e:
@@ -0,0 +1,131 @@
+import operator
+import numpy as np
+from collections import deque
+from typing import Callable, Dict, Iterable, Mapping, Optional
+
+
+class RollingWindow:
+    """
+    Définition d'une fenêtre glissante terminant à chaque séance
+    - RollingWindow.workouts(5) : les 5 dernières séances (fenêtres incomplètes au début)
+    - RollingWindow.days(7) : les séances de l'intervalle ]date - 7 jours, date]
+    """
+
+    __slots__ = ("size", "unit")
+
+    def __init__(self, size: int, unit: str):
+        if size <= 0:
+            raise ValueError("La taille de fenêtre doit être positive")
+        self.size = size
+        self.unit = unit
+
+    @classmethod
+    def workouts(cls, count: int) -> "RollingWindow":
+        return cls(count, "workouts")
+
+    @classmethod
+    def days(cls, days: int) -> "RollingWindow":
+        return cls(days, "days")
+
+    def __repr__(self) -> str:
+        return f"RollingWindow.{self.unit}({self.size})"
+
+
+class RollingStats:
+    """
+    Statistiques glissantes d'une série en O(n) par fenêtre, quelle que soit sa taille
+    - somme, moyenne, écart-type par différences de sommes cumulées
+    - minimum et maximum par files monotones (deque)
+    Plusieurs fenêtres (en séances ou en jours) sont calculées sur les mêmes sommes cumulées ;
+    les fenêtres en jours exigent des horodatages triés (WorkoutFrame.chronological)
+    """
+
+    __slots__ = ("values", "timestamp", "_offset", "_cumsum", "_cumsq")
+
+    def __init__(self, values: np.ndarray, timestamp: Optional[np.ndarray] = None):
+        self.values = np.asarray(values, dtype=np.float64)
+        self.timestamp = timestamp
+        # Série décalée de sa première valeur : limite les annulations numériques dans la variance
+        # et garde des sommes exactes pour des valeurs entières (allures en secondes)
+        self._offset = float(self.values[0]) if self.values.size else 0.0
+        centered = self.values - self._offset
+        self._cumsum = np.concatenate(([0.0], np.cumsum(centered)))
+        self._cumsq = np.concatenate(([0.0], np.cumsum(centered * centered)))
+
+    def __len__(self) -> int:
+        return self.values.shape[0]
+
+    def starts(self, window: RollingWindow) -> np.ndarray:
+        """Indice de début (inclus) de la fenêtre terminant à chaque séance"""
+        ends = np.arange(len(self))
+        if window.unit == "workouts":
+            return np.maximum(ends - window.size + 1, 0)
+        if self.timestamp is None:
+            raise ValueError("Fenêtre en jours sans horodatages")
+        return np.searchsorted(self.timestamp, self.timestamp - np.timedelta64(window.size, "D"), side="right")
+
+    def counts(self, window: RollingWindow) -> np.ndarray:
+        return self._lengths(self.starts(window))
+
+    def sum(self, window: RollingWindow) -> np.ndarray:
+        starts = self.starts(window)
+        return self._window_sums(self._cumsum, starts) + self._offset * self._lengths(starts)
+
+    def mean(self, window: RollingWindow) -> np.ndarray:
+        starts = self.starts(window)
+        return self._window_sums(self._cumsum, starts) / self._lengths(starts) + self._offset
+
+    def std(self, window: RollingWindow, ddof: int = 0) -> np.ndarray:
+        """Écart-type glissant (NaN lorsque la fenêtre compte au plus ddof séances)"""
+        starts = self.starts(window)
+        lengths = self._lengths(starts)
+        sums = self._window_sums(self._cumsum, starts)
+        squares = self._window_sums(self._cumsq, starts)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            variance = (squares - sums * sums / lengths) / (lengths - ddof)
+        # Une fenêtre d'une seule séance a une variance nulle par définition (pas de résidu d'arrondi)
+        variance[lengths == 1] = 0.0
+        variance[lengths <= ddof] = np.nan
+        return np.sqrt(np.maximum(variance, 0.0))
+
+    def min(self, window: RollingWindow) -> np.ndarray:
+        return self._extremes(self.starts(window), operator.ge)
+
+    def max(self, window: RollingWindow) -> np.ndarray:
+        return self._extremes(self.starts(window), operator.le)
+
+    def stats(
+        self,
+        windows: Mapping[str, RollingWindow],
+        statistics: Iterable[str] = ("mean", "std")
+    ) -> Dict[str, Dict[str, np.ndarray]]:
+        """Plusieurs statistiques pour plusieurs fenêtres : {nom: {statistique: tableau}}"""
+        return {
+            name: {statistic: getattr(self, statistic)(window) for statistic in statistics}
+            for name, window in windows.items()
+        }
+
+    def _lengths(self, starts: np.ndarray) -> np.ndarray:
+        return np.arange(1, len(self) + 1) - starts
+
+    @staticmethod
+    def _window_sums(cumulative: np.ndarray, starts: np.ndarray) -> np.ndarray:
+        return cumulative[1:] - cumulative[starts]
+
+    def _extremes(self, starts: np.ndarray, dominated: Callable[[float, float], bool]) -> np.ndarray:
+        """
+        Extremum de chaque fenêtre par file monotone : chaque indice entre et sort
+        une seule fois, les débuts de fenêtre étant croissants
+        """
+        values = self.values.tolist()
+        result = np.empty(len(values))
+        candidates: deque = deque()
+        for end, (value, start) in enumerate(zip(values, starts.tolist())):
+            while candidates and dominated(values[candidates[-1]], value):
+                candidates.pop()
+            candidates.append(end)
+            while candidates[0] < start:
+                candidates.popleft()
+            result[end] = values[candidates[0]]
+        return result
+
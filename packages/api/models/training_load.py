@@ -0,0 +1,230 @@
+import copy
+import numpy as np
+from typing import Any, Dict, List, Optional
+
+from models.workout import WorkoutType
+from models.workout_frame import WorkoutFrame, WORKOUT_TYPES, WORKOUT_TYPE_CODES
+
+# Facteur d'intensité par code de type d'entraînement (cf. WORKOUT_TYPES)
+INTENSITY_FACTORS = np.array([
+    {
+        WorkoutType.recuperation: 0.5,
+        WorkoutType.endurance: 1.0,
+        WorkoutType.course: 1.2,
+        WorkoutType.fractionne: 1.5
+    }.get(workout_type, 1.0)
+    for workout_type in WORKOUT_TYPES
+])
+
+# Constantes de temps des charges aiguë (fatigue) et chronique (forme), en jours
+ACUTE_TIME_CONSTANT_DAYS = 7
+CHRONIC_TIME_CONSTANT_DAYS = 42
+
+# Fenêtre des indicateurs de risque et nombre de séances pour la progression de volume
+RISK_WINDOW_DAYS = 14
+PROGRESSION_WORKOUTS = 4
+
+SECONDS_PER_DAY = 86400
+RECOVERY_CODE = WORKOUT_TYPE_CODES[WorkoutType.recuperation]
+
+
+def workout_loads(workouts: WorkoutFrame) -> np.ndarray:
+    """Charge de chaque séance : distance * intensité * durée relative (heures)"""
+    return workouts.distance * INTENSITY_FACTORS[workouts.type_code] * (workouts.duration / 60)
+
+
+def _ewma_weight(time_constant_days: float) -> float:
+    """Poids d'une séance dans la moyenne exponentielle (équivalent journalier)"""
+    return 1 - np.exp(-1 / time_constant_days)
+
+
+class TrainingLoadState:
+    """
+    État de charge d'entraînement d'un athlète, mis à jour à chaque ajout de séances
+    - charges aiguë (ATL) et chronique (CTL) en moyennes exponentielles, ratio ACWR
+    - charge totale et nombre de séances
+    - séances des 14 derniers jours et distances des 4 dernières séances (indicateurs de risque)
+    L'ajout d'une séance coûte O(1) quelle que soit la longueur de l'historique,
+    la lecture est O(1) ; l'état est sérialisable en JSON pour DatabaseConnection
+    """
+
+    __slots__ = (
+        "athlete_id", "acute_load", "chronic_load", "total_load", "workout_count",
+        "first_timestamp", "last_timestamp", "last_ids", "window", "recent_distances"
+    )
+
+    def __init__(self, athlete_id: Optional[str] = None):
+        self.athlete_id = athlete_id
+        self.acute_load = 0.0
+        self.chronic_load = 0.0
+        self.total_load = 0.0
+        self.workout_count = 0
+        # Horodatages en secondes epoch (UTC)
+        self.first_timestamp: Optional[int] = None
+        self.last_timestamp: Optional[int] = None
+        # Identifiants des séances à la date la plus récente (dédoublonnage des renvois)
+        self.last_ids: List[str] = []
+        # [horodatage, code de type] des séances dans ]dernière - 14 jours, dernière]
+        self.window: List[List[int]] = []
+        # [horodatage, distance] des dernières séances, ordre chronologique
+        self.recent_distances: List[List[float]] = []
+
+    @classmethod
+    def from_frame(cls, workouts: WorkoutFrame, athlete_id: Optional[str] = None) -> "TrainingLoadState":
+        """État construit à partir d'un historique complet"""
+        state = cls(athlete_id)
+        state.extend(workouts)
+        return state
+
+    @property
+    def acwr(self) -> float:
+        """Ratio charge aiguë / charge chronique (0 sans charge chronique)"""
+        return self.acute_load / self.chronic_load if self.chronic_load > 0 else 0.0
+
+    @property
+    def history_days(self) -> int:
+        """Nombre de jours couverts par l'historique intégré"""
+        if self.last_timestamp is None:
+            return 0
+        return (self.last_timestamp - self.first_timestamp) // SECONDS_PER_DAY
+
+    def new_workouts_mask(self, workouts: WorkoutFrame) -> np.ndarray:
+        """
+        Séances pas encore intégrées : postérieures à la dernière séance connue
+        (ou à la même date avec un identifiant différent)
+        """
+        if self.last_timestamp is None:
+            return np.ones(len(workouts), dtype=bool)
+
+        seconds = workouts.timestamp.astype(np.int64)
+        mask = seconds > self.last_timestamp
+        same_time = seconds == self.last_timestamp
+        if np.any(same_time):
+            mask |= same_time & ~np.isin(workouts.ids, self.last_ids)
+        return mask
+
+    def is_backfill(self, workouts: WorkoutFrame) -> bool:
+        """
+        Historique complet renvoyé avec des séances antérieures à la dernière séance connue
+        jamais intégrées : il couvre toute la période de l'état et compte plus de séances
+        jusqu'à cette date que l'état n'en a intégré (l'état doit alors être reconstruit)
+        """
+        if self.last_timestamp is None or not len(workouts):
+            return False
+        seconds = workouts.timestamp.astype(np.int64)
+        if seconds.min() > self.first_timestamp:
+            return False
+        return int(np.count_nonzero(seconds <= self.last_timestamp)) > self.workout_count
+
+    def extend(self, workouts: WorkoutFrame) -> int:
+        """
+        Intégration de nouvelles séances (coût proportionnel au nombre de séances ajoutées)
+        Les séances antérieures à la dernière séance connue sont ignorées (cf. is_backfill)
+        Retourne le nombre de séances intégrées
+        """
+        mask = self.new_workouts_mask(workouts)
+        if not np.all(mask):
+            workouts = workouts.take(np.flatnonzero(mask))
+        workouts = workouts.chronological()
+        count = len(workouts)
+        if not count:
+            return 0
+
+        seconds = workouts.timestamp.astype(np.int64)
+        loads = workout_loads(workouts)
+        new_last = int(seconds[-1])
+        previous_last = self.last_timestamp if self.last_timestamp is not None else new_last
+
+        # Moyennes exponentielles évaluées à la nouvelle dernière date :
+        # décroissance de l'état existant puis contribution de chaque séance
+        ages = (new_last - seconds) / SECONDS_PER_DAY
+        elapsed = (new_last - previous_last) / SECONDS_PER_DAY
+        for attribute, time_constant in (
+            ("acute_load", ACUTE_TIME_CONSTANT_DAYS),
+            ("chronic_load", CHRONIC_TIME_CONSTANT_DAYS)
+        ):
+            decayed = getattr(self, attribute) * np.exp(-elapsed / time_constant)
+            contribution = _ewma_weight(time_constant) * np.sum(loads * np.exp(-ages / time_constant))
+            setattr(self, attribute, float(decayed + contribution))
+
+        self.total_load += float(np.sum(loads))
+        self.workout_count += count
+        if self.first_timestamp is None:
+            self.first_timestamp = int(seconds[0])
+
+        if new_last != self.last_timestamp:
+            self.last_ids = []
+        self.last_timestamp = new_last
+        self.last_ids.extend(str(workout_id) for workout_id in workouts.ids[seconds == new_last].tolist())
+
+        # Fenêtre glissante des 14 derniers jours
+        window_start = new_last - RISK_WINDOW_DAYS * SECONDS_PER_DAY
+        in_window = seconds > window_start
+        self.window = [entry for entry in self.window if entry[0] > window_start] + [
+            [timestamp, code] for timestamp, code in zip(
+                seconds[in_window].tolist(), workouts.type_code[in_window].tolist()
+            )
+        ]
+
+        # Distances des dernières séances
+        tail = slice(-PROGRESSION_WORKOUTS, None)
+        self.recent_distances = (self.recent_distances + [
+            [timestamp, distance] for timestamp, distance in zip(
+                seconds[tail].tolist(), workouts.distance[tail].tolist()
+            )
+        ])[-PROGRESSION_WORKOUTS:]
+
+        return count
+
+    def loads_at(self, timestamp: np.datetime64) -> Dict[str, float]:
+        """Charges aiguë/chronique projetées à une date (décroissance sans nouvelle séance)"""
+        if self.last_timestamp is None:
+            return {"acute_load": 0.0, "chronic_load": 0.0, "acwr": 0.0}
+
+        elapsed = max(0, int(timestamp.astype("datetime64[s]").astype(np.int64)) - self.last_timestamp) / SECONDS_PER_DAY
+        acute = self.acute_load * float(np.exp(-elapsed / ACUTE_TIME_CONSTANT_DAYS))
+        chronic = self.chronic_load * float(np.exp(-elapsed / CHRONIC_TIME_CONSTANT_DAYS))
+        return {
+            "acute_load": acute,
+            "chronic_load": chronic,
+            "acwr": acute / chronic if chronic > 0 else 0.0
+        }
+
+    # Indicateurs de risque sur la fenêtre des 14 derniers jours
+
+    def window_count(self) -> int:
+        return len(self.window)
+
+    def window_distinct_types(self) -> int:
+        return len({code for _, code in self.window})
+
+    def window_recovery_count(self) -> int:
+        return sum(1 for _, code in self.window if code == RECOVERY_CODE)
+
+    def last_distances(self) -> List[float]:
+        return [distance for _, distance in self.recent_distances]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TrainingLoadState":
+        state = cls(data.get("athlete_id"))
+        for slot in cls.__slots__:
+            if slot in data:
+                # Listes copiées : l'état ne partage rien avec le dictionnaire stocké
+                setattr(state, slot, copy.deepcopy(data[slot]))
+        return state
+
+    def summary(self) -> Dict[str, Any]:
+        """Résumé exposé par l'API"""
+        return {
+            "athlete_id": self.athlete_id,
+            "acute_load": round(self.acute_load, 2),
+            "chronic_load": round(self.chronic_load, 2),
+            "acwr": round(self.acwr, 3),
+            "total_load": round(self.total_load, 2),
+            "workout_count": self.workout_count,
+            "history_days": self.history_days,
+            "last_workout": str(np.datetime64(self.last_timestamp, "s")) if self.last_timestamp is not None else None
+        }
@@ -1,6 +1,6 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
-from datetime import datetime
+from pydantic import BaseModel, Field, PrivateAttr, model_validator
+from typing import List, Optional, Dict, Any, Union
+from datetime import datetime, timezone
 from enum import Enum
 
 class WorkoutType(str, Enum):
@@ -9,6 +9,38 @@ class WorkoutType(str, Enum):
     endurance = "endurance"
     recuperation = "récupération"
 
+def parse_pace(pace: str) -> int:
+    """
+    Conversion d'une allure "mm:ss" en secondes par km
+    Lève ValueError si le format est invalide
+    """
+    parts = pace.split(":")
+    try:
+        minutes, seconds = int(parts[0]), int(parts[1])
+    except (ValueError, IndexError):
+        raise ValueError("Format d'allure invalide (attendu MM:SS)")
+
+    if len(parts) != 2 or minutes < 0 or seconds < 0 or seconds >= 60:
+        raise ValueError("Format d'allure invalide (attendu MM:SS)")
+
+    return minutes * 60 + seconds
+
+
+def parse_date(date: str) -> datetime:
+    """
+    Conversion d'une date ISO en datetime UTC (les dates sans fuseau sont considérées UTC)
+    Lève ValueError si le format est invalide
+    """
+    try:
+        parsed = datetime.fromisoformat(date.replace('Z', '+00:00'))
+    except ValueError:
+        raise ValueError("Format de date invalide (attendu ISO 8601)")
+
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
 class WorkoutData(BaseModel):
     id: str
     date: str
@@ -23,6 +55,26 @@ class WorkoutData(BaseModel):
     splits: Optional[List[Dict[str, Any]]] = Field(None, description="Temps de passage")
     weather: Optional[Dict[str, Any]] = Field(None, description="Conditions météo")
 
+    # Champs canoniques calculés une seule fois à la validation (absents du schéma d'entrée)
+    _pace_seconds: int = PrivateAttr(0)
+    _timestamp: Optional[datetime] = PrivateAttr(None)
+
+    @model_validator(mode="after")
+    def _compute_canonical_fields(self) -> "WorkoutData":
+        self._pace_seconds = parse_pace(self.pace)
+        self._timestamp = parse_date(self.date)
+        return self
+
+    @property
+    def pace_seconds(self) -> int:
+        """Allure en secondes par km (calculée depuis pace)"""
+        return self._pace_seconds
+
+    @property
+    def timestamp(self) -> datetime:
+        """Date UTC (calculée depuis date)"""
+        return self._timestamp
+
 class WorkoutCreate(BaseModel):
     date: str
     type: WorkoutType
@@ -75,4 +127,16 @@ class PerformancePrediction(BaseModel):
     current_fitness_level: str = Field(..., description="Niveau de forme actuel")
     improvement_potential: str = Field(..., description="Potentiel d'amélioration")
     training_recommendations: List[str] = Field(..., description="Recommandations d'entraînement")
-    milestone_predictions: List[Dict[str, Any]] = Field(..., description="Prédictions intermédiaires")
\ No newline at end of file
+    milestone_predictions: List[Dict[str, Any]] = Field(..., description="Prédictions intermédiaires")
+
+class BatchAthleteWorkouts(BaseModel):
+    athlete_id: str
+    workouts: Union[List[Dict[str, Any]], Dict[str, List[Any]]] = Field(
+        ..., description="Liste de WorkoutData ou objet colonnaire, validé séparément pour chaque athlète"
+    )
+
+class BatchAnalysisRequest(BaseModel):
+    athletes: List[BatchAthleteWorkouts]
+    analyses: Optional[List[str]] = Field(
+        None, description="Analyses à effectuer (workout, performance-trend, training-zones, injury-risk), toutes par défaut"
+    )
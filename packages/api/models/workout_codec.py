@@ -0,0 +1,127 @@
+import json
+from typing import Any, Dict, List
+
+from pydantic import TypeAdapter
+
+from models.workout import BatchAnalysisRequest, WorkoutData
+from models.workout_frame import WorkoutFrame
+
+# Formats de corps de requête acceptés par les endpoints d'analyse (choisis par Content-Type)
+CONTENT_TYPE_JSON = "application/json"
+CONTENT_TYPE_COLUMNAR_JSON = "application/vnd.runcoach.columns+json"
+CONTENT_TYPE_MSGPACK = "application/msgpack"
+CONTENT_TYPE_ARROW = "application/vnd.apache.arrow.stream"
+
+CONTENT_TYPE_ALIASES = {
+    "application/x-msgpack": CONTENT_TYPE_MSGPACK,
+    "application/vnd.msgpack": CONTENT_TYPE_MSGPACK,
+    "application/vnd.apache.arrow.file": CONTENT_TYPE_ARROW,
+}
+
+_WORKOUT_LIST_ADAPTER = TypeAdapter(List[WorkoutData])
+
+
+class UnsupportedFormatError(Exception):
+    """Format de corps de requête inconnu ou dépendance optionnelle absente"""
+
+
+def normalize_content_type(content_type: str) -> str:
+    """Type de média sans paramètres (charset...) ni variantes d'alias"""
+    media_type = (content_type or CONTENT_TYPE_JSON).split(";", 1)[0].strip().lower()
+    return CONTENT_TYPE_ALIASES.get(media_type, media_type)
+
+
+def decode_workout_frame(body: bytes, content_type: str) -> WorkoutFrame:
+    """
+    Décodage d'un corps de requête en WorkoutFrame selon son Content-Type
+    - application/json : liste de WorkoutData (validation pydantic ligne par ligne)
+    - application/vnd.runcoach.columns+json : objet JSON avec un tableau par champ
+    - application/msgpack : même disposition colonnaire encodée en MessagePack
+    - application/vnd.apache.arrow.stream : table Arrow IPC (une colonne par champ)
+    Les formats colonnaires sont chargés directement en tableaux NumPy, sans WorkoutData
+    Lève ValueError / pydantic.ValidationError si le contenu est invalide
+    """
+    media_type = normalize_content_type(content_type)
+
+    if media_type == CONTENT_TYPE_JSON:
+        return WorkoutFrame.from_workouts(_WORKOUT_LIST_ADAPTER.validate_json(body))
+    if media_type == CONTENT_TYPE_COLUMNAR_JSON:
+        return WorkoutFrame.from_columns(_columns_from_json(body))
+    if media_type == CONTENT_TYPE_MSGPACK:
+        return WorkoutFrame.from_columns(_columns_from_msgpack(body))
+    if media_type == CONTENT_TYPE_ARROW:
+        return WorkoutFrame.from_columns(_columns_from_arrow(body))
+
+    raise UnsupportedFormatError(f"Format de requête non supporté: {media_type}")
+
+
+def decode_batch_request(body: bytes, content_type: str) -> BatchAnalysisRequest:
+    """
+    Décodage du corps d'une analyse par lot (application/json uniquement)
+    Les historiques de chaque athlète restent bruts, validés ensuite par athlète dans les workers
+    Lève pydantic.ValidationError si le contenu est invalide
+    """
+    media_type = normalize_content_type(content_type)
+    if media_type != CONTENT_TYPE_JSON:
+        raise UnsupportedFormatError(f"Format de requête non supporté: {media_type}")
+    return BatchAnalysisRequest.model_validate_json(body)
+
+
+def workout_frame_from_python(workouts: Any) -> WorkoutFrame:
+    """
+    WorkoutFrame depuis un historique déjà désérialisé : liste de WorkoutData
+    (dicts) ou objet colonnaire {champ: [valeurs]}
+    Lève ValueError / pydantic.ValidationError si le contenu est invalide
+    """
+    if isinstance(workouts, WorkoutFrame):
+        return workouts
+    if isinstance(workouts, dict):
+        return WorkoutFrame.from_columns(workouts)
+    return WorkoutFrame.from_workouts(_WORKOUT_LIST_ADAPTER.validate_python(workouts))
+
+
+def _check_columns(columns: Any) -> Dict[str, Any]:
+    """Le corps colonnaire doit être un objet {champ: [valeurs]}"""
+    if not isinstance(columns, dict):
+        raise ValueError("Corps colonnaire attendu: un objet avec un tableau par champ")
+    return columns
+
+
+def _columns_from_json(body: bytes) -> Dict[str, Any]:
+    try:
+        return _check_columns(json.loads(body))
+    except json.JSONDecodeError as e:
+        raise ValueError(f"JSON invalide: {e}")
+
+
+def _columns_from_msgpack(body: bytes) -> Dict[str, Any]:
+    try:
+        import msgpack
+    except ImportError:
+        raise UnsupportedFormatError("Format MessagePack indisponible (paquet msgpack non installé)")
+
+    try:
+        return _check_columns(msgpack.unpackb(body, raw=False))
+    except (msgpack.ExtraData, msgpack.FormatError, msgpack.StackError, ValueError) as e:
+        raise ValueError(f"MessagePack invalide: {e}")
+
+
+def _columns_from_arrow(body: bytes) -> Dict[str, Any]:
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise UnsupportedFormatError("Format Arrow indisponible (paquet pyarrow non installé)")
+
+    try:
+        table = pa.ipc.open_stream(body).read_all()
+    except pa.ArrowInvalid:
+        try:
+            table = pa.ipc.open_file(pa.BufferReader(body)).read_all()
+        except pa.ArrowInvalid as e:
+            raise ValueError(f"Flux Arrow IPC invalide: {e}")
+
+    # Colonnes numériques sans copie lorsque c'est possible (pas de null)
+    return {
+        name: table.column(name).to_numpy(zero_copy_only=False)
+        for name in table.column_names
+    }
@@ -0,0 +1,465 @@
+import numpy as np
+from typing import Any, List, Mapping, Optional, Sequence, Union
+from datetime import datetime, timezone
+
+from models.workout import WorkoutData, WorkoutType, parse_date
+
+# Codes numériques des types d'entraînement (index dans l'énumération)
+WORKOUT_TYPES: List[WorkoutType] = list(WorkoutType)
+WORKOUT_TYPE_CODES = {workout_type: code for code, workout_type in enumerate(WORKOUT_TYPES)}
+
+# Colonnes requises par WorkoutFrame.from_columns (avec leur alternative déjà numérique)
+REQUIRED_COLUMNS = [
+    ("id", "id"),
+    ("date", "timestamp"),
+    ("type", "type"),
+    ("duration", "duration"),
+    ("distance", "distance"),
+    ("pace", "pace_seconds"),
+]
+# Colonnes lues par WorkoutFrame.from_columns (toutes de même longueur)
+COLUMN_NAMES = ("id", "date", "timestamp", "type", "duration", "distance", "pace", "pace_seconds", "heart_rate")
+
+
+def utc_now() -> np.datetime64:
+    """Instant courant en datetime64 UTC (même unité que WorkoutFrame.timestamp)"""
+    return np.datetime64(datetime.now(timezone.utc).replace(tzinfo=None), "s")
+
+
+def days_between(start: np.datetime64, end: np.datetime64) -> int:
+    """Nombre de jours entiers entre deux datetime64 (équivalent de timedelta.days)"""
+    return int((end - start) // np.timedelta64(1, "D"))
+
+
+def _column(columns: Mapping[str, Any], name: str, count: int) -> np.ndarray:
+    """Colonne convertie en tableau NumPy, de longueur vérifiée"""
+    values = np.asarray(columns[name])
+    if values.ndim != 1:
+        raise ValueError(f"Colonne {name}: tableau de valeurs attendu")
+    if values.shape[0] != count:
+        raise ValueError(f"Colonne {name}: {values.shape[0]} valeurs au lieu de {count}")
+    return values
+
+
+def _numeric_column(columns: Mapping[str, Any], name: str, count: int, allow_missing: bool = False) -> np.ndarray:
+    """Colonne numérique en float64 (les null deviennent NaN si allow_missing)"""
+    values = _column(columns, name, count)
+    try:
+        values = np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        raise ValueError(f"Colonne {name}: valeurs numériques attendues")
+
+    if not allow_missing and not np.all(np.isfinite(values)):
+        raise ValueError(f"Colonne {name}: valeurs manquantes ou non finies")
+    return values
+
+
+def _check_positive(distance: np.ndarray, duration: np.ndarray) -> None:
+    """Règle commune à tous les formats d'entrée : distance et durée strictement positives"""
+    if np.any(distance <= 0) or np.any(duration <= 0):
+        raise ValueError("Distance et durée doivent être strictement positives")
+
+
+def _ascii_column(values: np.ndarray, error: str) -> np.ndarray:
+    """
+    Colonne texte en chaînes d'octets ASCII : les conversions NumPy (entiers, datetime64)
+    y sont plusieurs fois plus rapides que sur des chaînes Unicode
+    """
+    try:
+        return values.astype(np.bytes_)
+    except (UnicodeEncodeError, ValueError, TypeError):
+        raise ValueError(error)
+
+
+def _parse_pace_column(pace: np.ndarray) -> np.ndarray:
+    """Conversion vectorisée des allures "mm:ss" en secondes par km"""
+    error = "Format d'allure invalide (attendu MM:SS)"
+    minutes, separator, seconds = np.char.partition(_ascii_column(pace, error), b":").T
+    try:
+        minutes = minutes.astype(np.int64)
+        seconds = seconds.astype(np.int64)
+    except ValueError:
+        raise ValueError(error)
+
+    if np.any(separator != b":") or np.any(minutes < 0) or np.any((seconds < 0) | (seconds >= 60)):
+        raise ValueError(error)
+    return (minutes * 60 + seconds).astype(np.float64)
+
+
+def _parse_date_column(dates: np.ndarray) -> np.ndarray:
+    """
+    Conversion vectorisée des dates ISO en datetime64[s] UTC
+    Les dates avec décalage horaire explicite passent par parse_date (même sémantique que WorkoutData)
+    """
+    error = "Format de date invalide (attendu ISO 8601)"
+    dates = np.char.rstrip(_ascii_column(dates, error), b"Z")
+    # Séparateur date/heure "T" ou espace (ISO 8601 étendu, accepté par parse_date)
+    times = np.char.partition(np.char.replace(dates, b" ", b"T"), b"T")[:, 2]
+    has_offset = (np.char.find(times, b"+") >= 0) | (np.char.find(times, b"-") >= 0)
+
+    timestamp = np.empty(dates.shape[0], dtype="datetime64[s]")
+    try:
+        timestamp[~has_offset] = dates[~has_offset].astype("datetime64[s]")
+    except ValueError:
+        raise ValueError(error)
+
+    for index in np.flatnonzero(has_offset).tolist():
+        timestamp[index] = np.datetime64(parse_date(dates[index].decode()).replace(tzinfo=None), "s")
+    return timestamp
+
+
+def _timestamp_column(values: np.ndarray) -> np.ndarray:
+    """Horodatages déjà numériques (secondes epoch) ou datetime64 vers datetime64[s]"""
+    if np.issubdtype(values.dtype, np.datetime64):
+        timestamp = values.astype("datetime64[s]")
+    elif np.issubdtype(values.dtype, np.number):
+        timestamp = values.astype(np.int64).astype("datetime64[s]")
+    else:
+        raise ValueError("Colonne timestamp: secondes epoch attendues")
+
+    if np.any(np.isnat(timestamp)):
+        raise ValueError("Colonne timestamp: valeurs manquantes")
+    return timestamp
+
+
+def _type_code_column(types: np.ndarray) -> np.ndarray:
+    """Conversion des types d'entraînement en codes (une comparaison vectorisée par type)"""
+    types = types.astype(str)
+    type_code = np.full(types.shape[0], -1, dtype=np.int8)
+    for code, workout_type in enumerate(WORKOUT_TYPES):
+        type_code[types == workout_type.value] = code
+
+    if np.any(type_code < 0):
+        raise ValueError(f"Type d'entraînement invalide (attendu: {', '.join(t.value for t in WORKOUT_TYPES)})")
+    return type_code
+
+
+class WorkoutFrame:
+    """
+    Représentation colonnaire (structure de tableaux NumPy) d'un historique d'entraînements
+    Construite une seule fois par requête puis partagée par tous les services d'analyse
+    """
+
+    __slots__ = (
+        "ids", "distance", "duration", "pace_seconds",
+        "heart_rate", "type_code", "timestamp", "records", "_time_index"
+    )
+
+    def __init__(
+        self,
+        ids: np.ndarray,
+        distance: np.ndarray,
+        duration: np.ndarray,
+        pace_seconds: np.ndarray,
+        heart_rate: np.ndarray,
+        type_code: np.ndarray,
+        timestamp: np.ndarray,
+        records: Optional[Sequence[WorkoutData]] = None
+    ):
+        self.ids = ids
+        self.distance = distance
+        self.duration = duration
+        self.pace_seconds = pace_seconds
+        self.heart_rate = heart_rate
+        self.type_code = type_code
+        self.timestamp = timestamp
+        self.records = records
+        self._time_index: Optional["WorkoutTimeIndex"] = None
+
+    @classmethod
+    def from_workouts(cls, workouts: Sequence[WorkoutData]) -> "WorkoutFrame":
+        """
+        Construction du frame à partir d'une liste de WorkoutData (un seul passage)
+        Utilise les champs canoniques pace_seconds / timestamp calculés à la validation
+        Lève ValueError si une distance ou une durée n'est pas strictement positive
+        """
+        count = len(workouts)
+        ids = np.empty(count, dtype=object)
+        distance = np.empty(count, dtype=np.float64)
+        duration = np.empty(count, dtype=np.float64)
+        pace_seconds = np.empty(count, dtype=np.float64)
+        heart_rate = np.full(count, np.nan, dtype=np.float64)
+        type_code = np.empty(count, dtype=np.int8)
+        timestamps = []
+
+        for i, workout in enumerate(workouts):
+            ids[i] = workout.id
+            distance[i] = workout.distance
+            duration[i] = workout.duration
+            pace_seconds[i] = workout.pace_seconds
+            if workout.heart_rate:
+                heart_rate[i] = workout.heart_rate
+            type_code[i] = WORKOUT_TYPE_CODES[WorkoutType(workout.type)]
+            timestamps.append(workout.timestamp.replace(tzinfo=None))
+
+        _check_positive(distance, duration)
+        timestamp = np.array(timestamps, dtype="datetime64[s]") if count else np.empty(0, dtype="datetime64[s]")
+
+        return cls(ids, distance, duration, pace_seconds, heart_rate, type_code, timestamp, records=workouts)
+
+    @classmethod
+    def from_columns(cls, columns: Mapping[str, Any]) -> "WorkoutFrame":
+        """
+        Construction directe depuis des colonnes (un tableau par champ), sans WorkoutData
+        Colonnes requises : id, date (ou timestamp en secondes epoch), type, duration,
+        distance, pace (ou pace_seconds) ; heart_rate optionnelle (null/0 = absente)
+        Lève ValueError si une colonne est absente, invalide ou de longueur différente
+        """
+        missing = [
+            name for name, alternative in REQUIRED_COLUMNS
+            if name not in columns and alternative not in columns
+        ]
+        if missing:
+            raise ValueError(f"Colonnes manquantes: {', '.join(missing)}")
+
+        ids = np.asarray(columns["id"], dtype=object)
+        if ids.ndim != 1:
+            raise ValueError("Colonne id: tableau de valeurs attendu")
+        count = ids.shape[0]
+        for name in COLUMN_NAMES:
+            if name in columns:
+                _column(columns, name, count)
+        if not count:
+            return cls.from_workouts([])
+
+        distance = _numeric_column(columns, "distance", count)
+        duration = _numeric_column(columns, "duration", count)
+        _check_positive(distance, duration)
+
+        if "pace_seconds" in columns:
+            pace_seconds = _numeric_column(columns, "pace_seconds", count)
+        else:
+            pace_seconds = _parse_pace_column(_column(columns, "pace", count))
+
+        if "timestamp" in columns:
+            timestamp = _timestamp_column(_column(columns, "timestamp", count))
+        else:
+            timestamp = _parse_date_column(_column(columns, "date", count))
+
+        if "heart_rate" in columns:
+            heart_rate = _numeric_column(columns, "heart_rate", count, allow_missing=True)
+            heart_rate[heart_rate == 0] = np.nan
+        else:
+            heart_rate = np.full(count, np.nan, dtype=np.float64)
+
+        type_code = _type_code_column(_column(columns, "type", count))
+
+        return cls(ids, distance, duration, pace_seconds, heart_rate, type_code, timestamp)
+
+    @classmethod
+    def coerce(cls, workouts: Union["WorkoutFrame", Sequence[WorkoutData]]) -> "WorkoutFrame":
+        """
+        Retourne le frame tel quel ou le construit depuis une liste de WorkoutData
+        """
+        if isinstance(workouts, cls):
+            return workouts
+        return cls.from_workouts(workouts)
+
+    def __len__(self) -> int:
+        return self.distance.shape[0]
+
+    def __getitem__(self, index: slice) -> "WorkoutFrame":
+        """Découpage par tranche (vues NumPy, sans copie)"""
+        if not isinstance(index, slice):
+            raise TypeError("WorkoutFrame ne supporte que le découpage par tranche")
+
+        return WorkoutFrame(
+            self.ids[index],
+            self.distance[index],
+            self.duration[index],
+            self.pace_seconds[index],
+            self.heart_rate[index],
+            self.type_code[index],
+            self.timestamp[index],
+            records=self.records[index] if self.records is not None else None
+        )
+
+    def take(self, indices: np.ndarray) -> "WorkoutFrame":
+        """Sélection par indices (copie réordonnée des colonnes)"""
+        return WorkoutFrame(
+            self.ids[indices],
+            self.distance[indices],
+            self.duration[indices],
+            self.pace_seconds[indices],
+            self.heart_rate[indices],
+            self.type_code[indices],
+            self.timestamp[indices],
+            records=[self.records[i] for i in indices.tolist()] if self.records is not None else None
+        )
+
+    def time_index(self) -> "WorkoutTimeIndex":
+        """Index chronologique de l'athlète (construit une seule fois par frame)"""
+        if self._time_index is None:
+            self._time_index = WorkoutTimeIndex(self)
+        return self._time_index
+
+    def chronological(self) -> "WorkoutFrame":
+        """Frame trié par date (lui-même s'il l'est déjà)"""
+        return self.time_index().frame
+
+    def type_mask(self, *workout_types: WorkoutType) -> np.ndarray:
+        """Masque booléen des entraînements des types donnés"""
+        codes = [WORKOUT_TYPE_CODES[WorkoutType(t)] for t in workout_types]
+        return np.isin(self.type_code, codes)
+
+    def type_count(self, *workout_types: WorkoutType) -> int:
+        """Nombre d'entraînements des types donnés"""
+        return int(np.count_nonzero(self.type_mask(*workout_types)))
+
+    def type_counts(self) -> np.ndarray:
+        """Nombre d'entraînements par code de type"""
+        return np.bincount(self.type_code, minlength=len(WORKOUT_TYPES))
+
+    def distinct_types(self) -> int:
+        """Nombre de types d'entraînement distincts"""
+        return int(np.count_nonzero(self.type_counts()))
+
+    def workout(self, index: int) -> WorkoutData:
+        """
+        Récupération d'un entraînement sous forme de WorkoutData
+        (l'objet d'origine si disponible, sinon reconstruit depuis les colonnes)
+        """
+        if self.records is not None:
+            return self.records[index]
+
+        pace = int(self.pace_seconds[index])
+        timestamp = self.timestamp[index]
+        heart_rate = self.heart_rate[index]
+
+        return WorkoutData(
+            id=str(self.ids[index]),
+            date=str(timestamp),
+            type=WORKOUT_TYPES[int(self.type_code[index])],
+            duration=int(self.duration[index]),
+            distance=float(self.distance[index]),
+            pace=f"{pace // 60}:{pace % 60:02d}",
+            heart_rate=int(heart_rate) if not np.isnan(heart_rate) else None
+        )
+
+
+class WorkoutTimeIndex:
+    """
+    Index chronologique d'un historique d'athlète : frame trié par date et tableau
+    datetime64 trié associé. Les requêtes par intervalle de temps se font par
+    dichotomie (np.searchsorted) en O(log n) et renvoient des vues du frame trié
+    """
+
+    __slots__ = ("frame", "timestamp")
+
+    def __init__(self, frame: WorkoutFrame):
+        timestamp = frame.timestamp
+        if timestamp.size > 1 and np.any(timestamp[1:] < timestamp[:-1]):
+            # Tri stable : l'ordre d'envoi départage les séances de même date
+            frame = frame.take(np.argsort(timestamp, kind="stable"))
+            frame._time_index = self
+
+        self.frame = frame
+        self.timestamp = frame.timestamp
+
+    def __len__(self) -> int:
+        return self.timestamp.shape[0]
+
+    @property
+    def latest(self) -> Optional[np.datetime64]:
+        """Date de la séance la plus récente (None si historique vide)"""
+        return self.timestamp[-1] if len(self) else None
+
+    def bounds(self, start: np.datetime64, end: np.datetime64, include_start: bool = True) -> slice:
+        """Tranche des séances dont la date est dans [start, end] (ou ]start, end])"""
+        low = int(np.searchsorted(self.timestamp, start, side="left" if include_start else "right"))
+        high = int(np.searchsorted(self.timestamp, end, side="right"))
+        return slice(low, max(low, high))
+
+    def between(self, start: np.datetime64, end: np.datetime64) -> WorkoutFrame:
+        """Séances dans l'intervalle [start, end]"""
+        return self.frame[self.bounds(start, end)]
+
+    def count_between(self, start: np.datetime64, end: np.datetime64) -> int:
+        """Nombre de séances dans l'intervalle [start, end], sans construire de frame"""
+        window = self.bounds(start, end)
+        return window.stop - window.start
+
+    def last_days(self, days: int, until: Optional[np.datetime64] = None) -> WorkoutFrame:
+        """
+        Séances des `days` derniers jours : intervalle ]until - days, until]
+        (until vaut par défaut la date de la séance la plus récente)
+        """
+        if until is None:
+            until = self.latest
+            if until is None:
+                return self.frame
+        return self.frame[self.bounds(until - np.timedelta64(days, "D"), until, include_start=False)]
+
+    def last(self, count: int) -> WorkoutFrame:
+        """Les `count` séances les plus récentes, dans l'ordre chronologique"""
+        return self.frame[-count:] if count > 0 else self.frame[:0]
+
+
+
+# Noms des jours (équivalent de strftime("%A"), lundi = 0) ; le 01/01/1970 était un jeudi
+WEEKDAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+EPOCH_WEEKDAY = 3
+
+
+def _bucket_totals(keys: np.ndarray, values: np.ndarray):
+    """Clés présentes (croissantes), sommes et effectifs par clé entière via np.bincount"""
+    if not keys.size:
+        return keys, np.zeros(0), np.zeros(0, dtype=np.int64)
+    first = keys.min()
+    offsets = keys - first
+    counts = np.bincount(offsets)
+    occupied = np.flatnonzero(counts)
+    return occupied + first, np.bincount(offsets, weights=values)[occupied], counts[occupied]
+
+
+class WorkoutCalendar:
+    """
+    Agrégats calendaires d'un historique : semaines, mois et jours de la semaine
+    Les champs calendaires sont dérivés une seule fois en datetime64 puis chaque
+    regroupement est un np.bincount, sans datetime/strftime par séance
+    - semaines au sens strftime("%Y-W%U") (débutant le dimanche, coupées au 1er janvier)
+    - mois au sens strftime("%Y-%m"), par ordre chronologique
+    """
+
+    __slots__ = ("week_distances", "month_keys", "month_distances", "month_counts", "weekday", "weekday_counts")
+
+    def __init__(self, frame: WorkoutFrame):
+        timestamp = frame.timestamp
+        distance = frame.distance
+        valid = ~np.isnat(timestamp)
+        if not np.all(valid):
+            timestamp, distance = timestamp[valid], distance[valid]
+
+        days = timestamp.astype("datetime64[D]")
+        day_numbers = days.astype(np.int64)
+        years = days.astype("datetime64[Y]")
+        year_day = day_numbers - years.astype("datetime64[D]").astype(np.int64)
+
+        # Jour de la semaine, lundi = 0
+        self.weekday = (day_numbers + EPOCH_WEEKDAY) % 7
+        self.weekday_counts = np.bincount(self.weekday, minlength=7)
+
+        # %U = (jour de l'année + 7 - jour de la semaine avec dimanche = 0) // 7, entre 0 et 53
+        week_numbers = (year_day + 7 - (self.weekday + 1) % 7) // 7
+        _, self.week_distances, _ = _bucket_totals(years.astype(np.int64) * 54 + week_numbers, distance)
+
+        self.month_keys, self.month_distances, self.month_counts = _bucket_totals(
+            days.astype("datetime64[M]").astype(np.int64), distance
+        )
+
+    def month_labels(self) -> List[str]:
+        """Libellés "AAAA-MM" des mois présents"""
+        return np.datetime_as_string(self.month_keys.astype("datetime64[M]")).tolist()
+
+    def most_active_day(self) -> Optional[str]:
+        """
+        Jour de la semaine le plus fréquent ; à égalité, celui apparu en premier
+        dans l'historique (comme max() sur un dict rempli dans l'ordre des séances)
+        """
+        if not self.weekday.size:
+            return None
+        candidates = np.flatnonzero(self.weekday_counts == self.weekday_counts.max())
+        if candidates.size > 1:
+            first_seen = [int(np.argmax(self.weekday == day)) for day in candidates]
+            candidates = candidates[np.argsort(first_seen)]
+        return WEEKDAY_NAMES[int(candidates[0])]
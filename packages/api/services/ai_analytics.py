@@ -1,45 +1,119 @@
 import numpy as np
-import pandas as pd
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Union
 from datetime import datetime, timedelta
 import asyncio
 import logging
-from statistics import mean, stdev
 
 from models.workout import (
-    WorkoutData, WorkoutAnalysis, PerformanceTrend,
+    WorkoutData, WorkoutType, WorkoutAnalysis, PerformanceTrend,
     TrainingZoneAnalysis, InjuryRiskAssessment
 )
+from models.workout_frame import WorkoutFrame, utc_now
+from models.training_load import TrainingLoadState
 from models.user import AthleteComparison
 from .kaggle_service import KaggleDataService
+from .benchmark_tables import BenchmarkTables
+from .benchmark_store import BenchmarkSnapshot
 
 logger = logging.getLogger(__name__)
 
+# Ratio charge aiguë / chronique au-delà duquel le risque de blessure augmente,
+# pris en compte seulement avec assez d'historique pour une charge chronique fiable
+ACWR_RISK_THRESHOLD = 1.5
+ACWR_MIN_HISTORY_DAYS = 28
+
+# Profondeur maximale d'historique consultée par les sous-analyses de analyze_workout
+HISTORY_TAIL_SIZE = 10
+FATIGUE_WINDOW_DAYS = 7
+
+# Séances assez longues pour être comparées aux temps de référence (km)
+MIN_BENCHMARK_DISTANCE = 3.0
+
+
+class HistoryAggregates:
+    """
+    Agrégats de l'historique calculés en une seule passe pour analyze_workout
+    (moyennes glissantes des dernières séances, nombre de séances sur 7 jours)
+    """
+
+    __slots__ = (
+        "count", "recent_count", "distance_mean_5", "distance_mean_10",
+        "pace_mean_5", "distance_min_3"
+    )
+
+    def __init__(self, history: WorkoutFrame, now: np.datetime64):
+        self.count = len(history)
+        if not self.count:
+            self.recent_count = 0
+            self.distance_mean_5 = self.distance_mean_10 = self.pace_mean_5 = self.distance_min_3 = None
+            return
+
+        timestamp = history.timestamp
+        window_start = now - np.timedelta64(FATIGUE_WINDOW_DAYS, "D")
+        is_sorted = history._time_index is not None or not np.any(timestamp[1:] < timestamp[:-1])
+
+        if is_sorted:
+            tail = np.arange(max(0, self.count - HISTORY_TAIL_SIZE), self.count)
+            self.recent_count = int(
+                np.searchsorted(timestamp, now, side="right") - np.searchsorted(timestamp, window_start, side="right")
+            )
+        else:
+            # Séances les plus récentes sans trier tout l'historique : seuil par sélection
+            # puis tri stable des seuls candidats (mêmes égalités que le tri chronologique)
+            # (sélection sur la vue int64 : np.partition n'est pas optimisé pour datetime64)
+            seconds = timestamp.view(np.int64)
+            threshold = np.partition(seconds, self.count - HISTORY_TAIL_SIZE)[self.count - HISTORY_TAIL_SIZE] \
+                if self.count > HISTORY_TAIL_SIZE else seconds.min()
+            candidates = np.flatnonzero(seconds >= threshold)
+            tail = candidates[np.argsort(seconds[candidates], kind="stable")][-HISTORY_TAIL_SIZE:]
+            self.recent_count = int(np.count_nonzero((timestamp > window_start) & (timestamp <= now)))
+
+        distances = history.distance[tail]
+        paces = history.pace_seconds[tail]
+        self.distance_mean_10 = np.mean(distances[-10:])
+        self.distance_mean_5 = np.mean(distances[-5:])
+        self.pace_mean_5 = np.mean(paces[-5:])
+        self.distance_min_3 = np.min(distances[-3:])
+
+
 class AIAnalyticsService:
     def __init__(self):
         self.kaggle_service = KaggleDataService()
-        self.benchmark_data = None
+        # Version des données de référence en cours d'utilisation (instantané partagé, rechargé à chaud)
+        self.benchmark_snapshot: Optional[BenchmarkSnapshot] = None
+
+    @property
+    def benchmark_data(self) -> Optional[Dict[str, Any]]:
+        return self.benchmark_snapshot.benchmarks if self.benchmark_snapshot is not None else None
 
-    async def analyze_workout(self, workout_data: List[WorkoutData]) -> WorkoutAnalysis:
+    @property
+    def benchmark_tables(self) -> Optional[BenchmarkTables]:
+        """Temps de référence compilés en tables numériques à la publication de l'instantané"""
+        return self.benchmark_snapshot.tables if self.benchmark_snapshot is not None else None
+
+    async def analyze_workout(self, workout_data: Union[List[WorkoutData], WorkoutFrame]) -> WorkoutAnalysis:
         """
         Analyse avancée d'un entraînement avec scoring IA
         """
-        if not workout_data:
+        frame = WorkoutFrame.coerce(workout_data)
+        if not frame:
             raise ValueError("Aucune donnée d'entraînement fournie")
 
         # Prendre le dernier entraînement pour l'analyse
-        workout = workout_data[-1]
-        workout_history = workout_data[:-1] if len(workout_data) > 1 else []
+        workout = frame.workout(-1)
+
+        # Agrégats de l'historique en une seule passe, partagés par les sous-analyses
+        history = HistoryAggregates(frame[:-1], utc_now())
 
         # Calculs d'analyse
-        overall_score = self._calculate_workout_score(workout, workout_history)
-        pace_analysis = self._analyze_pace(workout, workout_history)
+        overall_score = self._calculate_workout_score(workout, history)
+        pace_analysis = self._analyze_pace(workout, history)
         heart_rate_zones = self._analyze_heart_rate_zones(workout)
         effort_consistency = self._calculate_effort_consistency(workout)
-        fatigue_level = self._assess_fatigue_level(workout, workout_history)
+        fatigue_level = self._assess_fatigue_level(workout, history)
         recovery_recommendation = self._generate_recovery_recommendation(workout, fatigue_level)
-        performance_insights = self._generate_performance_insights(workout, workout_history)
-        comparison_to_history = self._compare_to_history(workout, workout_history)
+        performance_insights = self._generate_performance_insights(workout, history)
+        comparison_to_history = self._compare_to_history(workout, history)
 
         return WorkoutAnalysis(
             workout_id=workout.id,
@@ -53,10 +127,16 @@ class AIAnalyticsService:
             comparison_to_history=comparison_to_history
         )
 
-    async def analyze_performance_trend(self, workouts: List[WorkoutData]) -> PerformanceTrend:
+    async def analyze_performance_trend(
+        self,
+        workouts: Union[List[WorkoutData], WorkoutFrame],
+        load_state: Optional[TrainingLoadState] = None
+    ) -> PerformanceTrend:
         """
         Analyse des tendances de performance sur plusieurs semaines/mois
+        load_state : état de charge persistant de l'athlète (sinon calculé depuis l'historique)
         """
+        workouts = WorkoutFrame.coerce(workouts).chronological()
         if len(workouts) < 3:
             raise ValueError("Minimum 3 entraînements requis pour l'analyse de tendance")
 
@@ -65,7 +145,7 @@ class AIAnalyticsService:
         fitness_trend = self._calculate_fitness_trend(workouts)
         endurance_evolution = self._analyze_endurance_evolution(workouts)
         speed_evolution = self._analyze_speed_evolution(workouts)
-        volume_analysis = self._analyze_volume_trends(workouts)
+        volume_analysis = self._analyze_volume_trends(workouts, load_state or TrainingLoadState.from_frame(workouts))
         recommendations = self._generate_training_recommendations(workouts)
         risk_factors = self._identify_risk_factors(workouts)
 
@@ -79,10 +159,11 @@ class AIAnalyticsService:
             risk_factors=risk_factors
         )
 
-    async def analyze_training_zones(self, workouts: List[WorkoutData]) -> TrainingZoneAnalysis:
+    async def analyze_training_zones(self, workouts: Union[List[WorkoutData], WorkoutFrame]) -> TrainingZoneAnalysis:
         """
         Analyse des zones d'entraînement et distribution des intensités
         """
+        workouts = WorkoutFrame.coerce(workouts).chronological()
         zone_distribution = self._calculate_zone_distribution(workouts)
         recommendations = self._generate_zone_recommendations(zone_distribution)
         polarization_index = self._calculate_polarization_index(workouts)
@@ -95,13 +176,20 @@ class AIAnalyticsService:
             intensity_balance=intensity_balance
         )
 
-    async def analyze_injury_risk(self, workouts: List[WorkoutData]) -> InjuryRiskAssessment:
+    async def analyze_injury_risk(
+        self,
+        workouts: Union[List[WorkoutData], WorkoutFrame],
+        load_state: Optional[TrainingLoadState] = None
+    ) -> InjuryRiskAssessment:
         """
         Évaluation du risque de blessure basée sur l'IA et l'analyse des patterns
+        load_state : état de charge persistant de l'athlète (sinon calculé depuis l'historique)
         """
-        risk_score = self._calculate_injury_risk_score(workouts)
+        workouts = WorkoutFrame.coerce(workouts).chronological()
+        load_state = load_state or TrainingLoadState.from_frame(workouts)
+        risk_score = self._calculate_injury_risk_score(load_state)
         overall_risk = self._categorize_risk_level(risk_score)
-        risk_factors = self._identify_injury_risk_factors(workouts)
+        risk_factors = self._identify_injury_risk_factors(workouts, load_state)
         prevention_tips = self._generate_prevention_tips(risk_factors)
         recommended_actions = self._generate_recommended_actions(risk_score, risk_factors)
 
@@ -117,14 +205,12 @@ class AIAnalyticsService:
         """
         Récupération des données de référence depuis Kaggle
         """
-        if not self.benchmark_data:
-            self.benchmark_data = await self.kaggle_service.get_benchmark_data()
-
-        return self.benchmark_data
+        self.benchmark_snapshot = await self.kaggle_service.get_benchmark_snapshot()
+        return self.benchmark_snapshot.benchmarks
 
     async def compare_athlete_profile(
         self,
-        user_workouts: List[WorkoutData],
+        user_workouts: Union[List[WorkoutData], WorkoutFrame],
         age: int,
         gender: str,
         experience_level: str
@@ -134,9 +220,13 @@ class AIAnalyticsService:
         """
         benchmarks = await self.get_running_benchmarks()
 
-        user_stats = self._calculate_user_stats(user_workouts)
-        percentile = self._calculate_percentile(user_stats, benchmarks, age, gender)
+        workouts = WorkoutFrame.coerce(user_workouts).chronological()
+        user_stats = self._calculate_user_stats(workouts)
+        position = self._benchmark_position(workouts, age, gender)
+        percentile = self._calculate_percentile(user_stats, position)
         peer_comparison = self._compare_with_peers(user_stats, benchmarks, age, gender, experience_level)
+        if position is not None:
+            peer_comparison["performance_level"] = position[1]
         strengths = self._identify_strengths(user_stats, peer_comparison)
         areas_for_improvement = self._identify_improvement_areas(user_stats, peer_comparison)
         progression_potential = self._assess_progression_potential(user_stats, age, experience_level)
@@ -152,7 +242,7 @@ class AIAnalyticsService:
 
     # Méthodes privées d'analyse
 
-    def _calculate_workout_score(self, workout: WorkoutData, history: List[WorkoutData]) -> float:
+    def _calculate_workout_score(self, workout: WorkoutData, history: HistoryAggregates) -> float:
         """Calcul du score global d'entraînement (0-100)"""
         base_score = 50.0
 
@@ -164,18 +254,17 @@ class AIAnalyticsService:
             base_score += 10
 
         # Consistance avec l'historique
-        if history:
-            avg_distance = mean([w.distance for w in history[-5:]])
+        if history.count:
+            avg_distance = history.distance_mean_5
             if 0.8 <= workout.distance / avg_distance <= 1.3:  # Progression cohérente
                 base_score += 10
 
         # Limitation à 100
         return min(100, max(0, base_score))
 
-    def _analyze_pace(self, workout: WorkoutData, history: List[WorkoutData]) -> Dict[str, Any]:
+    def _analyze_pace(self, workout: WorkoutData, history: HistoryAggregates) -> Dict[str, Any]:
         """Analyse de l'allure"""
-        pace_parts = workout.pace.split(":")
-        current_pace_seconds = int(pace_parts[0]) * 60 + int(pace_parts[1])
+        current_pace_seconds = workout.pace_seconds
 
         analysis = {
             "current_pace": workout.pace,
@@ -183,9 +272,8 @@ class AIAnalyticsService:
             "consistency": "stable"
         }
 
-        if history:
-            recent_paces = [self._pace_to_seconds(w.pace) for w in history[-5:]]
-            avg_pace = mean(recent_paces)
+        if history.count:
+            avg_pace = history.pace_mean_5
 
             if current_pace_seconds < avg_pace * 0.95:
                 analysis["trend"] = "amélioration"
@@ -196,11 +284,6 @@ class AIAnalyticsService:
 
         return analysis
 
-    def _pace_to_seconds(self, pace_str: str) -> int:
-        """Conversion pace string vers secondes"""
-        parts = pace_str.split(":")
-        return int(parts[0]) * 60 + int(parts[1])
-
     def _categorize_pace(self, pace_seconds: int, workout_type: str) -> str:
         """Catégorisation de l'allure selon le type d'entraînement"""
         if workout_type == "fractionné":
@@ -247,19 +330,17 @@ class AIAnalyticsService:
         else:
             return 0.75
 
-    def _assess_fatigue_level(self, workout: WorkoutData, history: List[WorkoutData]) -> str:
+    def _assess_fatigue_level(self, workout: WorkoutData, history: HistoryAggregates) -> str:
         """Évaluation du niveau de fatigue"""
-        if not history:
+        if not history.count:
             return "normal"
 
-        # Analyse basée sur la fréquence et intensité récente
-        recent_workouts = [w for w in history if
-                          datetime.fromisoformat(w.date.replace('Z', '+00:00')) >
-                          datetime.now() - timedelta(days=7)]
+        # Analyse basée sur la fréquence et intensité récente (7 derniers jours)
+        recent_count = history.recent_count
 
-        if len(recent_workouts) > 5:
+        if recent_count > 5:
             return "élevé"
-        elif len(recent_workouts) < 2:
+        elif recent_count < 2:
             return "faible"
         else:
             return "normal"
@@ -273,7 +354,7 @@ class AIAnalyticsService:
         else:
             return "Récupération standard. Hydratation et étirements suffisants."
 
-    def _generate_performance_insights(self, workout: WorkoutData, history: List[WorkoutData]) -> List[str]:
+    def _generate_performance_insights(self, workout: WorkoutData, history: HistoryAggregates) -> List[str]:
         """Génération d'insights de performance"""
         insights = []
 
@@ -283,48 +364,47 @@ class AIAnalyticsService:
         if workout.heart_rate and workout.heart_rate < 150:
             insights.append("FC basse - bonne efficacité cardiaque")
 
-        if history and len(history) >= 3:
-            recent_distances = [w.distance for w in history[-3:]]
-            if all(d >= workout.distance * 0.8 for d in recent_distances):
+        if history.count >= 3:
+            if history.distance_min_3 >= workout.distance * 0.8:
                 insights.append("Consistance remarquable dans les distances")
 
         return insights or ["Entraînement dans les standards normaux"]
 
-    def _compare_to_history(self, workout: WorkoutData, history: List[WorkoutData]) -> Dict[str, Any]:
+    def _compare_to_history(self, workout: WorkoutData, history: HistoryAggregates) -> Dict[str, Any]:
         """Comparaison à l'historique personnel"""
-        if not history:
+        if not history.count:
             return {"status": "premier_entrainement"}
 
         comparison = {}
 
         # Comparaison distance
-        avg_distance = mean([w.distance for w in history[-10:]])
+        avg_distance = history.distance_mean_10
         comparison["distance_vs_average"] = f"{((workout.distance / avg_distance - 1) * 100):+.1f}%"
 
         # Comparaison allure si possible
-        if len(history) >= 3:
-            recent_paces = [self._pace_to_seconds(w.pace) for w in history[-5:]]
-            avg_pace = mean(recent_paces)
-            current_pace = self._pace_to_seconds(workout.pace)
+        if history.count >= 3:
+            avg_pace = history.pace_mean_5
+            current_pace = workout.pace_seconds
             pace_diff = ((avg_pace - current_pace) / avg_pace) * 100
             comparison["pace_vs_average"] = f"{pace_diff:+.1f}%"
 
         return comparison
 
-    def _calculate_fitness_trend(self, workouts: List[WorkoutData]) -> str:
+    def _calculate_fitness_trend(self, workouts: WorkoutFrame) -> str:
         """Calcul de la tendance de forme physique"""
         if len(workouts) < 5:
             return "insuffisant pour analyse"
 
         # Analyse des 4 dernières semaines
-        recent = workouts[-10:]
-        old = workouts[-20:-10] if len(workouts) >= 20 else workouts[:-10]
+        distances = workouts.distance
+        recent = distances[-10:]
+        old = distances[-20:-10] if len(distances) >= 20 else distances[:-10]
 
-        if not old:
+        if not old.size:
             return "progression stable"
 
-        recent_avg = mean([w.distance for w in recent])
-        old_avg = mean([w.distance for w in old])
+        recent_avg = np.mean(recent)
+        old_avg = np.mean(old)
 
         improvement = (recent_avg - old_avg) / old_avg
 
@@ -337,39 +417,39 @@ class AIAnalyticsService:
         else:
             return "stable"
 
-    def _analyze_endurance_evolution(self, workouts: List[WorkoutData]) -> Dict[str, float]:
+    def _analyze_endurance_evolution(self, workouts: WorkoutFrame) -> Dict[str, float]:
         """Analyse de l'évolution de l'endurance"""
-        endurance_workouts = [w for w in workouts if w.type in ["endurance", "course"]]
+        endurance_distances = workouts.distance[workouts.type_mask(WorkoutType.endurance, WorkoutType.course)]
 
-        if len(endurance_workouts) < 3:
+        if len(endurance_distances) < 3:
             return {"trend": 0.0, "average_distance": 0.0}
 
-        recent = endurance_workouts[-5:]
-        old = endurance_workouts[-10:-5] if len(endurance_workouts) >= 10 else endurance_workouts[:-5]
+        recent = endurance_distances[-5:]
+        old = endurance_distances[-10:-5] if len(endurance_distances) >= 10 else endurance_distances[:-5]
 
-        recent_avg = mean([w.distance for w in recent])
-        old_avg = mean([w.distance for w in old]) if old else recent_avg
+        recent_avg = float(np.mean(recent))
+        old_avg = float(np.mean(old)) if old.size else recent_avg
 
         trend = ((recent_avg - old_avg) / old_avg) * 100 if old_avg > 0 else 0
 
         return {
             "trend": trend,
             "average_distance": recent_avg,
-            "consistency": stdev([w.distance for w in recent]) if len(recent) > 1 else 0
+            "consistency": float(np.std(recent, ddof=1)) if len(recent) > 1 else 0
         }
 
-    def _analyze_speed_evolution(self, workouts: List[WorkoutData]) -> Dict[str, float]:
+    def _analyze_speed_evolution(self, workouts: WorkoutFrame) -> Dict[str, float]:
         """Analyse de l'évolution de la vitesse"""
-        speed_workouts = [w for w in workouts if w.type == "fractionné"]
+        speed_paces = workouts.pace_seconds[workouts.type_mask(WorkoutType.fractionne)]
 
-        if len(speed_workouts) < 3:
+        if len(speed_paces) < 3:
             return {"trend": 0.0, "average_pace": 0.0}
 
-        recent = speed_workouts[-3:]
-        old = speed_workouts[-6:-3] if len(speed_workouts) >= 6 else speed_workouts[:-3]
+        recent = speed_paces[-3:]
+        old = speed_paces[-6:-3] if len(speed_paces) >= 6 else speed_paces[:-3]
 
-        recent_pace = mean([self._pace_to_seconds(w.pace) for w in recent])
-        old_pace = mean([self._pace_to_seconds(w.pace) for w in old]) if old else recent_pace
+        recent_pace = float(np.mean(recent))
+        old_pace = float(np.mean(old)) if old.size else recent_pace
 
         # Amélioration = pace plus rapide (moins de secondes)
         improvement = ((old_pace - recent_pace) / old_pace) * 100 if old_pace > 0 else 0
@@ -377,69 +457,68 @@ class AIAnalyticsService:
         return {
             "trend": improvement,
             "average_pace": recent_pace,
-            "best_pace": min([self._pace_to_seconds(w.pace) for w in recent])
+            "best_pace": float(np.min(recent))
         }
 
-    def _analyze_volume_trends(self, workouts: List[WorkoutData]) -> Dict[str, Any]:
-        """Analyse des tendances de volume"""
-        total_distance = sum([w.distance for w in workouts])
-        total_time = sum([w.duration for w in workouts])
+    def _analyze_volume_trends(self, workouts: WorkoutFrame, load_state: TrainingLoadState) -> Dict[str, Any]:
+        """Analyse des tendances de volume et de la charge aiguë/chronique"""
+        total_distance = float(np.sum(workouts.distance))
+        total_time = int(np.sum(workouts.duration))
 
         return {
             "total_distance": total_distance,
             "total_time": total_time,
             "average_per_workout": total_distance / len(workouts),
-            "weekly_estimate": total_distance * (7 / max(1, len(workouts)))
+            "weekly_estimate": total_distance * (7 / max(1, len(workouts))),
+            "acute_load": round(load_state.acute_load, 2),
+            "chronic_load": round(load_state.chronic_load, 2),
+            "acwr": round(load_state.acwr, 3)
         }
 
-    def _generate_training_recommendations(self, workouts: List[WorkoutData]) -> List[str]:
+    def _generate_training_recommendations(self, workouts: WorkoutFrame) -> List[str]:
         """Génération de recommandations d'entraînement"""
         recommendations = []
 
         # Analyse des types d'entraînement
-        types_count = {}
-        for workout in workouts[-10:]:  # 10 derniers
-            types_count[workout.type] = types_count.get(workout.type, 0) + 1
+        recent = workouts[-10:]  # 10 derniers
+        total_recent = len(recent)
 
-        total_recent = len(workouts[-10:])
-
-        if types_count.get("endurance", 0) / total_recent < 0.6:
+        if recent.type_count(WorkoutType.endurance) / total_recent < 0.6:
             recommendations.append("Augmentez la proportion d'entraînements en endurance (60-70%)")
 
-        if types_count.get("fractionné", 0) / total_recent > 0.3:
+        if recent.type_count(WorkoutType.fractionne) / total_recent > 0.3:
             recommendations.append("Réduisez la fréquence des séances de fractionné (max 20-30%)")
 
-        if types_count.get("récupération", 0) / total_recent < 0.1:
+        if recent.type_count(WorkoutType.recuperation) / total_recent < 0.1:
             recommendations.append("Intégrez des séances de récupération active")
 
         return recommendations or ["Continuez votre programme actuel, il est bien équilibré"]
 
-    def _identify_risk_factors(self, workouts: List[WorkoutData]) -> List[str]:
+    def _identify_risk_factors(self, workouts: WorkoutFrame) -> List[str]:
         """Identification des facteurs de risque"""
         risk_factors = []
 
-        recent = workouts[-7:]  # 7 derniers
+        recent = workouts.time_index().last_days(7)  # 7 derniers jours
 
         # Volume trop important
         if len(recent) > 5:
             risk_factors.append("Fréquence d'entraînement élevée - risque de surentraînement")
 
         # Intensité trop fréquente
-        high_intensity = [w for w in recent if w.type == "fractionné"]
-        if len(high_intensity) > 2:
+        if recent.type_count(WorkoutType.fractionne) > 2:
             risk_factors.append("Trop de séances haute intensité consécutives")
 
         return risk_factors
 
-    def _calculate_zone_distribution(self, workouts: List[WorkoutData]) -> Dict[str, float]:
+    def _calculate_zone_distribution(self, workouts: WorkoutFrame) -> Dict[str, float]:
         """Calcul de la distribution par zones d'entraînement"""
         total = len(workouts)
 
         distribution = {
-            "zone1_recuperation": len([w for w in workouts if w.type == "récupération"]) / total * 100,
-            "zone2_endurance": len([w for w in workouts if w.type == "endurance"]) / total * 100,
-            "zone3_tempo": len([w for w in workouts if w.type == "course"]) / total * 100,
-            "zone4_fractionne": len([w for w in workouts if w.type == "fractionné"]) / total * 100
+            "zone1_recuperation": workouts.type_count(WorkoutType.recuperation) / total * 100,
+            "zone2_endurance": workouts.type_count(WorkoutType.endurance) / total * 100,
+            "zone3_tempo": workouts.type_count(WorkoutType.course) / total * 100,
+            "zone4_fractionne": workouts.type_count(WorkoutType.fractionne) / total * 100
         }
 
         return distribution
@@ -459,10 +538,10 @@ class AIAnalyticsService:
 
         return recommendations
 
-    def _calculate_polarization_index(self, workouts: List[WorkoutData]) -> float:
+    def _calculate_polarization_index(self, workouts: WorkoutFrame) -> float:
         """Calcul de l'index de polarisation (modèle 80/20)"""
         total = len(workouts)
-        low_intensity = len([w for w in workouts if w.type in ["endurance", "récupération"]])
+        low_intensity = workouts.type_count(WorkoutType.endurance, WorkoutType.recuperation)
 
         return (low_intensity / total) * 100 if total > 0 else 0
 
@@ -477,35 +556,43 @@ class AIAnalyticsService:
         else:
             return "très conservateur - pourrait bénéficier de plus d'intensité"
 
-    def _calculate_injury_risk_score(self, workouts: List[WorkoutData]) -> float:
-        """Calcul du score de risque de blessure (0-100)"""
+    def _calculate_injury_risk_score(self, load_state: TrainingLoadState) -> float:
+        """
+        Calcul du score de risque de blessure (0-100)
+        Lu dans l'état de charge de l'athlète : coût indépendant de la longueur de l'historique
+        """
         risk_score = 0.0
 
-        recent = workouts[-14:]  # 2 dernières semaines
-
-        # Fréquence excessive
-        if len(recent) > 10:
+        # Fréquence excessive (2 dernières semaines)
+        if load_state.window_count() > 10:
             risk_score += 25
 
         # Manque de variété
-        types = set([w.type for w in recent])
-        if len(types) < 2:
+        if load_state.window_distinct_types() < 2:
             risk_score += 20
 
         # Progression trop rapide
-        if len(workouts) >= 4:
-            old_avg = mean([w.distance for w in workouts[-4:-2]])
-            new_avg = mean([w.distance for w in workouts[-2:]])
+        distances = load_state.last_distances()
+        if load_state.workout_count >= 4 and len(distances) >= 4:
+            old_avg = np.mean(distances[-4:-2])
+            new_avg = np.mean(distances[-2:])
             if new_avg > old_avg * 1.3:  # +30% brutalement
                 risk_score += 30
 
         # Manque de récupération
-        recovery_workouts = [w for w in recent if w.type == "récupération"]
-        if len(recovery_workouts) == 0:
+        if load_state.window_recovery_count() == 0:
             risk_score += 15
 
+        # Charge aiguë trop élevée par rapport à la charge chronique
+        if self._has_acwr_spike(load_state):
+            risk_score += 20
+
         return min(100, risk_score)
 
+    def _has_acwr_spike(self, load_state: TrainingLoadState) -> bool:
+        """Pic de charge aiguë (ACWR au-delà du seuil, avec une charge chronique établie)"""
+        return load_state.history_days >= ACWR_MIN_HISTORY_DAYS and load_state.acwr > ACWR_RISK_THRESHOLD
+
     def _categorize_risk_level(self, risk_score: float) -> str:
         """Catégorisation du niveau de risque"""
         if risk_score < 30:
@@ -515,14 +602,23 @@ class AIAnalyticsService:
         else:
             return "high"
 
-    def _identify_injury_risk_factors(self, workouts: List[WorkoutData]) -> List[Dict[str, Any]]:
+    def _identify_injury_risk_factors(self, workouts: WorkoutFrame, load_state: TrainingLoadState) -> List[Dict[str, Any]]:
         """Identification détaillée des facteurs de risque"""
         risk_factors = []
 
+        # Pic de charge aiguë
+        if self._has_acwr_spike(load_state):
+            risk_factors.append({
+                "factor": "pic_de_charge",
+                "description": "Charge des 7 derniers jours très supérieure à la charge habituelle",
+                "severity": "high",
+                "value": f"ACWR {load_state.acwr:.2f}"
+            })
+
         recent = workouts[-10:]
 
         # Analyse de la charge d'entraînement
-        total_distance = sum([w.distance for w in recent])
+        total_distance = float(np.sum(recent.distance))
         if total_distance > 100:  # Plus de 100km en 10 sessions
             risk_factors.append({
                 "factor": "volume_élevé",
@@ -532,7 +628,7 @@ class AIAnalyticsService:
             })
 
         # Manque de diversité
-        types_count = len(set([w.type for w in recent]))
+        types_count = recent.distinct_types()
         if types_count < 2:
             risk_factors.append({
                 "factor": "manque_variété",
@@ -558,6 +654,8 @@ class AIAnalyticsService:
                 tips.append("Réduisez temporairement le volume hebdomadaire")
             elif factor["factor"] == "manque_variété":
                 tips.append("Diversifiez vos entraînements (endurance, vitesse, récupération)")
+            elif factor["factor"] == "pic_de_charge":
+                tips.append("Ramenez la charge hebdomadaire vers votre charge habituelle (ACWR entre 0.8 et 1.3)")
 
         return tips
 
@@ -576,27 +674,47 @@ class AIAnalyticsService:
 
         return actions
 
-    def _calculate_user_stats(self, workouts: List[WorkoutData]) -> Dict[str, Any]:
+    def _calculate_user_stats(self, workouts: WorkoutFrame) -> Dict[str, Any]:
         """Calcul des statistiques utilisateur pour comparaison"""
         if not workouts:
             return {}
 
-        distances = [w.distance for w in workouts]
-        paces = [self._pace_to_seconds(w.pace) for w in workouts]
+        distances = workouts.distance
+        paces = workouts.pace_seconds
 
         return {
-            "average_distance": mean(distances),
-            "max_distance": max(distances),
-            "average_pace": mean(paces),
-            "best_pace": min(paces),
+            "average_distance": float(np.mean(distances)),
+            "max_distance": float(np.max(distances)),
+            "average_pace": float(np.mean(paces)),
+            "best_pace": float(np.min(paces)),
             "total_workouts": len(workouts),
-            "weekly_volume": mean(distances) * 7 / 7  # Estimation
+            "weekly_volume": float(np.mean(distances)) * 7 / 7  # Estimation
         }
 
-    def _calculate_percentile(self, user_stats: Dict[str, Any], benchmarks: Dict[str, Any], age: int, gender: str) -> float:
+    def _benchmark_position(self, workouts: WorkoutFrame, age: int, gender: str) -> Optional[Tuple[float, str]]:
+        """
+        Percentile et niveau de la meilleure performance (séances d'au moins MIN_BENCHMARK_DISTANCE)
+        dans le groupe âge / genre des tables de référence, toutes les séances recherchées en un appel
+        """
+        if self.benchmark_tables is None or not workouts:
+            return None
+        eligible = workouts.distance >= MIN_BENCHMARK_DISTANCE
+        if not eligible.any():
+            return None
+
+        distances = workouts.distance[eligible]
+        times = distances * workouts.pace_seconds[eligible]
+        percentiles = self.benchmark_tables.percentiles(distances, times, age, gender)
+        best = int(np.argmax(percentiles))
+        level = self.benchmark_tables.levels(distances[best], times[best], age, gender)[0]
+        return round(float(percentiles[best]), 1), level
+
+    def _calculate_percentile(self, user_stats: Dict[str, Any], position: Optional[Tuple[float, str]]) -> float:
         """Calcul du percentile par rapport à la population"""
-        # Simulation de calcul de percentile
-        # Dans une vraie implémentation, on comparerait aux données Kaggle
+        if position is not None:
+            return position[0]
+
+        # Sans tables de référence ni séance comparable : estimation à partir des statistiques
         base_percentile = 50.0
 
         if user_stats.get("average_distance", 0) > 8:
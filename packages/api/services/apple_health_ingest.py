@@ -0,0 +1,346 @@
+import os
+import sys
+import time
+import logging
+import zipfile
+import posixpath
+import xml.etree.ElementTree as ET
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+from datetime import datetime
+
+from models.workout import WorkoutData, WorkoutType
+from .gpx_route import GpxTrack
+
+logger = logging.getLogger(__name__)
+
+RUNNING_ACTIVITY_TYPE = "HKWorkoutActivityTypeRunning"
+APPLE_HEALTH_DATE_FORMAT = "%Y-%m-%d %H:%M:%S %z"
+
+# Conversions d'unités Apple Health vers km / minutes
+DISTANCE_UNITS_TO_KM = {"km": 1.0, "m": 0.001, "mi": 1.609344, "ft": 0.0003048}
+DURATION_UNITS_TO_MIN = {"min": 1.0, "s": 1 / 60, "h": 60.0}
+
+# Traces GPX en cours de décodage par worker : borne les courses en attente et les traces en mémoire
+ROUTES_IN_FLIGHT_PER_WORKER = 2
+
+
+def _summarize_route_bytes(data: bytes) -> Dict[str, Any]:
+    """
+    Décodage d'une trace GPX dans un processus worker
+    Seul le résumé compact est renvoyé au parent, jamais les tableaux de points
+    """
+    try:
+        return GpxTrack.from_bytes(data).route_summary()
+    except Exception as e:
+        return {"error": str(e)}
+
+
+class _CountingReader:
+    """
+    Enveloppe de fichier binaire qui compte les octets lus (pour le débit en MB/s)
+    """
+
+    def __init__(self, stream: BinaryIO):
+        self.stream = stream
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self.stream.read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+class IngestStats:
+    """
+    Statistiques de débit d'un import Apple Health
+    """
+
+    def __init__(self):
+        self.bytes_read = 0
+        self.records_scanned = 0
+        self.workouts_emitted = 0
+        self.started_at = time.perf_counter()
+        self.elapsed_seconds = 0.0
+
+    def stop(self, bytes_read: int) -> None:
+        self.bytes_read = bytes_read
+        self.elapsed_seconds = time.perf_counter() - self.started_at
+
+    @property
+    def mb_per_second(self) -> float:
+        return (self.bytes_read / 1_000_000) / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    @property
+    def records_per_second(self) -> float:
+        return self.records_scanned / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    @property
+    def workouts_per_second(self) -> float:
+        return self.workouts_emitted / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "bytes_read": self.bytes_read,
+            "records_scanned": self.records_scanned,
+            "workouts_emitted": self.workouts_emitted,
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "mb_per_second": round(self.mb_per_second, 2),
+            "records_per_second": round(self.records_per_second, 1),
+            "workouts_per_second": round(self.workouts_per_second, 1)
+        }
+
+
+class AppleHealthIngestService:
+    """
+    Import en streaming des exports Apple Health (export.xml)
+    Mémoire constante quelle que soit la taille du fichier : chaque élément
+    de premier niveau est libéré dès qu'il a été traité
+    """
+
+    def __init__(self):
+        self.last_stats: Optional[IngestStats] = None
+
+    def iter_workouts(self, source: Union[str, os.PathLike, BinaryIO]) -> Iterator[WorkoutData]:
+        """
+        Parcours en streaming d'un export.xml et émission des courses à pied en WorkoutData
+        Les statistiques de débit sont disponibles dans self.last_stats à la fin du parcours
+        """
+        for workout, _ in self._iter_running_workouts(source):
+            yield workout
+
+    def iter_workouts_from_zip(
+        self,
+        source: Union[str, os.PathLike, BinaryIO],
+        max_workers: Optional[int] = None
+    ) -> Iterator[WorkoutData]:
+        """
+        Import direct d'une archive d'export Apple Health, sans extraction sur disque
+        export.xml est lu en streaming depuis l'archive ; la trace GPX de chaque course est
+        décodée sur un pool de processus (décodage limité par le GIL dans un thread) pendant
+        que la lecture continue. Au plus max_workers * ROUTES_IN_FLIGHT_PER_WORKER courses
+        attendent leur trace : la mémoire reste bornée et seules les traces rapprochées
+        d'une course sont décodées. Les courses sont émises dans l'ordre du fichier
+        """
+        with zipfile.ZipFile(source) as archive:
+            export_member = self._find_export_member(archive)
+            # Clé de rapprochement (nom de fichier puis date de début) -> membre de l'archive
+            route_members: Dict[str, str] = {}
+            for name in archive.namelist():
+                if "workout-routes/" in name and name.lower().endswith(".gpx"):
+                    route_members[posixpath.basename(name)] = name
+                    route_members.setdefault(self._route_date_key(name), name)
+
+            workers = max_workers or os.cpu_count() or 1
+            pool = ProcessPoolExecutor(max_workers=workers) if route_members else None
+            pending: deque = deque()
+            try:
+                with archive.open(export_member) as export_stream:
+                    for workout, route_keys in self._iter_running_workouts(export_stream):
+                        member = next((route_members[key] for key in route_keys if key in route_members), None)
+                        future = pool.submit(_summarize_route_bytes, archive.read(member)) if member else None
+                        pending.append((workout, member, future))
+                        if len(pending) > workers * ROUTES_IN_FLIGHT_PER_WORKER:
+                            yield self._merge_pending_route(*pending.popleft())
+                while pending:
+                    yield self._merge_pending_route(*pending.popleft())
+            finally:
+                if pool is not None:
+                    pool.shutdown(cancel_futures=True)
+
+    def _find_export_member(self, archive: zipfile.ZipFile) -> str:
+        """Localisation du fichier export.xml dans l'archive"""
+        xml_members = [
+            name for name in archive.namelist()
+            if name.lower().endswith(".xml") and "workout-routes/" not in name
+        ]
+        for name in xml_members:
+            if posixpath.basename(name) == "export.xml":
+                return name
+
+        candidates = [name for name in xml_members if "cda" not in posixpath.basename(name).lower()]
+        if not candidates:
+            raise ValueError("Aucun fichier export.xml trouvé dans l'archive")
+        return candidates[0]
+
+    def _merge_pending_route(self, workout: WorkoutData, member: Optional[str], future: Optional[Future]) -> WorkoutData:
+        """Attente du résumé de la trace d'une course puis fusion"""
+        if future is None:
+            return workout
+        route_summary = future.result()
+        if "error" in route_summary:
+            logger.warning(f"Trace GPX illisible {member}: {route_summary['error']}")
+            return workout
+        return self._merge_route_summary(workout, route_summary)
+
+    def _merge_route_summary(self, workout: WorkoutData, route_summary: Optional[Dict[str, Any]]) -> WorkoutData:
+        """Complète un entraînement avec les données de sa trace GPX"""
+        if not route_summary:
+            return workout
+
+        updates = {
+            field: value for field, value in route_summary.items()
+            if field in WorkoutData.model_fields and value is not None and getattr(workout, field) is None
+        }
+        return workout.model_copy(update=updates) if updates else workout
+
+    def _route_date_key(self, name_or_date: str) -> str:
+        """
+        Clé de rapprochement trace/entraînement basée sur la date de début
+        (route_2024-01-15_08-00-00_1.gpx <-> startDate="2024-01-15 08:00:00 +0100")
+        """
+        base = posixpath.basename(name_or_date)
+        if base.startswith("route_"):
+            return base[len("route_"):len("route_") + 19]
+        return name_or_date[:19].replace(" ", "_").replace(":", "-")
+
+    def _iter_running_workouts(
+        self,
+        source: Union[str, os.PathLike, BinaryIO]
+    ) -> Iterator[Tuple[WorkoutData, List[str]]]:
+        """
+        Parcours en streaming d'un export.xml
+        Émet chaque course avec ses clés de rapprochement de trace GPX
+        """
+        stats = IngestStats()
+        self.last_stats = stats
+
+        stream = open(source, "rb") if isinstance(source, (str, os.PathLike)) else source
+        reader = _CountingReader(stream)
+
+        try:
+            depth = 0
+            root = None
+
+            for event, elem in ET.iterparse(reader, events=("start", "end")):
+                if event == "start":
+                    if root is None:
+                        root = elem
+                    depth += 1
+                    continue
+
+                depth -= 1
+                if depth != 1:
+                    continue
+
+                # Élément de premier niveau terminé (Record, Workout, ActivitySummary...)
+                stats.records_scanned += 1
+                if elem.tag == "Workout" and elem.get("workoutActivityType") == RUNNING_ACTIVITY_TYPE:
+                    workout = self._workout_from_element(elem)
+                    if workout is not None:
+                        stats.workouts_emitted += 1
+                        yield workout, self._route_keys_from_element(elem)
+
+                # Libérer tout ce qui a été accumulé sous la racine
+                root.clear()
+        finally:
+            stats.stop(reader.bytes_read)
+            if stream is not source:
+                stream.close()
+
+        logger.info(
+            f"Import Apple Health: {stats.workouts_emitted} courses / {stats.records_scanned} entrées "
+            f"en {stats.elapsed_seconds:.2f}s ({stats.mb_per_second:.1f} MB/s, "
+            f"{stats.records_per_second:.0f} entrées/s)"
+        )
+
+    def _route_keys_from_element(self, elem: ET.Element) -> List[str]:
+        """Clés des traces GPX associées à un <Workout> (FileReference puis date de début)"""
+        keys = [
+            posixpath.basename(reference.get("path", ""))
+            for reference in elem.iter("FileReference")
+        ]
+        keys.append(self._route_date_key(elem.get("startDate", "")))
+        return keys
+
+    def _workout_from_element(self, elem: ET.Element) -> Optional[WorkoutData]:
+        """Conversion d'un élément <Workout> en WorkoutData (None si inexploitable)"""
+        start_date = elem.get("startDate")
+        end_date = elem.get("endDate")
+        if not start_date:
+            return None
+
+        try:
+            date = datetime.strptime(start_date, APPLE_HEALTH_DATE_FORMAT)
+        except ValueError:
+            return None
+
+        duration_min = self._to_float(elem.get("duration")) * DURATION_UNITS_TO_MIN.get(elem.get("durationUnit", "min"), 1.0)
+        distance_km = self._to_float(elem.get("totalDistance")) * DISTANCE_UNITS_TO_KM.get(elem.get("totalDistanceUnit", "km"), 1.0)
+        calories = self._to_float(elem.get("totalEnergyBurned"))
+
+        heart_rate = None
+        elevation_gain = None
+        weather = {}
+
+        for child in elem:
+            if child.tag == "WorkoutStatistics":
+                stat_type = child.get("type")
+                if stat_type == "HKQuantityTypeIdentifierHeartRate":
+                    heart_rate = self._to_float(child.get("average")) or None
+                elif stat_type == "HKQuantityTypeIdentifierDistanceWalkingRunning" and not distance_km:
+                    distance_km = self._to_float(child.get("sum")) * DISTANCE_UNITS_TO_KM.get(child.get("unit", "km"), 1.0)
+                elif stat_type == "HKQuantityTypeIdentifierActiveEnergyBurned" and not calories:
+                    calories = self._to_float(child.get("sum"))
+            elif child.tag == "MetadataEntry":
+                key = child.get("key", "")
+                value = child.get("value", "")
+                if key == "HKElevationAscended":
+                    # Valeur du type "1234 cm"
+                    elevation_gain = self._to_float(value.split(" ")[0]) / 100
+                elif key == "HKMetadataKeyWeatherCondition":
+                    weather["condition"] = value.replace("HKWeatherCondition", "")
+                elif key == "HKMetadataKeyWeatherTemperature":
+                    weather["temperature"] = self._to_float(value.split(" ")[0])
+                elif key == "HKMetadataKeyWeatherHumidity":
+                    weather["humidity"] = self._to_float(value.split(" ")[0])
+
+        if distance_km <= 0 or duration_min <= 0:
+            return None
+
+        pace_seconds = int(round(duration_min * 60 / distance_km))
+
+        return WorkoutData(
+            id=f"workout_{start_date}_{end_date}",
+            date=date.isoformat(),
+            type=self._classify_workout(distance_km, pace_seconds),
+            duration=int(round(duration_min)),
+            distance=round(distance_km, 2),
+            pace=f"{pace_seconds // 60}:{pace_seconds % 60:02d}",
+            heart_rate=int(round(heart_rate)) if heart_rate else None,
+            calories=int(round(calories)) if calories else None,
+            elevation_gain=elevation_gain,
+            weather=weather or None
+        )
+
+    def _classify_workout(self, distance_km: float, pace_seconds: int) -> WorkoutType:
+        """Classification du type de séance (mêmes seuils que le parser TypeScript)"""
+        if distance_km > 15:
+            return WorkoutType.endurance
+        elif pace_seconds < 300:
+            return WorkoutType.fractionne
+        elif pace_seconds > 400:
+            return WorkoutType.recuperation
+        else:
+            return WorkoutType.endurance
+
+    def _to_float(self, value: Optional[str]) -> float:
+        """Conversion tolérante d'un attribut numérique (0 si absent ou invalide)"""
+        try:
+            return float(value) if value else 0.0
+        except ValueError:
+            return 0.0
+
+
+if __name__ == "__main__":
+    # Mesure du débit d'import : python -m services.apple_health_ingest export.xml|export.zip
+    logging.basicConfig(level=logging.INFO)
+    service = AppleHealthIngestService()
+    if zipfile.is_zipfile(sys.argv[1]):
+        workouts = service.iter_workouts_from_zip(sys.argv[1])
+    else:
+        workouts = service.iter_workouts(sys.argv[1])
+    for _ in workouts:
+        pass
+    print(service.last_stats.as_dict())
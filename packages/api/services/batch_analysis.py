@@ -0,0 +1,149 @@
+import os
+import time
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from models.workout_frame import WorkoutFrame
+from models.workout_codec import workout_frame_from_python
+
+logger = logging.getLogger(__name__)
+
+CHUNKS_PER_WORKER = 4  # Découpage pour équilibrer la charge sans trop d'aller-retours IPC
+
+# Analyses disponibles en lot : nom exposé (endpoint /analyze/...) -> méthode de AIAnalyticsService
+BATCH_ANALYSES = {
+    "workout": "analyze_workout",
+    "performance-trend": "analyze_performance_trend",
+    "training-zones": "analyze_training_zones",
+    "injury-risk": "analyze_injury_risk",
+}
+
+# Service d'analyse propre à chaque processus worker (créé au premier paquet)
+_worker_service = None
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _analyze_athlete(athlete_id: str, workouts: Any, analyses: Sequence[str]) -> Dict[str, Any]:
+    """
+    Validation puis analyses de l'historique d'un athlète dans le worker
+    Une erreur (historique invalide ou analyse en échec) n'affecte que cet athlète
+    """
+    global _worker_service, _worker_loop
+    if _worker_service is None:
+        from services.ai_analytics import AIAnalyticsService
+        _worker_service = AIAnalyticsService()
+        _worker_loop = asyncio.new_event_loop()
+
+    started_at = time.perf_counter()
+    try:
+        workouts = workout_frame_from_python(workouts).chronological()
+        results = {}
+        for name in analyses:
+            method = getattr(_worker_service, BATCH_ANALYSES[name])
+            result = _worker_loop.run_until_complete(method(workouts))
+            results[name] = result.model_dump(mode="json") if hasattr(result, "model_dump") else result
+        return {
+            "athlete_id": athlete_id,
+            "status": "ok",
+            "results": results,
+            "duration_ms": round((time.perf_counter() - started_at) * 1000, 2)
+        }
+    except Exception as e:
+        return {"athlete_id": athlete_id, "status": "error", "error": f"{type(e).__name__}: {e}"}
+
+
+def _analyze_chunk(chunk: List[Tuple[str, Any]], analyses: Sequence[str]) -> List[Dict[str, Any]]:
+    """
+    Traitement d'un paquet d'athlètes dans un processus worker
+    Seuls les résultats sérialisés (dict JSON) reviennent au parent
+    """
+    return [_analyze_athlete(athlete_id, workouts, analyses) for athlete_id, workouts in chunk]
+
+
+class BatchAnalysisService:
+    """
+    Analyses de nombreux athlètes en un appel (analyses nocturnes des clubs)
+    Les athlètes sont répartis par paquets sur un pool de processus persistant
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or int(os.getenv("BATCH_MAX_WORKERS", 0)) or os.cpu_count() or 1
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._pool
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    async def analyze_athletes(
+        self,
+        athletes: Sequence[Tuple[str, Union[WorkoutFrame, List[Dict[str, Any]], Dict[str, List[Any]]]]],
+        analyses: Optional[Sequence[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Analyses par athlète réparties sur le pool de processus
+        athletes : (athlete_id, historique en WorkoutFrame, liste de WorkoutData ou colonnes)
+        analyses : noms de BATCH_ANALYSES, toutes par défaut
+        Retourne les résultats dans l'ordre des athlètes reçus, avec un statut par athlète
+        """
+        analyses = list(analyses or BATCH_ANALYSES)
+        unknown = [name for name in analyses if name not in BATCH_ANALYSES]
+        if unknown:
+            raise ValueError(f"Analyses inconnues: {', '.join(unknown)}")
+
+        total = len(athletes)
+        started_at = time.perf_counter()
+        if not total:
+            return self._summary([], 0, started_at)
+
+        workers = min(self.max_workers, total)
+        chunksize = max(1, total // (workers * CHUNKS_PER_WORKER))
+        chunks = [list(athletes[start:start + chunksize]) for start in range(0, total, chunksize)]
+
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        outcomes = await asyncio.gather(
+            *(loop.run_in_executor(pool, _analyze_chunk, chunk, analyses) for chunk in chunks),
+            return_exceptions=True
+        )
+
+        results: List[Dict[str, Any]] = []
+        for chunk, outcome in zip(chunks, outcomes):
+            if isinstance(outcome, BaseException):
+                # Worker perdu (crash, mémoire) : seuls les athlètes de ce paquet échouent
+                logger.error(f"Paquet d'analyse en échec ({len(chunk)} athlètes): {outcome!r}")
+                if isinstance(outcome, BrokenProcessPool):
+                    self._pool = None
+                results.extend(
+                    {"athlete_id": athlete_id, "status": "error", "error": f"{type(outcome).__name__}: {outcome}"}
+                    for athlete_id, _ in chunk
+                )
+            else:
+                results.extend(outcome)
+
+        return self._summary(results, workers, started_at)
+
+    def _summary(self, results: List[Dict[str, Any]], workers: int, started_at: float) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - started_at
+        failed = sum(1 for result in results if result["status"] != "ok")
+        if results:
+            logger.info(
+                f"Analyse par lot: {len(results) - failed}/{len(results)} athlètes réussis "
+                f"en {elapsed:.2f}s sur {workers} workers ({len(results) / elapsed:.0f} athlètes/s)"
+            )
+        return {
+            "athletes": results,
+            "total": len(results),
+            "succeeded": len(results) - failed,
+            "failed": failed,
+            "workers": workers,
+            "duration_ms": round(elapsed * 1000, 2)
+        }
@@ -0,0 +1,251 @@
+import os
+import sys
+import asyncio
+import json
+import mmap
+import time
+import struct
+import logging
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
+
+import numpy as np
+
+from .benchmark_tables import BenchmarkTables
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_DIR = "data/benchmarks"
+DEFAULT_POLL_SECONDS = 5.0
+# Âge au-delà duquel un instantané est reconstruit (BENCHMARK_MAX_AGE_DAYS)
+DEFAULT_MAX_AGE_DAYS = 7
+
+SNAPSHOT_FILE = "benchmarks.snapshot"
+LOCK_FILE = "benchmarks.lock"
+# Intervalle entre deux tentatives de prise du verrou depuis la boucle d'événements (secondes)
+LOCK_POLL_SECONDS = 0.05
+
+# Format : MAGIC | longueur de l'en-tête (uint64) | en-tête JSON | tableaux alignés sur ALIGNMENT octets
+# L'en-tête contient la version, la date, les données de référence et la position des tables compilées
+MAGIC = b"RCBENCH1"
+PREFIX = struct.Struct("<8sQ")
+ALIGNMENT = 64
+TABLE_ARRAYS = ("distances", "age_floors", "times")
+
+
+def _aligned(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+class BenchmarkSnapshot:
+    """
+    Version des données de référence lue depuis le fichier d'instantané projeté en mémoire (lecture seule)
+    Les tables numériques sont des vues NumPy sur les pages du fichier, partagées par tous les workers
+    """
+
+    __slots__ = ("version", "created_at", "benchmarks", "tables", "file_bytes", "_buffer")
+
+    def __init__(
+        self, version: int, created_at: datetime, benchmarks: Dict[str, Any],
+        tables: Optional[BenchmarkTables], file_bytes: int, buffer: Optional[mmap.mmap] = None
+    ):
+        self.version = version
+        self.created_at = created_at
+        self.benchmarks = benchmarks
+        self.tables = tables
+        self.file_bytes = file_bytes
+        self._buffer = buffer
+
+    @classmethod
+    def open(cls, path: str) -> "BenchmarkSnapshot":
+        with open(path, "rb") as snapshot_file:
+            buffer = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, header_length = PREFIX.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Instantané de référence invalide: {path}")
+        header = json.loads(buffer[PREFIX.size:PREFIX.size + header_length])
+
+        tables = None
+        if header["tables"] is not None:
+            data_start = _aligned(PREFIX.size + header_length)
+            arrays = {
+                name: np.frombuffer(
+                    buffer, dtype=layout["dtype"], count=int(np.prod(layout["shape"])), offset=data_start + layout["offset"]
+                ).reshape(layout["shape"])
+                for name, layout in header["tables"]["arrays"].items()
+            }
+            tables = BenchmarkTables(arrays["distances"], arrays["age_floors"], header["tables"]["age_labels"], arrays["times"])
+
+        return cls(
+            header["version"], datetime.fromisoformat(header["created_at"]),
+            header["benchmarks"], tables, len(buffer), buffer
+        )
+
+    def is_expired(self, max_age_days: float) -> bool:
+        return (datetime.now() - self.created_at).total_seconds() >= max_age_days * 86400
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "created_at": self.created_at.isoformat(),
+            "file_bytes": self.file_bytes,
+            "tables": self.tables is not None
+        }
+
+
+class BenchmarkStore:
+    """
+    Instantané versionné des données de référence partagé par les workers (BENCHMARK_STORE_DIR)
+    - un seul fichier : données de référence (JSON compact) et tables compilées (tableaux alignés),
+      projeté en mémoire en lecture seule par chaque processus
+    - une nouvelle version est écrite dans un fichier temporaire puis remplace l'ancienne par
+      renommage atomique ; les workers la détectent à leur vérification suivante (BENCHMARK_POLL)
+      sans redémarrage, les lectures en cours gardent l'ancienne projection
+    - les reconstructions sont sérialisées par un verrou de fichier : un seul worker écrit
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or os.getenv("BENCHMARK_STORE_DIR", DEFAULT_STORE_DIR)
+        self.path = os.path.join(self.root, SNAPSHOT_FILE)
+        self.poll_seconds = float(os.getenv("BENCHMARK_POLL", DEFAULT_POLL_SECONDS))
+        self.max_age_days = float(os.getenv("BENCHMARK_MAX_AGE_DAYS", DEFAULT_MAX_AGE_DAYS))
+        os.makedirs(self.root, exist_ok=True)
+
+        self._snapshot: Optional[BenchmarkSnapshot] = None
+        self._file_key: Optional[tuple] = None
+        self._checked_at = float("-inf")
+        self._reload_lock = threading.Lock()
+        self.loads = 0
+
+    def current(self, force: bool = False) -> Optional[BenchmarkSnapshot]:
+        """
+        Instantané actif ; le fichier est vérifié au plus toutes les poll_seconds
+        (identité inode / date / taille) et reprojeté seulement s'il a été remplacé
+        """
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.poll_seconds:
+            return self._snapshot
+
+        with self._reload_lock:
+            if not force and now - self._checked_at < self.poll_seconds:
+                return self._snapshot
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                self._snapshot, self._file_key = None, None
+            else:
+                file_key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+                if file_key != self._file_key:
+                    snapshot = BenchmarkSnapshot.open(self.path)
+                    if self._snapshot is not None and snapshot.version != self._snapshot.version:
+                        logger.info(f"Données de référence: passage à la version {snapshot.version}")
+                    self._snapshot, self._file_key = snapshot, file_key
+                    self.loads += 1
+            self._checked_at = time.monotonic()
+            return self._snapshot
+
+    @contextmanager
+    def writer_lock(self) -> Iterator[None]:
+        """Verrou exclusif entre processus (et threads) pour la reconstruction de l'instantané"""
+        import fcntl
+
+        descriptor = os.open(os.path.join(self.root, LOCK_FILE), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(descriptor, fcntl.LOCK_EX)
+            yield
+        finally:
+            fcntl.flock(descriptor, fcntl.LOCK_UN)
+            os.close(descriptor)
+
+    @asynccontextmanager
+    async def async_writer_lock(self) -> AsyncIterator[None]:
+        """
+        Même verrou que writer_lock, pris depuis la boucle d'événements sans la bloquer :
+        tentatives non bloquantes espacées de LOCK_POLL_SECONDS (annulable pendant l'attente)
+        """
+        import fcntl
+
+        descriptor = os.open(os.path.join(self.root, LOCK_FILE), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            while True:
+                try:
+                    fcntl.flock(descriptor, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    await asyncio.sleep(LOCK_POLL_SECONDS)
+            try:
+                yield
+            finally:
+                fcntl.flock(descriptor, fcntl.LOCK_UN)
+        finally:
+            os.close(descriptor)
+
+    def publish(self, benchmarks: Dict[str, Any]) -> BenchmarkSnapshot:
+        """
+        Écriture d'une nouvelle version (tables compilées une fois ici) puis remplacement atomique
+        À appeler sous writer_lock si plusieurs écrivains sont possibles
+        """
+        current = self.current(force=True)
+        version = current.version + 1 if current is not None else 1
+        tables = BenchmarkTables.compile(benchmarks)
+
+        arrays: Dict[str, np.ndarray] = {}
+        table_header = None
+        if tables is not None:
+            arrays = {name: np.ascontiguousarray(getattr(tables, name), dtype="<f8") for name in TABLE_ARRAYS}
+            layouts, offset = {}, 0
+            for name, array in arrays.items():
+                layouts[name] = {"offset": offset, "shape": list(array.shape), "dtype": array.dtype.str}
+                offset = _aligned(offset + array.nbytes)
+            table_header = {"age_labels": list(tables.age_labels), "arrays": layouts}
+
+        header = json.dumps(
+            {
+                "version": version,
+                "created_at": datetime.now().isoformat(),
+                "benchmarks": benchmarks,
+                "tables": table_header
+            },
+            separators=(",", ":"), default=str
+        ).encode("utf-8")
+
+        temporary = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temporary, "wb") as snapshot_file:
+                snapshot_file.write(PREFIX.pack(MAGIC, len(header)))
+                snapshot_file.write(header)
+                data_start = _aligned(PREFIX.size + len(header))
+                for name, array in arrays.items():
+                    snapshot_file.seek(data_start + table_header["arrays"][name]["offset"])
+                    snapshot_file.write(array.tobytes())
+                snapshot_file.flush()
+                os.fsync(snapshot_file.fileno())
+            os.replace(temporary, self.path)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+
+        logger.info(f"Données de référence: version {version} publiée ({os.path.getsize(self.path)} octets)")
+        return self.current(force=True)
+
+    def metrics(self) -> Dict[str, Any]:
+        snapshot = self.current()
+        return {
+            "snapshot": snapshot.summary() if snapshot is not None else None,
+            "loads": self.loads,
+            "poll_seconds": self.poll_seconds,
+            "max_age_days": self.max_age_days
+        }
+
+
+if __name__ == "__main__":
+    # Lancement : python -m services.benchmark_store donnees.json (publie une nouvelle version)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    with open(sys.argv[1], "r", encoding="utf-8") as source:
+        data = json.load(source)
+    store = BenchmarkStore()
+    with store.writer_lock():
+        print(json.dumps(store.publish(data).summary()))
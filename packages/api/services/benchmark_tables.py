@@ -0,0 +1,148 @@
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Niveaux des running_benchmarks, du plus rapide au plus lent, et percentile de population associé
+# (part des coureurs du groupe plus lents que ce temps)
+BENCHMARK_LEVELS = ("excellent", "good", "average", "below_average")
+LEVEL_PERCENTILES = np.array([95.0, 75.0, 50.0, 25.0])
+PERCENTILE_BOUNDS = (1.0, 99.0)
+
+# Distances (km) des tables "<distance>_times"
+BENCHMARK_DISTANCES = {"5k": 5.0, "10k": 10.0, "half_marathon": 21.0975, "marathon": 42.195}
+
+# Genres des tables ; tout autre genre utilise la moyenne des tables connues
+GENDERS = ("male", "female")
+GENDER_ALIASES = {
+    "male": "male", "m": "male", "man": "male", "h": "male", "homme": "male",
+    "female": "female", "f": "female", "woman": "female", "femme": "female"
+}
+
+# Conversion d'un temps vers une autre distance (formule de Riegel)
+RIEGEL_EXPONENT = 1.06
+
+
+def parse_race_time(value: Union[str, float, int]) -> float:
+    """Temps "mm:ss" ou "h:mm:ss" (ou nombre de secondes) -> secondes"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    seconds = 0.0
+    for part in value.strip().split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def _age_bracket_floor(label: str) -> float:
+    """Borne basse d'une tranche d'âge "20-30" ou "50+" """
+    return float(label.rstrip("+").split("-")[0])
+
+
+class BenchmarkTables:
+    """
+    Tables numériques compilées depuis running_benchmarks, une seule fois au chargement :
+    times[distance, genre, tranche d'âge, niveau] en secondes, par niveau du plus rapide au plus lent
+    (dernier indice de genre : moyenne des genres). Une recherche = un accès au tableau
+    puis une interpolation linéaire entre les deux niveaux qui encadrent le temps ;
+    toutes les fonctions acceptent des tableaux (plusieurs athlètes ou performances à la fois)
+    """
+
+    __slots__ = ("distances", "age_floors", "age_labels", "times")
+
+    def __init__(self, distances: np.ndarray, age_floors: np.ndarray, age_labels: Sequence[str], times: np.ndarray):
+        self.distances = distances
+        self.age_floors = age_floors
+        self.age_labels = tuple(age_labels)
+        self.times = times
+
+    @classmethod
+    def compile(cls, benchmarks: Dict[str, Any]) -> Optional["BenchmarkTables"]:
+        """
+        Compilation des tables "<distance>_times" -> genre -> tranche d'âge -> niveau -> "h:mm:ss"
+        None si les données de référence n'en contiennent pas
+        """
+        running = benchmarks.get("running_benchmarks") or {}
+        tables = {
+            BENCHMARK_DISTANCES[name[:-len("_times")]]: table
+            for name, table in running.items()
+            if name.endswith("_times") and name[:-len("_times")] in BENCHMARK_DISTANCES
+        }
+        if not tables:
+            return None
+
+        distances = np.array(sorted(tables))
+        age_labels = sorted(
+            {
+                label for table in tables.values() for gender, brackets in table.items()
+                if gender.lower() in GENDER_ALIASES for label in brackets
+            },
+            key=_age_bracket_floor
+        )
+        times = np.full((len(distances), len(GENDERS) + 1, len(age_labels), len(BENCHMARK_LEVELS)), np.nan)
+        for distance_index, distance in enumerate(distances):
+            for gender, brackets in tables[distance].items():
+                canonical = GENDER_ALIASES.get(gender.lower())
+                if canonical is None:
+                    # Genre sans table propre : couvert par la moyenne des genres connus
+                    logger.warning(f"Tables de référence: genre inconnu ignoré ({gender})")
+                    continue
+                gender_index = GENDERS.index(canonical)
+                for label, levels in brackets.items():
+                    times[distance_index, gender_index, age_labels.index(label)] = [
+                        parse_race_time(levels[level]) for level in BENCHMARK_LEVELS
+                    ]
+        times[:, len(GENDERS)] = np.nanmean(times[:, :len(GENDERS)], axis=1)
+        if np.isnan(times).any():
+            raise ValueError("Tables de référence incomplètes (genre, tranche d'âge ou niveau manquant)")
+
+        logger.info(f"Tables de référence compilées: {len(distances)} distances, {len(age_labels)} tranches d'âge")
+        return cls(distances, np.array([_age_bracket_floor(label) for label in age_labels]), age_labels, times)
+
+    def _lookup(self, distances: Any, times: Any, ages: Any, genders: Union[str, Sequence[str]]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Temps ramenés à la distance de table la plus proche (Riegel)
+        et temps de référence de chaque niveau pour le groupe âge / genre : (n,), (n, niveaux)
+        """
+        distances, times, ages = np.broadcast_arrays(
+            np.atleast_1d(np.asarray(distances, dtype=float)),
+            np.atleast_1d(np.asarray(times, dtype=float)),
+            np.atleast_1d(np.asarray(ages, dtype=float))
+        )
+        gender_index = np.broadcast_to(self.gender_indices(genders), distances.shape)
+        nearest = np.abs(np.log(distances[:, None] / self.distances[None, :])).argmin(axis=1)
+        equivalent = times * (self.distances[nearest] / distances) ** RIEGEL_EXPONENT
+        age_index = np.clip(np.searchsorted(self.age_floors, ages, side="right") - 1, 0, len(self.age_floors) - 1)
+        return equivalent, self.times[nearest, gender_index, age_index]
+
+    @staticmethod
+    def gender_indices(genders: Union[str, Sequence[str]]) -> np.ndarray:
+        """Genres -> indices des tables (genre inconnu : moyenne des genres)"""
+        genders = [genders] if isinstance(genders, str) else genders
+        return np.array([
+            GENDERS.index(GENDER_ALIASES[gender.lower()]) if gender and gender.lower() in GENDER_ALIASES else len(GENDERS)
+            for gender in genders
+        ], dtype=np.intp)
+
+    def percentiles(self, distances: Any, times: Any, ages: Any, genders: Union[str, Sequence[str]]) -> np.ndarray:
+        """
+        Percentiles de performances (distance en km, temps en secondes) dans le groupe âge / genre
+        Interpolation entre les deux niveaux encadrants, extrapolation au-delà (bornée à PERCENTILE_BOUNDS)
+        """
+        equivalent, anchors = self._lookup(distances, times, ages, genders)
+
+        # Segment [niveau k-1, niveau k] qui encadre le temps (segments extrêmes prolongés)
+        upper = np.clip((anchors < equivalent[:, None]).sum(axis=1), 1, len(BENCHMARK_LEVELS) - 1)
+        rows = np.arange(anchors.shape[0])
+        faster, slower = anchors[rows, upper - 1], anchors[rows, upper]
+        gap = slower - faster
+        share = np.divide(equivalent - faster, gap, out=np.zeros_like(gap), where=gap > 0)
+        percentiles = LEVEL_PERCENTILES[upper - 1] + share * (LEVEL_PERCENTILES[upper] - LEVEL_PERCENTILES[upper - 1])
+        return np.clip(percentiles, *PERCENTILE_BOUNDS)
+
+    def levels(self, distances: Any, times: Any, ages: Any, genders: Union[str, Sequence[str]]) -> List[str]:
+        """Niveau atteint : le plus exigeant dont le temps de référence est égalé ou battu"""
+        equivalent, anchors = self._lookup(distances, times, ages, genders)
+        reached = np.minimum((anchors < equivalent[:, None]).sum(axis=1), len(BENCHMARK_LEVELS) - 1)
+        return [BENCHMARK_LEVELS[index] for index in reached]
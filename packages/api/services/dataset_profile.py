@@ -0,0 +1,418 @@
+import os
+import sys
+import json
+import math
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Colonnes exploitées des datasets de résultats de course
+NUMERIC_COLUMNS = ("pace", "distance", "age")
+GENDER_COLUMN = "gender"
+PROFILE_COLUMNS = NUMERIC_COLUMNS + (GENDER_COLUMN,)
+STATISTIC_COLUMNS = ("pace", "distance")
+
+PERCENTILES = (0.25, 0.5, 0.75, 0.9, 0.95)
+
+# Tranches d'âge de _analyze_demographics : intervalles ]0, 25], ]25, 35], ... ]55, 100]
+AGE_BOUNDS = np.array([25, 35, 45, 55, 100])
+AGE_LABELS = ("<25", "25-34", "35-44", "45-54", "55+")
+
+# Lignes lues par bloc (DATASET_CHUNK_ROWS) et précision des t-digests (nombre de centroïdes ~ compression / 2)
+DEFAULT_CHUNK_ROWS = 200_000
+DEFAULT_COMPRESSION = 200
+
+
+class RunningMoments:
+    """
+    Effectif, moyenne et somme des carrés des écarts cumulés par blocs (formule de Chan),
+    fusionnables entre workers
+    """
+
+    __slots__ = ("count", "mean", "m2", "minimum", "maximum")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+
+    def update(self, values: np.ndarray) -> None:
+        if not values.shape[0]:
+            return
+        chunk = RunningMoments()
+        chunk.count = int(values.shape[0])
+        chunk.mean = float(values.mean())
+        chunk.m2 = float(np.square(values - chunk.mean).sum())
+        chunk.minimum = float(values.min())
+        chunk.maximum = float(values.max())
+        self.merge(chunk)
+
+    def merge(self, other: "RunningMoments") -> None:
+        if not other.count:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+
+    @property
+    def std(self) -> Optional[float]:
+        """Écart-type de l'échantillon (ddof=1, comme pandas)"""
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else None
+
+
+class TDigest:
+    """
+    Esquisse de quantiles t-digest (variante fusionnante) : centroïdes (moyenne, poids) triés,
+    petits aux extrémités de la distribution et plus gros au centre
+    La taille reste bornée par la compression quel que soit le nombre de valeurs ;
+    deux digests se fusionnent en concaténant puis recompressant leurs centroïdes
+    Une valeur répétée plus lourde qu'un centroïde ordinaire (distances standard, âges entiers)
+    reste un centroïde ponctuel à part : les quantiles d'une distribution discrète restent exacts
+    """
+
+    __slots__ = ("compression", "means", "weights", "points", "minimum", "maximum")
+
+    def __init__(self, compression: int = DEFAULT_COMPRESSION):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.points = np.empty(0, dtype=bool)  # Centroïde d'une seule valeur (éventuellement répétée)
+        self.minimum = math.inf
+        self.maximum = -math.inf
+
+    @property
+    def count(self) -> float:
+        return float(self.weights.sum())
+
+    def update(self, values: np.ndarray) -> None:
+        if not values.shape[0]:
+            return
+        self.minimum = min(self.minimum, float(values.min()))
+        self.maximum = max(self.maximum, float(values.max()))
+        self._compress(
+            np.concatenate([self.means, values]),
+            np.concatenate([self.weights, np.ones(values.shape[0])]),
+            np.concatenate([self.points, np.ones(values.shape[0], dtype=bool)])
+        )
+
+    def merge(self, other: "TDigest") -> None:
+        if not other.weights.shape[0]:
+            return
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        self._compress(
+            np.concatenate([self.means, other.means]),
+            np.concatenate([self.weights, other.weights]),
+            np.concatenate([self.points, other.points])
+        )
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray, points: np.ndarray) -> None:
+        order = np.argsort(means, kind="stable")
+        means, weights, points = means[order], weights[order], points[order]
+        # Valeurs identiques regroupées en un seul centroïde
+        distinct = np.r_[True, means[1:] != means[:-1]]
+        if not distinct.all():
+            starts = np.flatnonzero(distinct)
+            weights = np.add.reduceat(weights, starts)
+            points = np.logical_and.reduceat(points, starts)
+            means = means[starts]
+
+        cumulative = np.cumsum(weights)
+        # Fonction d'échelle k1 : un centroïde couvre au plus une unité de k,
+        # soit des centroïdes de poids ~ q(1-q) -> précision relative élevée aux quantiles extrêmes
+        quantiles = (cumulative - weights / 2) / cumulative[-1]
+        scale = np.floor(self.compression / (2 * np.pi) * np.arcsin(2 * quantiles - 1))
+        # Au plus `compression` valeurs répétées assez lourdes pour rester isolées
+        heavy = points & (weights > 1) & (weights >= cumulative[-1] / self.compression)
+        starts = np.flatnonzero(np.r_[True, (scale[1:] != scale[:-1]) | heavy[1:] | heavy[:-1]])
+        sizes = np.diff(np.r_[starts, means.shape[0]])
+
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+        self.points = points[starts] & (sizes == 1)
+
+    def quantile(self, quantiles: Sequence[float]) -> List[Optional[float]]:
+        """
+        Quantiles par interpolation linéaire entre centres de centroïdes (bornés par min et max),
+        au rang q * (n - 1) comme pandas ; une valeur répétée couvre tous ses rangs
+        Exacts tant que chaque centroïde ne contient qu'une valeur
+        """
+        if not self.weights.shape[0]:
+            return [None] * len(quantiles)
+        total = self.weights.sum()
+        # Rangs (0 à n - 1) de la première et de la dernière valeur de chaque centroïde
+        last = np.cumsum(self.weights) - 1
+        first = last - self.weights + 1
+        repeated = self.points & (self.weights > 1)
+        spread = ~repeated
+
+        ranks = np.r_[0.0, (first[spread] + last[spread]) / 2, first[repeated], last[repeated], total - 1]
+        values = np.r_[self.minimum, self.means[spread], self.means[repeated], self.means[repeated], self.maximum]
+        order = np.argsort(ranks, kind="stable")
+        positions = np.asarray(quantiles, dtype=float) * (total - 1)
+        return np.interp(positions, ranks[order], values[order]).tolist()
+
+
+class ColumnSketch:
+    """Moments exacts et quantiles approchés d'une colonne numérique"""
+
+    __slots__ = ("moments", "digest")
+
+    def __init__(self, compression: int = DEFAULT_COMPRESSION):
+        self.moments = RunningMoments()
+        self.digest = TDigest(compression)
+
+    def update(self, values: np.ndarray) -> None:
+        self.moments.update(values)
+        self.digest.update(values)
+
+    def merge(self, other: "ColumnSketch") -> None:
+        self.moments.merge(other.moments)
+        self.digest.merge(other.digest)
+
+    def statistics(self) -> Dict[str, Any]:
+        return {
+            "count": self.moments.count,
+            "mean": self.moments.mean if self.moments.count else None,
+            "std": self.moments.std,
+            "percentiles": dict(zip(PERCENTILES, self.digest.quantile(PERCENTILES)))
+        }
+
+
+class DatasetProfile:
+    """
+    Profil d'un dataset de résultats de course construit bloc par bloc, en mémoire bornée :
+    statistiques de l'allure et de la distance, effectifs et allure par tranche d'âge,
+    par genre et par couple (tranche d'âge, genre)
+    Les profils de parties d'un même dataset (workers) se fusionnent avec merge
+    """
+
+    __slots__ = (
+        "compression", "rows", "columns", "age_counts", "gender_counts",
+        "age_paces", "gender_paces", "buckets", "has_demographics"
+    )
+
+    def __init__(self, compression: int = DEFAULT_COMPRESSION):
+        self.compression = compression
+        self.rows = 0
+        self.columns: Dict[str, ColumnSketch] = {}
+        self.age_counts = np.zeros(len(AGE_LABELS), dtype=np.int64)
+        self.gender_counts: Dict[str, int] = {}
+        # Allure par tranche d'âge (tous genres), par genre (tous âges) et par couple des deux
+        self.age_paces = [RunningMoments() for _ in AGE_LABELS]
+        self.gender_paces: Dict[str, RunningMoments] = {}
+        self.buckets: Dict[Tuple[int, str], ColumnSketch] = {}
+        self.has_demographics = False
+
+    def update(self, columns: Dict[str, np.ndarray]) -> None:
+        """Ajout d'un bloc : colonnes numériques en float64 (NaN = manquant), genre en objets"""
+        self.rows += next(iter(columns.values())).shape[0] if columns else 0
+        for name in STATISTIC_COLUMNS:
+            if name in columns:
+                values = columns[name]
+                self.columns.setdefault(name, ColumnSketch(self.compression)).update(values[np.isfinite(values)])
+
+        if "age" not in columns or GENDER_COLUMN not in columns:
+            return
+        self.has_demographics = True
+        ages = columns["age"]
+        age_groups = np.searchsorted(AGE_BOUNDS, ages, side="left")
+        valid_age = (ages > 0) & (ages <= AGE_BOUNDS[-1])
+        self.age_counts += np.bincount(age_groups[valid_age], minlength=len(AGE_LABELS))
+
+        # Genre manquant (None ou NaN) : -1 ; genres du bloc numérotés dans l'ordre alphabétique
+        genders = columns[GENDER_COLUMN]
+        known_gender = np.array([gender is not None and gender == gender for gender in genders], dtype=bool)
+        gender_names, known_codes = np.unique(genders[known_gender].astype(str), return_inverse=True)
+        gender_names = gender_names.tolist()
+        gender_codes = np.full(genders.shape[0], -1)
+        gender_codes[known_gender] = known_codes
+        for name, count in zip(gender_names, np.bincount(known_codes, minlength=len(gender_names)).tolist()):
+            self.gender_counts[name] = self.gender_counts.get(name, 0) + count
+
+        if "pace" not in columns:
+            return
+        paces = columns["pace"]
+        has_pace = np.isfinite(paces)
+        age_groups = np.where(valid_age & has_pace, age_groups, -1)
+        gender_codes = np.where(has_pace, gender_codes, -1)
+        for age_group, values in _split_by_code(age_groups, paces, len(AGE_LABELS)):
+            self.age_paces[age_group].update(values)
+        for code, values in _split_by_code(gender_codes, paces, len(gender_names)):
+            self.gender_paces.setdefault(gender_names[code], RunningMoments()).update(values)
+
+        # Couples (tranche d'âge, genre) connus tous les deux
+        combined = np.where((age_groups >= 0) & (gender_codes >= 0), age_groups * len(gender_names) + gender_codes, -1)
+        for code, values in _split_by_code(combined, paces, len(AGE_LABELS) * len(gender_names)):
+            age_group, gender_code = divmod(code, len(gender_names))
+            self.buckets.setdefault((age_group, gender_names[gender_code]), ColumnSketch(self.compression)).update(values)
+
+    def merge(self, other: "DatasetProfile") -> None:
+        self.rows += other.rows
+        for name, sketch in other.columns.items():
+            self.columns.setdefault(name, ColumnSketch(self.compression)).merge(sketch)
+        self.age_counts += other.age_counts
+        for gender, count in other.gender_counts.items():
+            self.gender_counts[gender] = self.gender_counts.get(gender, 0) + count
+        for moments, other_moments in zip(self.age_paces, other.age_paces):
+            moments.merge(other_moments)
+        for gender, moments in other.gender_paces.items():
+            self.gender_paces.setdefault(gender, RunningMoments()).merge(moments)
+        for key, sketch in other.buckets.items():
+            self.buckets.setdefault(key, ColumnSketch(self.compression)).merge(sketch)
+        self.has_demographics = self.has_demographics or other.has_demographics
+
+    def result(self) -> Dict[str, Any]:
+        """Même structure que KaggleDataService.process_running_dataset (mode DataFrame), plus les quantiles par groupe"""
+        processed_data: Dict[str, Any] = {"rows": self.rows}
+        for name, sketch in self.columns.items():
+            processed_data[f"{name}_statistics"] = sketch.statistics()
+        if not self.has_demographics:
+            return processed_data
+
+        analysis: Dict[str, Any] = {
+            "age_distribution": dict(zip(AGE_LABELS, self.age_counts.tolist())),
+            "gender_distribution": dict(sorted(self.gender_counts.items(), key=lambda item: -item[1]))
+        }
+        if "pace" in self.columns:
+            analysis["pace_by_age"] = {
+                label: moments.mean if moments.count else None for label, moments in zip(AGE_LABELS, self.age_paces)
+            }
+            analysis["pace_by_gender"] = {gender: self.gender_paces[gender].mean for gender in sorted(self.gender_paces)}
+            pace_by_group: Dict[str, Dict[str, Any]] = {}
+            for (age_group, gender), sketch in sorted(self.buckets.items()):
+                pace_by_group.setdefault(AGE_LABELS[age_group], {})[gender] = sketch.statistics()
+            analysis["pace_by_age_and_gender"] = pace_by_group
+        processed_data["demographic_analysis"] = analysis
+        return processed_data
+
+
+def _split_by_code(codes: np.ndarray, values: np.ndarray, size: int) -> Iterator[Tuple[int, np.ndarray]]:
+    """Valeurs regroupées par code (0 à size - 1, les codes négatifs sont ignorés), un tri par bloc"""
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(-1, size + 1) if size else [-1, 0])
+    for code in range(size):
+        start, end = bounds[code + 1], bounds[code + 2]
+        if end > start:
+            yield code, values[order[start:end]]
+
+
+def iter_dataset_chunks(
+    path: str, chunk_rows: int, row_groups: Optional[Sequence[int]] = None
+) -> Iterator[Dict[str, np.ndarray]]:
+    """
+    Blocs de colonnes d'un fichier CSV ou Parquet (seules PROFILE_COLUMNS sont lues)
+    Valeurs numériques non convertibles -> NaN ; row_groups : partie d'un fichier Parquet
+    """
+    if path.lower().endswith((".parquet", ".pq")):
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(path)
+        columns = [name for name in parquet_file.schema_arrow.names if name in PROFILE_COLUMNS]
+        for batch in parquet_file.iter_batches(batch_size=chunk_rows, row_groups=row_groups, columns=columns):
+            chunk = {}
+            for index, name in enumerate(batch.schema.names):
+                values = batch.column(index).to_numpy(zero_copy_only=False)
+                chunk[name] = values.astype(object) if name == GENDER_COLUMN else _to_float(values)
+            yield chunk
+    else:
+        import pandas as pd
+
+        reader = pd.read_csv(
+            path, usecols=lambda name: name in PROFILE_COLUMNS, dtype={GENDER_COLUMN: object}, chunksize=chunk_rows
+        )
+        with reader:
+            for frame in reader:
+                yield {
+                    name: frame[name].to_numpy(dtype=object) if name == GENDER_COLUMN
+                    else pd.to_numeric(frame[name], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+                    for name in frame.columns
+                }
+
+
+def _to_float(values: np.ndarray) -> np.ndarray:
+    try:
+        return values.astype(np.float64)
+    except (TypeError, ValueError):
+        import pandas as pd
+        return pd.to_numeric(values, errors="coerce").astype(np.float64)
+
+
+def profile_dataset_part(
+    path: str, row_groups: Optional[Sequence[int]] = None, chunk_rows: Optional[int] = None,
+    compression: int = DEFAULT_COMPRESSION
+) -> DatasetProfile:
+    """Profil d'un fichier (ou de certains groupes de lignes Parquet), exécuté dans un worker"""
+    chunk_rows = chunk_rows or int(os.getenv("DATASET_CHUNK_ROWS", DEFAULT_CHUNK_ROWS))
+    profile = DatasetProfile(compression)
+    for columns in iter_dataset_chunks(path, chunk_rows, row_groups):
+        profile.update(columns)
+    return profile
+
+
+def dataset_parts(paths: Sequence[str], parts_per_file: int) -> List[Tuple[str, Optional[List[int]]]]:
+    """
+    Découpage en parties indépendantes : un fichier CSV = une partie,
+    un fichier Parquet = jusqu'à parts_per_file parties de groupes de lignes
+    """
+    parts: List[Tuple[str, Optional[List[int]]]] = []
+    for path in paths:
+        if parts_per_file > 1 and path.lower().endswith((".parquet", ".pq")):
+            import pyarrow.parquet as pq
+
+            groups = pq.ParquetFile(path).metadata.num_row_groups
+            for part in range(min(parts_per_file, groups)):
+                parts.append((path, list(range(part, groups, parts_per_file))))
+        else:
+            parts.append((path, None))
+    return parts
+
+
+def profile_dataset_files(
+    paths: Sequence[str], max_workers: Optional[int] = None, chunk_rows: Optional[int] = None,
+    compression: int = DEFAULT_COMPRESSION
+) -> Dict[str, Any]:
+    """
+    Profil de un ou plusieurs fichiers de résultats (CSV ou Parquet) plus grands que la mémoire
+    Les parties sont profilées sur un pool de processus puis leurs esquisses fusionnées
+    """
+    started_at = time.perf_counter()
+    workers = max_workers or os.cpu_count() or 1
+    parts = dataset_parts(paths, workers)
+    profile = DatasetProfile(compression)
+
+    if workers == 1 or len(parts) == 1:
+        for path, row_groups in parts:
+            profile.merge(profile_dataset_part(path, row_groups, chunk_rows, compression))
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(parts))) as pool:
+            futures = [
+                pool.submit(profile_dataset_part, path, row_groups, chunk_rows, compression)
+                for path, row_groups in parts
+            ]
+            for future in futures:
+                profile.merge(future.result())
+
+    elapsed = time.perf_counter() - started_at
+    logger.info(
+        f"Profil de dataset: {profile.rows} lignes, {len(parts)} parties sur {min(workers, len(parts))} workers "
+        f"en {elapsed:.1f}s ({profile.rows / max(elapsed, 1e-9):.0f} lignes/s)"
+    )
+    return profile.result()
+
+
+if __name__ == "__main__":
+    # Lancement : python -m services.dataset_profile resultats.csv [autres fichiers...]
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    print(json.dumps(profile_dataset_files(sys.argv[1:]), indent=2, ensure_ascii=False))
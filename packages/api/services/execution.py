@@ -0,0 +1,221 @@
+import os
+import time
+import asyncio
+import inspect
+import logging
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Modes d'exécution des calculs des services (EXECUTION_MODE)
+# - inline : directement dans la boucle d'événements (comportement historique)
+# - thread : pool de threads, la boucle reste disponible pendant les calculs NumPy
+# - process : pool de processus, isolation complète du GIL (arguments et résultats sérialisés)
+EXECUTION_MODES = ("inline", "thread", "process")
+DEFAULT_EXECUTION_MODE = "thread"
+
+# Pools par famille de calculs : analyses (AIAnalyticsService, WorkoutService), prédictions ML,
+# et gros historiques isolés dans leur propre pool pour ne pas retarder les petites requêtes
+EXECUTION_POOLS = ("analytics", "ml", "bulk")
+BULK_THRESHOLD_WORKOUTS = int(os.getenv("EXECUTION_BULK_WORKOUTS", 20_000))
+
+# Taille moyenne d'une séance dans un corps de requête (estimation du nombre de séances avant décodage)
+BODY_BYTES_PER_WORKOUT = 100
+
+# Boucle d'événements propre à chaque thread worker (méthodes de service déclarées async)
+_thread_state = threading.local()
+
+# Instances de service propres à chaque processus worker, par classe
+_process_services: Dict[type, Any] = {}
+
+
+def _thread_loop() -> asyncio.AbstractEventLoop:
+    loop = getattr(_thread_state, "loop", None)
+    if loop is None:
+        loop = _thread_state.loop = asyncio.new_event_loop()
+    return loop
+
+
+def _register_thread_loop(loops: List[asyncio.AbstractEventLoop], lock: threading.Lock) -> None:
+    """Initialisation d'un thread worker : sa boucle est enregistrée pour être fermée avec le pool"""
+    loop = _thread_loop()
+    with lock:
+        loops.append(loop)
+
+
+def _close_loops(loops: List[asyncio.AbstractEventLoop]) -> None:
+    """Arrêt de l'exécuteur par défaut de chaque boucle (run_in_executor(None, ...)) puis fermeture"""
+    for loop in loops:
+        try:
+            loop.run_until_complete(loop.shutdown_default_executor())
+        finally:
+            loop.close()
+
+
+def _complete(result: Any) -> Any:
+    """Exécute jusqu'au bout une coroutine de service dans la boucle du thread courant"""
+    if inspect.isawaitable(result):
+        return _thread_loop().run_until_complete(result)
+    return result
+
+
+def _resolve(target: Any) -> Callable:
+    """Cible sérialisée (classe de service, nom de méthode) -> méthode d'une instance du processus"""
+    if isinstance(target, tuple):
+        service_class, method_name = target
+        service = _process_services.get(service_class)
+        if service is None:
+            service = _process_services[service_class] = service_class()
+        return getattr(service, method_name)
+    return target
+
+
+def _invoke(target: Any, args: Tuple, kwargs: Dict[str, Any], submitted_at: float) -> Tuple[Any, float, float]:
+    """
+    Exécution dans un worker (thread ou processus)
+    Retourne le résultat, l'attente en file et la durée de calcul (horloge monotone commune aux processus)
+    """
+    started_at = time.monotonic()
+    result = _complete(_resolve(target)(*args, **kwargs))
+    return result, started_at - submitted_at, time.monotonic() - started_at
+
+
+class ExecutionPool:
+    """
+    Pool d'exécution d'un type de calcul avec ses métriques de file d'attente
+    """
+
+    def __init__(self, name: str, mode: str, max_workers: int):
+        if mode not in EXECUTION_MODES:
+            raise ValueError(f"Mode d'exécution inconnu: {mode} (attendu: {', '.join(EXECUTION_MODES)})")
+        self.name = name
+        self.mode = mode
+        self.max_workers = max_workers
+        self._executor: Optional[Executor] = None
+        # Boucles d'événements des threads workers (mode thread), fermées à l'arrêt du pool
+        self._loops: List[asyncio.AbstractEventLoop] = []
+        self._loops_lock = threading.Lock()
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.pending = 0
+        self.peak_pending = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_run = 0.0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.mode == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix=f"exec-{self.name}",
+                    initializer=_register_thread_loop, initargs=(self._loops, self._loops_lock)
+                )
+        return self._executor
+
+    def _target(self, func: Callable) -> Any:
+        """En mode processus, une méthode de service est transmise par (classe, nom) et non par instance"""
+        if self.mode == "process" and inspect.ismethod(func):
+            return type(func.__self__), func.__name__
+        return func
+
+    async def run(self, func: Callable, *args: Any, **kwargs: Any) -> Any:
+        """Exécute func(*args, **kwargs) selon le mode du pool (coroutines de service comprises)"""
+        self.submitted += 1
+        self.pending += 1
+        self.peak_pending = max(self.peak_pending, self.pending)
+        submitted_at = time.monotonic()
+
+        try:
+            if self.mode == "inline":
+                result = func(*args, **kwargs)
+                if inspect.isawaitable(result):
+                    result = await result
+                wait, duration = 0.0, time.monotonic() - submitted_at
+            else:
+                loop = asyncio.get_running_loop()
+                result, wait, duration = await loop.run_in_executor(
+                    self._get_executor(), _invoke, self._target(func), args, kwargs, submitted_at
+                )
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.pending -= 1
+
+        self.completed += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        self.total_run += duration
+        return result
+
+    def metrics(self) -> Dict[str, Any]:
+        """Profondeur de file (tâches en attente d'un worker) et temps d'attente/calcul"""
+        finished = max(1, self.completed)
+        workers = 1 if self.mode == "inline" else self.max_workers
+        return {
+            "mode": self.mode,
+            "max_workers": workers,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "in_flight": self.pending,
+            "queue_depth": max(0, self.pending - workers),
+            "peak_in_flight": self.peak_pending,
+            "avg_queue_wait_ms": round(self.total_wait / finished * 1000, 3),
+            "max_queue_wait_ms": round(self.max_wait * 1000, 3),
+            "avg_run_ms": round(self.total_run / finished * 1000, 3)
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        with self._loops_lock:
+            loops, self._loops[:] = list(self._loops), []
+        if loops:
+            # Threads workers terminés : leurs boucles sont fermées depuis un thread sans boucle
+            # active (shutdown peut être appelé depuis la boucle principale)
+            closer = threading.Thread(target=_close_loops, args=(loops,), name=f"exec-{self.name}-close")
+            closer.start()
+            closer.join()
+
+
+class ExecutionLayer:
+    """
+    Couche d'exécution des calculs des services hors de la boucle d'événements
+    Mode et nombre de workers configurés par EXECUTION_MODE / EXECUTION_WORKERS
+    """
+
+    def __init__(self, mode: Optional[str] = None, max_workers: Optional[int] = None):
+        self.mode = (mode or os.getenv("EXECUTION_MODE", DEFAULT_EXECUTION_MODE)).lower()
+        self.max_workers = max_workers or int(os.getenv("EXECUTION_WORKERS", 0)) or self._default_workers(self.mode)
+        self.pools = {name: ExecutionPool(name, self.mode, self.max_workers) for name in EXECUTION_POOLS}
+        logger.info(f"Couche d'exécution: mode {self.mode}, {self.max_workers} workers par pool")
+
+    @staticmethod
+    def _default_workers(mode: str) -> int:
+        cpu_count = os.cpu_count() or 1
+        return cpu_count if mode == "process" else min(32, cpu_count + 4)
+
+    async def run(self, func: Callable, *args: Any, pool: str = "analytics", size: int = 0, **kwargs: Any) -> Any:
+        """
+        Exécution sur le pool demandé (analytics par défaut, ml pour les prédictions)
+        size : nombre de séances traitées ; au-delà de BULK_THRESHOLD_WORKOUTS le calcul
+        part sur le pool bulk
+        """
+        if size >= BULK_THRESHOLD_WORKOUTS:
+            pool = "bulk"
+        return await self.pools[pool].run(func, *args, **kwargs)
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        return {name: pool.metrics() for name, pool in self.pools.items()}
+
+    def shutdown(self) -> None:
+        for pool in self.pools.values():
+            pool.shutdown()
@@ -0,0 +1,256 @@
+import re
+import numpy as np
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+EARTH_RADIUS_M = 6371e3
+MOVING_SPEED_THRESHOLD = 0.5  # m/s, en dessous le coureur est considéré à l'arrêt
+
+# Extraction directe des champs des points de trace (chemin rapide, sans arbre XML)
+# Motifs à préfixe littéral : la recherche reste en C sur tout le document
+# Coordonnées ancrées sur la balise <trkpt> (attributs d'autres éléments ignorés)
+_TRKPT_LAT = re.compile(rb'<trkpt\s[^>]*?\blat="([^"]*)"')
+_TRKPT_LON = re.compile(rb'<trkpt\s[^>]*?\blon="([^"]*)"')
+_TRKPT_ELE = re.compile(rb"<ele>([^<]*)</ele>")
+_TRKPT_TIME = re.compile(rb"<time>\s*([^<\sZ]*)")
+# Horodatage avec décalage horaire (+02:00) : converti en UTC ici, numpy ne gérant plus les fuseaux
+_OFFSET_SUFFIX = re.compile(r"\d[+-]\d\d:?\d\d$")
+
+
+def _local_name(tag: str) -> str:
+    """Nom de balise sans namespace"""
+    return tag.rsplit("}", 1)[-1]
+
+
+def _has_offset(times: np.ndarray) -> bool:
+    """Présence d'un décalage horaire : '+' ou '-' après la date, testé sur les octets bruts"""
+    chars = times.view(np.uint8).reshape(len(times), -1)
+    return bool((chars == ord("+")).any() or (chars[:, 10:] == ord("-")).any())
+
+
+def _utc_times(values: List[Optional[str]]) -> np.ndarray:
+    """Horodatages ISO 8601 (avec ou sans décalage) en datetime64[ms] UTC ; None -> NaT"""
+    times = []
+    for value in values:
+        if not value:
+            times.append(np.datetime64("NaT", "ms"))
+            continue
+        parsed = datetime.fromisoformat(value.rstrip("Z"))
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+        times.append(np.datetime64(parsed, "ms"))
+    return np.array(times, dtype="datetime64[ms]")
+
+
+def _format_pace(pace_seconds: float) -> str:
+    """Conversion secondes/km vers format pace mm:ss"""
+    pace = int(round(pace_seconds))
+    return f"{pace // 60}:{pace % 60:02d}"
+
+
+class GpxTrack:
+    """
+    Points de trace GPX chargés en tableaux NumPy (latitude, longitude, altitude, temps)
+    Tous les calculs de parcours sont vectorisés, sans boucle Python par point
+    """
+
+    __slots__ = ("lat", "lon", "elevation", "time")
+
+    def __init__(self, lat: np.ndarray, lon: np.ndarray, elevation: np.ndarray, time: np.ndarray):
+        self.lat = lat
+        self.lon = lon
+        self.elevation = elevation
+        self.time = time
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "GpxTrack":
+        """
+        Décodage d'un fichier GPX (toutes traces et segments concaténés)
+        Les altitudes absentes valent NaN, les temps absents NaT
+        """
+        track = cls._from_bytes_fast(data)
+        if track is not None:
+            return track
+        return cls._from_bytes_tree(data)
+
+    @classmethod
+    def _from_bytes_fast(cls, data: bytes) -> Optional["GpxTrack"]:
+        """
+        Chemin rapide par expressions régulières, valable lorsque chaque point
+        porte une altitude et un horodatage (cas des exports Apple Health)
+        """
+        start = data.find(b"<trkpt")
+        if start < 0:
+            return None
+        body = data[start:]
+
+        lat = _TRKPT_LAT.findall(body)
+        lon = _TRKPT_LON.findall(body)
+        elevation = _TRKPT_ELE.findall(body)
+        time = _TRKPT_TIME.findall(body)
+
+        count = len(lat)
+        if not (len(lon) == len(elevation) == len(time) == count):
+            return None
+
+        try:
+            time = np.array(time)
+            if _has_offset(time):
+                time = _utc_times([value.decode("ascii") for value in time])
+            else:
+                time = time.astype("datetime64[ms]")
+            return cls(
+                np.array(lat).astype(np.float64),
+                np.array(lon).astype(np.float64),
+                np.array(elevation).astype(np.float64),
+                time
+            )
+        except ValueError:
+            return None
+
+    @classmethod
+    def _from_bytes_tree(cls, data: bytes) -> "GpxTrack":
+        """Chemin générique via l'arbre XML (altitudes ou horodatages partiels)"""
+        root = ET.fromstring(data)
+        points = [elem for elem in root.iter() if _local_name(elem.tag) == "trkpt"]
+
+        lat = np.array([point.get("lat") for point in points], dtype=np.float64)
+        lon = np.array([point.get("lon") for point in points], dtype=np.float64)
+
+        elevations = []
+        times = []
+        for point in points:
+            elevation = None
+            time = None
+            for child in point:
+                name = _local_name(child.tag)
+                if name == "ele":
+                    elevation = child.text
+                elif name == "time":
+                    time = child.text.strip().rstrip("Z") if child.text else None
+            elevations.append(elevation if elevation is not None else "nan")
+            times.append(time if time else "NaT")
+
+        elevation = np.array(elevations, dtype=np.float64)
+        if any(_OFFSET_SUFFIX.search(value) for value in times):
+            time = _utc_times([None if value == "NaT" else value for value in times])
+        else:
+            time = np.array(times, dtype="datetime64[ms]")
+
+        return cls(lat, lon, elevation, time)
+
+    def __len__(self) -> int:
+        return self.lat.shape[0]
+
+    def segment_distances(self) -> np.ndarray:
+        """Distances haversine entre points consécutifs (mètres, n-1 valeurs)"""
+        lat = np.radians(self.lat)
+        lon = np.radians(self.lon)
+        dlat = np.diff(lat)
+        dlon = np.diff(lon)
+
+        a = np.sin(dlat / 2) ** 2 + np.cos(lat[:-1]) * np.cos(lat[1:]) * np.sin(dlon / 2) ** 2
+        return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+    def cumulative_distance(self) -> np.ndarray:
+        """Distance cumulée depuis le départ (mètres, n valeurs)"""
+        cumulative = np.zeros(len(self), dtype=np.float64)
+        if len(self) > 1:
+            np.cumsum(self.segment_distances(), out=cumulative[1:])
+        return cumulative
+
+    def elapsed_seconds(self) -> np.ndarray:
+        """Temps écoulé depuis le premier point (secondes, NaN si horodatage absent)"""
+        if not len(self) or np.isnat(self.time[0]):
+            return np.full(len(self), np.nan)
+        elapsed = (self.time - self.time[0]) / np.timedelta64(1, "ms") / 1000
+        return elapsed.astype(np.float64)
+
+    def cumulative_elevation_gain(self) -> np.ndarray:
+        """Dénivelé positif cumulé à chaque point (mètres, altitudes manquantes ignorées)"""
+        cumulative = np.zeros(len(self), dtype=np.float64)
+        if len(self) > 1:
+            climbs = np.clip(np.diff(self.elevation), 0, None)
+            np.cumsum(np.nan_to_num(climbs), out=cumulative[1:])
+        return cumulative
+
+    def elevation_gain(self) -> Optional[float]:
+        """Dénivelé positif cumulé en mètres (None sans altitude)"""
+        elevation = self.elevation[~np.isnan(self.elevation)]
+        if elevation.size < 2:
+            return None
+        return float(np.sum(np.clip(np.diff(elevation), 0, None)))
+
+    def moving_time(self, min_speed: float = MOVING_SPEED_THRESHOLD) -> Optional[float]:
+        """Temps en mouvement (secondes) : segments dont la vitesse dépasse min_speed"""
+        if len(self) < 2:
+            return None
+
+        dt = np.diff(self.elapsed_seconds())
+        if np.all(np.isnan(dt)):
+            return None
+
+        distances = self.segment_distances()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            speeds = distances / dt
+        moving = (dt > 0) & (speeds >= min_speed)
+        return float(np.sum(dt[moving]))
+
+    def splits(self, split_distance: float = 1000.0) -> List[Dict[str, Any]]:
+        """
+        Temps de passage par tranche de split_distance mètres (dernière tranche partielle incluse)
+        Les temps et dénivelés aux bornes sont interpolés linéairement sur la distance
+        """
+        if len(self) < 2:
+            return []
+
+        cumulative = self.cumulative_distance()
+        total_distance = cumulative[-1]
+        if total_distance <= 0:
+            return []
+
+        boundaries = np.append(np.arange(0.0, total_distance, split_distance), total_distance)
+        split_lengths = np.diff(boundaries)
+
+        # np.interp exige des abscisses croissantes : les points immobiles sont fusionnés
+        keep = np.concatenate(([True], np.diff(cumulative) > 0))
+        distance_axis = cumulative[keep]
+
+        elapsed = self.elapsed_seconds()[keep]
+        has_time = not np.any(np.isnan(elapsed))
+        durations = np.diff(np.interp(boundaries, distance_axis, elapsed)) if has_time else None
+
+        gains = np.diff(np.interp(boundaries, distance_axis, self.cumulative_elevation_gain()[keep]))
+
+        splits = []
+        for index, length in enumerate(split_lengths.tolist()):
+            split = {
+                "km": index + 1,
+                "distance": round(length / 1000, 3),
+                "duration": None,
+                "pace": None,
+                "elevation_gain": round(float(gains[index]), 1)
+            }
+            if durations is not None:
+                duration = float(durations[index])
+                split["duration"] = round(duration, 1)
+                split["pace"] = _format_pace(duration / (length / 1000))
+            splits.append(split)
+
+        return splits
+
+    def route_summary(self) -> Dict[str, Any]:
+        """
+        Résumé compact du parcours (champs WorkoutData + métriques GPS)
+        """
+        total_distance = self.cumulative_distance()[-1] if len(self) else 0.0
+        elapsed = self.elapsed_seconds()
+
+        return {
+            "elevation_gain": self.elevation_gain(),
+            "splits": self.splits() or None,
+            "gps_distance": round(float(total_distance) / 1000, 3),
+            "elapsed_time": float(elapsed[-1]) if len(self) and not np.isnan(elapsed[-1]) else None,
+            "moving_time": self.moving_time()
+        }
@@ -0,0 +1,145 @@
+import os
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Attente maximale ajoutée à une prédiction pour former un lot (INFERENCE_BATCH_WAIT_MS, 0 = désactivé)
+DEFAULT_MAX_WAIT_MS = 2.0
+# Nombre maximal de lignes par appel à predict (INFERENCE_BATCH_SIZE)
+DEFAULT_MAX_BATCH = 64
+
+# Demande en file : (modèle, scaler éventuel, ligne de features, résultat, instant de soumission)
+_Request = Tuple[Any, Optional[Any], np.ndarray, Future, float]
+
+
+class InferenceBatcher:
+    """
+    Micro-batching des prédictions des modèles entraînés
+    Les demandes concurrentes (threads du pool ml ou coroutines) sont regroupées pendant au plus
+    max_wait_ms ou jusqu'à max_batch lignes, puis un seul predict est exécuté par modèle ;
+    chaque demande reçoit sa ligne de résultat via un Future
+    """
+
+    def __init__(self, max_wait_ms: Optional[float] = None, max_batch: Optional[int] = None):
+        self.max_wait = (
+            max_wait_ms if max_wait_ms is not None else float(os.getenv("INFERENCE_BATCH_WAIT_MS", DEFAULT_MAX_WAIT_MS))
+        ) / 1000
+        self.max_batch = max_batch or int(os.getenv("INFERENCE_BATCH_SIZE", DEFAULT_MAX_BATCH))
+        self._queue: "queue.SimpleQueue[Optional[_Request]]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+        self.batches = 0
+        self.rows = 0
+        self.max_rows = 0
+        self.total_wait = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_wait > 0 and self.max_batch > 1
+
+    def submit(self, model: Any, scaler: Optional[Any], features: np.ndarray) -> Future:
+        """Demande de prédiction d'une ligne ; le Future reçoit la valeur prédite"""
+        future: Future = Future()
+        if not self.enabled:
+            try:
+                future.set_result(self._predict(model, scaler, [features])[0])
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        self._ensure_started()
+        self._queue.put((model, scaler, features, future, time.monotonic()))
+        return future
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                thread = threading.Thread(target=self._run, name="inference-batcher", daemon=True)
+                thread.start()
+                self._thread = thread
+
+    def shutdown(self) -> None:
+        """Arrêt du thread de regroupement (les demandes déjà en file sont traitées)"""
+        with self._start_lock:
+            if self._thread is not None:
+                self._queue.put(None)
+                self._thread.join()
+                self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = first[4] + self.max_wait
+            stop = False
+            while len(batch) < self.max_batch:
+                # Attente bornée par l'échéance de la première demande ; une fois l'échéance
+                # passée, les demandes déjà en file rejoignent encore le lot
+                remaining = deadline - time.monotonic()
+                try:
+                    request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    stop = True
+                    break
+                batch.append(request)
+            self._flush(batch)
+            if stop:
+                return
+
+    def _flush(self, batch: List[_Request]) -> None:
+        """Un predict par couple (modèle, scaler) du lot, résultats redistribués dans l'ordre"""
+        flushed_at = time.monotonic()
+        groups: Dict[Tuple[int, int], List[_Request]] = {}
+        for request in batch:
+            groups.setdefault((id(request[0]), id(request[1])), []).append(request)
+
+        for requests in groups.values():
+            model, scaler = requests[0][0], requests[0][1]
+            try:
+                predictions = self._predict(model, scaler, [request[2] for request in requests])
+            except Exception as e:
+                logger.error(f"Erreur prédiction par lot ({len(requests)} lignes): {e}")
+                for request in requests:
+                    request[3].set_exception(e)
+                continue
+            for request, prediction in zip(requests, predictions):
+                request[3].set_result(prediction)
+
+        self.batches += 1
+        self.rows += len(batch)
+        self.max_rows = max(self.max_rows, len(batch))
+        self.total_wait += sum(flushed_at - request[4] for request in batch)
+
+    @staticmethod
+    def _predict(model: Any, scaler: Optional[Any], rows: List[np.ndarray]) -> List[float]:
+        matrix = np.vstack(rows)
+        if scaler is not None:
+            matrix = scaler.transform(matrix)
+        return model.predict(matrix).tolist()
+
+    def metrics(self) -> Dict[str, Any]:
+        batches = max(1, self.batches)
+        return {
+            "enabled": self.enabled,
+            "max_wait_ms": self.max_wait * 1000,
+            "max_batch": self.max_batch,
+            "batches": self.batches,
+            "rows": self.rows,
+            "avg_batch_rows": round(self.rows / batches, 2),
+            "max_batch_rows": self.max_rows,
+            "avg_wait_ms": round(self.total_wait / max(1, self.rows) * 1000, 3)
+        }
@@ -1,12 +1,13 @@
 import asyncio
 import os
-import pandas as pd
 import numpy as np
-from typing import Dict, Any, List, Optional
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Union
 import logging
-import aiofiles
-import json
-from datetime import datetime
+
+from services.benchmark_store import BenchmarkSnapshot, BenchmarkStore
+
+if TYPE_CHECKING:
+    import pandas as pd  # chargé à la première utilisation (import coûteux au démarrage)
 
 logger = logging.getLogger(__name__)
 
@@ -18,65 +19,39 @@ class KaggleDataService:
     def __init__(self):
         self.kaggle_username = os.getenv("KAGGLE_USERNAME")
         self.kaggle_key = os.getenv("KAGGLE_KEY")
-        self.cache_file = "data/kaggle_benchmarks.json"
-        self.benchmark_data = None
+        # Instantané des données de référence partagé par tous les workers (BENCHMARK_STORE_DIR)
+        self.store = BenchmarkStore()
 
     async def get_benchmark_data(self) -> Dict[str, Any]:
         """
         Récupération des données de référence pour la course à pied
         """
-        # Vérifier le cache local d'abord
-        cached_data = await self._load_cached_data()
-        if cached_data:
-            logger.info("Utilisation des données en cache")
-            return cached_data
-
-        # Si pas de cache, charger des données simulées (à remplacer par vraies données Kaggle)
-        benchmark_data = await self._load_simulated_benchmark_data()
-
-        # Sauvegarder en cache
-        await self._save_to_cache(benchmark_data)
-
-        return benchmark_data
-
-    async def _load_cached_data(self) -> Optional[Dict[str, Any]]:
-        """
-        Chargement des données mises en cache
-        """
-        try:
-            if os.path.exists(self.cache_file):
-                async with aiofiles.open(self.cache_file, 'r') as f:
-                    content = await f.read()
-                    data = json.loads(content)
+        return (await self.get_benchmark_snapshot()).benchmarks
 
-                    # Vérifier si le cache n'est pas trop ancien (7 jours)
-                    cache_date = datetime.fromisoformat(data.get('cached_at', '2000-01-01'))
-                    if (datetime.now() - cache_date).days < 7:
-                        return data.get('benchmarks')
-
-        except Exception as e:
-            logger.error(f"Erreur chargement cache: {e}")
-
-        return None
-
-    async def _save_to_cache(self, data: Dict[str, Any]) -> None:
+    async def get_benchmark_snapshot(self) -> BenchmarkSnapshot:
         """
-        Sauvegarde des données en cache
+        Version courante des données de référence (données et tables compilées)
+        Absente ou expirée : reconstruite par un seul worker, les autres attendent puis la lisent
+        Le verrou est attendu et l'instantané écrit sans bloquer la boucle d'événements
         """
-        try:
-            # Créer le dossier data s'il n'existe pas
-            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
-
-            cache_data = {
-                'cached_at': datetime.now().isoformat(),
-                'benchmarks': data
-            }
-
-            async with aiofiles.open(self.cache_file, 'w') as f:
-                await f.write(json.dumps(cache_data, indent=2))
-
-        except Exception as e:
-            logger.error(f"Erreur sauvegarde cache: {e}")
+        snapshot = self.store.current()
+        if snapshot is not None and not snapshot.is_expired(self.store.max_age_days):
+            return snapshot
+
+        async with self.store.async_writer_lock():
+            # Un autre worker a pu publier pendant l'attente du verrou
+            snapshot = self.store.current(force=True)
+            if snapshot is None or snapshot.is_expired(self.store.max_age_days):
+                # Données simulées (à remplacer par vraies données Kaggle)
+                benchmark_data = await self._load_simulated_benchmark_data()
+                loop = asyncio.get_running_loop()
+                snapshot = await loop.run_in_executor(None, self.store.publish, benchmark_data)
+        return snapshot
+
+    def publish_benchmark_data(self, benchmark_data: Dict[str, Any]) -> BenchmarkSnapshot:
+        """Publication d'une nouvelle version des données de référence pour tous les workers"""
+        with self.store.writer_lock():
+            return self.store.publish(benchmark_data)
 
     async def _load_simulated_benchmark_data(self) -> Dict[str, Any]:
         """
@@ -180,7 +155,7 @@ class KaggleDataService:
             }
         }
 
-    async def download_kaggle_dataset(self, dataset_name: str) -> Optional[pd.DataFrame]:
+    async def download_kaggle_dataset(self, dataset_name: str) -> Optional["pd.DataFrame"]:
         """
         Téléchargement direct depuis Kaggle (nécessite configuration API)
         """
@@ -201,11 +176,22 @@ class KaggleDataService:
             logger.error(f"Erreur téléchargement Kaggle: {e}")
             return None
 
-    async def process_running_dataset(self, df: pd.DataFrame) -> Dict[str, Any]:
+    async def process_running_dataset(
+        self, dataset: Union["pd.DataFrame", str, List[str]], max_workers: Optional[int] = None
+    ) -> Dict[str, Any]:
         """
         Traitement d'un dataset de course à pied depuis Kaggle
+        - DataFrame : statistiques calculées en mémoire
+        - chemin(s) de fichiers CSV ou Parquet : traitement en flux pour les datasets trop gros
+          pour un DataFrame (lecture par blocs, fichiers répartis sur des processus) ;
+          moyennes et écarts-types exacts, percentiles approchés (t-digest), plus les
+          percentiles d'allure par tranche d'âge et genre
         """
+        if isinstance(dataset, (str, list, tuple)):
+            return await self._process_running_files([dataset] if isinstance(dataset, str) else list(dataset), max_workers)
+
         try:
+            df = dataset
             processed_data = {}
 
             if 'pace' in df.columns:
@@ -231,10 +217,24 @@ class KaggleDataService:
             logger.error(f"Erreur traitement dataset: {e}")
             return {}
 
-    def _analyze_demographics(self, df: pd.DataFrame) -> Dict[str, Any]:
+    async def _process_running_files(self, paths: List[str], max_workers: Optional[int]) -> Dict[str, Any]:
+        """Mode flux de process_running_dataset : profil par blocs hors de la boucle d'événements"""
+        from services.dataset_profile import profile_dataset_files
+
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, profile_dataset_files, paths, max_workers)
+
+        except Exception as e:
+            logger.error(f"Erreur traitement dataset: {e}")
+            return {}
+
+    def _analyze_demographics(self, df: "pd.DataFrame") -> Dict[str, Any]:
         """
         Analyse démographique du dataset
         """
+        import pandas as pd
+
         analysis = {}
 
         # Analyse par âge
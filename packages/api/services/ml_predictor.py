@@ -1,139 +1,340 @@
 import numpy as np
-import pandas as pd
-from typing import List, Dict, Any, Optional, Tuple
-from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Sequence, Tuple, Union
+from datetime import datetime, timedelta, timezone
 import logging
-from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
-from sklearn.linear_model import LinearRegression
-from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import mean_absolute_error, r2_score
-import joblib
 import os
-
-from models.workout import WorkoutData, PerformancePrediction
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from models.workout import WorkoutData, WorkoutType, PerformancePrediction, parse_date
+from models.workout_frame import WorkoutFrame, utc_now, days_between
+from models.training_load import TrainingLoadState, workout_loads
+from services.result_cache import frame_digest
+from services.model_registry import ModelRegistry, ModelSet, current_rss_bytes
+from services.inference_batcher import InferenceBatcher
+from services.benchmark_tables import RIEGEL_EXPONENT
 
 logger = logging.getLogger(__name__)
 
+# Nombre d'historiques dont les caractéristiques restent en mémoire (FEATURE_CACHE_SIZE)
+DEFAULT_FEATURE_CACHE_SIZE = 256
+
+# Formules empiriques : allure de course = meilleure allure récente x facteur de la tranche de distance
+# 5K plus rapide que l'entraînement, 10K légèrement plus rapide, semi-marathon en endurance,
+# marathon plus conservateur, ultra très conservateur
+EMPIRICAL_DISTANCE_BOUNDS = np.array([5, 10, 21.1, 42.2])
+EMPIRICAL_PACE_FACTORS = np.array([0.95, 0.98, 1.05, 1.15, 1.25])
+
+# Un modèle entraîné par tranche de distance (mêmes bornes que EMPIRICAL_DISTANCE_BOUNDS)
+MODEL_KEYS = ("5k_model", "10k_model", "half_marathon_model", "marathon_model", "ultra_model")
+
+# Cible des modèles entraînés : temps de course ramené à 1 km par la formule de Riegel
+# (temps / distance^RIEGEL_EXPONENT) ; la prédiction est remise à l'échelle de chaque distance,
+# si bien que deux distances d'une même tranche n'ont pas le même temps prédit
+MODEL_TARGET = "riegel_normalized_time"
+
+# Features sélectionnées pour les modèles, dans l'ordre du vecteur d'entrée
+MODEL_FEATURES = (
+    'avg_pace', 'best_pace', 'avg_distance', 'max_distance',
+    'consistency_score', 'training_load', 'recent_form',
+    'training_frequency', 'endurance_ratio', 'speed_ratio'
+)
+
+# Distances des courses standard prédites par défaut (km) : 5K, 10K, semi-marathon, marathon
+STANDARD_RACE_DISTANCES = (5.0, 10.0, 21.1, 42.195)
+
+# Intervalle entre deux vérifications de la version active du registre (MODEL_REGISTRY_POLL, secondes)
+DEFAULT_REGISTRY_POLL_SECONDS = 5.0
+
+# Étapes chronométrées d'une prédiction
+PREDICTION_STAGES = ("features", "prediction", "confidence", "fitness", "recommendations", "milestones")
+
 class MLPredictorService:
     """
     Service de prédiction ML pour les performances de course à pied
     """
 
     def __init__(self):
-        self.models = {}
-        self.scalers = {}
-        self.model_path = "models/"
-        self.is_trained = False
-
-        # Créer le dossier models s'il n'existe pas
-        os.makedirs(self.model_path, exist_ok=True)
+        # Modèles entraînés : version active du registre, chargée au démarrage et remplacée
+        # d'un bloc lorsqu'une nouvelle version est activée
+        self.registry = ModelRegistry()
+        self.model_set = ModelSet()
+        self.registry_poll_seconds = float(os.getenv("MODEL_REGISTRY_POLL", DEFAULT_REGISTRY_POLL_SECONDS))
+        # Jamais vérifié : la version active est chargée à la première prédiction (ou par
+        # reload_models au démarrage), pas à la construction du service
+        self._registry_checked_at = float("-inf")
+
+        # Regroupement des appels predict concurrents (INFERENCE_BATCH_WAIT_MS / INFERENCE_BATCH_SIZE)
+        self.batcher = InferenceBatcher()
+
+        # Caractéristiques par historique (empreinte, charge, jour) : une prédiction répétée
+        # sur le même historique ne refait pas l'extraction. Accès protégé : les prédictions
+        # peuvent s'exécuter sur plusieurs threads
+        self.feature_cache_size = int(os.getenv("FEATURE_CACHE_SIZE", DEFAULT_FEATURE_CACHE_SIZE))
+        self._feature_cache: "OrderedDict[str, Dict[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.feature_cache_hits = 0
+        self.feature_cache_misses = 0
+
+        # Étape -> [appels, durée totale, durée max] (secondes)
+        self._stage_timings: Dict[str, List[float]] = {stage: [0, 0.0, 0.0] for stage in PREDICTION_STAGES}
+
+    @property
+    def models(self) -> Dict[str, Any]:
+        return self.model_set.models
+
+    @property
+    def scalers(self) -> Dict[str, Any]:
+        return self.model_set.scalers
+
+    @property
+    def is_trained(self) -> bool:
+        return bool(self.model_set.models)
+
+    def reload_models(self, version: Optional[str] = None) -> ModelSet:
+        """
+        Chargement d'une version du registre (la version active par défaut) puis bascule :
+        les prédictions en cours gardent l'ancienne version, les suivantes utilisent la nouvelle
+        En cas d'échec, la version chargée reste en place
+        """
+        self._registry_checked_at = time.monotonic()
+        try:
+            model_set = self.registry.load(version)
+        except Exception as e:
+            logger.error(f"Erreur chargement des modèles ({version or 'version active'}): {e}")
+            return self.model_set
+        self.model_set = model_set
+        return model_set
+
+    def _refresh_models(self) -> None:
+        """Bascule sur la version active du registre si elle a changé (au plus tous les MODEL_REGISTRY_POLL)"""
+        if time.monotonic() - self._registry_checked_at < self.registry_poll_seconds:
+            return
+        self._registry_checked_at = time.monotonic()
+        if self.registry.current_version() != self.model_set.version:
+            self.reload_models()
+
+    def model_status(self) -> Dict[str, Any]:
+        """Version chargée, versions disponibles et coût de chargement par modèle"""
+        return {
+            **self.model_set.summary(),
+            "active_version": self.registry.current_version(),
+            "available_versions": self.registry.versions(),
+            "process_rss_bytes": current_rss_bytes(),
+            "worker_pid": os.getpid()
+        }
 
     async def predict_race_time(
         self,
-        workout_history: List[WorkoutData],
+        workout_history: Union[List[WorkoutData], WorkoutFrame],
         target_distance: float,
-        target_date: str
+        target_date: str,
+        load_state: Optional[TrainingLoadState] = None
     ) -> PerformancePrediction:
         """
         Prédiction du temps de course basée sur l'historique d'entraînement
+        load_state : état de charge persistant de l'athlète (optionnel)
         """
-        try:
-            # Préparer les données d'entrée
-            features = self._extract_features_from_history(workout_history)
-
-            # Calculer les jours jusqu'à la compétition
-            days_to_race = self._calculate_days_to_race(target_date)
-            features['days_to_race'] = days_to_race
-            features['target_distance'] = target_distance
+        predictions = await self.predict_race_times(workout_history, [(target_distance, target_date)], load_state)
+        return predictions[0]
 
-            # Prédiction selon la distance
-            predicted_time_seconds = await self._predict_for_distance(features, target_distance)
-            predicted_time = self._seconds_to_time_string(predicted_time_seconds)
-
-            # Évaluer la confiance de la prédiction
-            confidence_level = self._calculate_confidence(workout_history, target_distance)
+    async def predict_race_times(
+        self,
+        workout_history: Union[List[WorkoutData], WorkoutFrame],
+        targets: Sequence[Tuple[float, str]],
+        load_state: Optional[TrainingLoadState] = None
+    ) -> List[PerformancePrediction]:
+        """
+        Prédictions pour plusieurs objectifs (distance, date) à partir d'une seule extraction
+        des caractéristiques ; temps et confiances sont calculés en un lot vectorisé
+        Retourne une PerformancePrediction par objectif, dans l'ordre reçu
+        """
+        try:
+            self._refresh_models()
+            workout_history = WorkoutFrame.coerce(workout_history).chronological()
+            target_distances = np.array([float(distance) for distance, _ in targets])
+            target_dates = [target_date for _, target_date in targets]
 
-            # Évaluer le niveau de forme actuel
-            current_fitness_level = self._assess_current_fitness(workout_history)
+            # Préparer les données d'entrée : extraites une fois, partagées par toutes les étapes
+            with self._stage("features"):
+                features = self._history_features(workout_history, load_state)
 
-            # Calculer le potentiel d'amélioration
-            improvement_potential = self._calculate_improvement_potential(
-                workout_history, days_to_race, current_fitness_level
-            )
+            # Calculer les jours jusqu'à chaque compétition (une fois par date distincte)
+            days_by_date = {target_date: self._calculate_days_to_race(target_date) for target_date in set(target_dates)}
 
-            # Générer des recommandations d'entraînement
-            training_recommendations = self._generate_training_recommendations(
-                workout_history, target_distance, days_to_race
-            )
+            # Prédiction selon la distance, pour tous les objectifs
+            with self._stage("prediction"):
+                predicted_times_seconds = await self._predict_for_distances(features, target_distances)
 
-            # Prédictions de jalons intermédiaires
-            milestone_predictions = self._generate_milestone_predictions(
-                target_distance, predicted_time_seconds, days_to_race
-            )
+            # Évaluer la confiance des prédictions
+            with self._stage("confidence"):
+                confidence_levels = self._calculate_confidence(workout_history, target_distances)
 
-            return PerformancePrediction(
-                target_distance=target_distance,
-                target_date=target_date,
-                predicted_time=predicted_time,
-                confidence_level=confidence_level,
-                current_fitness_level=current_fitness_level,
-                improvement_potential=improvement_potential,
-                training_recommendations=training_recommendations,
-                milestone_predictions=milestone_predictions
-            )
+            # Évaluer le niveau de forme actuel
+            with self._stage("fitness"):
+                current_fitness_level = self._assess_current_fitness(workout_history, features)
+
+                # Calculer le potentiel d'amélioration
+                improvement_by_date = {
+                    target_date: self._calculate_improvement_potential(workout_history, days_to_race, current_fitness_level)
+                    for target_date, days_to_race in days_by_date.items()
+                }
+
+            predictions = []
+            for target_distance, target_date, predicted_time_seconds, confidence_level in zip(
+                target_distances.tolist(), target_dates, predicted_times_seconds, confidence_levels.tolist()
+            ):
+                days_to_race = days_by_date[target_date]
+
+                # Générer des recommandations d'entraînement
+                with self._stage("recommendations"):
+                    training_recommendations = self._generate_training_recommendations(
+                        features, target_distance, days_to_race
+                    )
+
+                # Prédictions de jalons intermédiaires
+                with self._stage("milestones"):
+                    milestone_predictions = self._generate_milestone_predictions(
+                        target_distance, predicted_time_seconds, days_to_race
+                    )
+
+                predictions.append(PerformancePrediction(
+                    target_distance=target_distance,
+                    target_date=target_date,
+                    predicted_time=self._seconds_to_time_string(predicted_time_seconds),
+                    confidence_level=confidence_level,
+                    current_fitness_level=current_fitness_level,
+                    improvement_potential=improvement_by_date[target_date],
+                    training_recommendations=training_recommendations,
+                    milestone_predictions=milestone_predictions
+                ))
+
+            return predictions
 
         except Exception as e:
             logger.error(f"Erreur prédiction performance: {e}")
             raise
 
-    async def _predict_for_distance(self, features: Dict[str, float], distance: float) -> float:
-        """
-        Prédiction pour une distance spécifique
-        """
-        # Si pas de modèle entraîné, utiliser des formules empiriques
-        if not self.is_trained:
-            return self._predict_using_empirical_formulas(features, distance)
+    def _history_features(
+        self,
+        workouts: WorkoutFrame,
+        load_state: Optional[TrainingLoadState] = None
+    ) -> Dict[str, float]:
+        """
+        Caractéristiques de l'historique, depuis le cache si elles ont déjà été extraites
+        La clé couvre le contenu de l'historique, la charge persistante et le jour courant
+        (days_since_last_workout) ; le dictionnaire retourné est partagé et ne doit pas être modifié
+        """
+        digest = frame_digest(workouts)
+        load = load_state.total_load if load_state is not None else None
+        digest.update(f"{load}|{utc_now().astype('datetime64[D]')}".encode())
+        key = digest.hexdigest()
+
+        with self._lock:
+            features = self._feature_cache.get(key)
+            if features is not None:
+                self._feature_cache.move_to_end(key)
+                self.feature_cache_hits += 1
+                return features
+            self.feature_cache_misses += 1
+
+        features = self._extract_features_from_history(workouts, load_state)
+
+        with self._lock:
+            self._feature_cache[key] = features
+            while len(self._feature_cache) > self.feature_cache_size:
+                self._feature_cache.popitem(last=False)
+        return features
 
-        # Sinon utiliser le modèle ML entraîné
-        model_key = self._get_model_key_for_distance(distance)
-        if model_key in self.models:
-            feature_vector = self._features_to_vector(features)
-            return self.models[model_key].predict([feature_vector])[0]
+    @contextmanager
+    def _stage(self, stage: str):
+        """Chronométrage d'une étape de prédiction"""
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started_at
+            with self._lock:
+                timing = self._stage_timings[stage]
+                timing[0] += 1
+                timing[1] += elapsed
+                timing[2] = max(timing[2], elapsed)
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Regroupement des inférences, cache des caractéristiques et durées par étape de prédiction
+        En mode d'exécution process, chaque worker a ses propres compteurs
+        """
+        with self._lock:
+            lookups = self.feature_cache_hits + self.feature_cache_misses
+            return {
+                "inference_batcher": self.batcher.metrics(),
+                "feature_cache": {
+                    "entries": len(self._feature_cache),
+                    "max_entries": self.feature_cache_size,
+                    "hits": self.feature_cache_hits,
+                    "misses": self.feature_cache_misses,
+                    "hit_ratio": round(self.feature_cache_hits / lookups, 4) if lookups else 0.0
+                },
+                "stages": {
+                    stage: {
+                        "calls": int(calls),
+                        "avg_ms": round(total / max(1, calls) * 1000, 3),
+                        "max_ms": round(longest * 1000, 3)
+                    }
+                    for stage, (calls, total, longest) in self._stage_timings.items()
+                },
+                "worker_pid": os.getpid()
+            }
+
+    async def _predict_for_distances(self, features: Dict[str, float], distances: np.ndarray) -> np.ndarray:
+        """
+        Prédiction pour plusieurs distances (temps en secondes)
+        """
+        # Formules empiriques pour toutes les distances (pas de modèle entraîné ou fallback)
+        predictions = self._predict_using_empirical_formulas(features, distances)
+        model_set = self.model_set  # version utilisée pour toute la prédiction
+        if not model_set.models:
+            return predictions
+
+        # Sinon utiliser les modèles ML entraînés : le vecteur de features ne dépend que de
+        # l'historique, une ligne par modèle quelle que soit la répartition des distances,
+        # prédite dans un lot avec celles des requêtes concurrentes
+        model_keys = [self._get_model_key_for_distance(distance) for distance in distances.tolist()]
+        feature_vector = self._features_to_vector(features)
+        pending = {
+            model_key: self.batcher.submit(
+                model_set.models[model_key], model_set.scalers.get(model_key), feature_vector
+            )
+            for model_key in set(model_keys) if model_key in model_set.models
+        }
+        # Versions antérieures (sans cible déclarée) : temps brut, identique pour toute la tranche
+        scale = distances ** RIEGEL_EXPONENT if model_set.metadata.get("target") == MODEL_TARGET else np.ones_like(distances)
+        for model_key, future in pending.items():
+            mask = np.array([key == model_key for key in model_keys])
+            predictions[mask] = await asyncio.wrap_future(future) * scale[mask]
 
-        # Fallback sur formules empiriques
-        return self._predict_using_empirical_formulas(features, distance)
+        return predictions
 
-    def _predict_using_empirical_formulas(self, features: Dict[str, float], distance: float) -> float:
+    def _predict_using_empirical_formulas(self, features: Dict[str, float], distances: np.ndarray) -> np.ndarray:
         """
         Prédictions basées sur des formules empiriques bien établies
         """
         # Utiliser la meilleure allure récente comme base
         best_pace = features.get('best_recent_pace', 300)  # 5:00/km par défaut
 
-        # Facteurs d'ajustement selon la distance
-        if distance <= 5:
-            # 5K - pace plus rapide que l'entraînement
-            adjusted_pace = best_pace * 0.95
-        elif distance <= 10:
-            # 10K - légèrement plus rapide
-            adjusted_pace = best_pace * 0.98
-        elif distance <= 21.1:
-            # Semi-marathon - pace d'endurance
-            adjusted_pace = best_pace * 1.05
-        elif distance <= 42.2:
-            # Marathon - pace plus conservateur
-            adjusted_pace = best_pace * 1.15
-        else:
-            # Ultra - très conservateur
-            adjusted_pace = best_pace * 1.25
+        # Facteurs d'ajustement selon la distance (tranche de EMPIRICAL_DISTANCE_BOUNDS)
+        adjusted_pace = best_pace * EMPIRICAL_PACE_FACTORS[np.searchsorted(EMPIRICAL_DISTANCE_BOUNDS, distances)]
 
         # Ajustements selon la forme et l'expérience
         fitness_multiplier = self._get_fitness_multiplier(features)
         adjusted_pace *= fitness_multiplier
 
         # Temps total en secondes
-        total_seconds = adjusted_pace * distance
+        total_seconds = adjusted_pace * distances
 
         return total_seconds
 
@@ -164,32 +365,20 @@ class MLPredictorService:
 
         return multiplier
 
-    def _extract_features_from_history(self, workouts: List[WorkoutData]) -> Dict[str, float]:
+    def _extract_features_from_history(
+        self,
+        workouts: WorkoutFrame,
+        load_state: Optional[TrainingLoadState] = None
+    ) -> Dict[str, float]:
         """
         Extraction des caractéristiques d'entraînement pour la prédiction
         """
         if not workouts:
             return self._get_default_features()
 
-        # Conversion des allures en secondes
-        paces = []
-        distances = []
-        durations = []
-        dates = []
-
-        for workout in workouts:
-            try:
-                pace_parts = workout.pace.split(":")
-                pace_seconds = int(pace_parts[0]) * 60 + int(pace_parts[1])
-                paces.append(pace_seconds)
-                distances.append(workout.distance)
-                durations.append(workout.duration)
-                dates.append(datetime.fromisoformat(workout.date.replace('Z', '+00:00')))
-            except:
-                continue
-
-        if not paces:
-            return self._get_default_features()
+        paces = workouts.pace_seconds
+        distances = workouts.distance
+        durations = workouts.duration
 
         # Calculs statistiques
         features = {
@@ -202,29 +391,25 @@ class MLPredictorService:
             'avg_duration': np.mean(durations),
             'workout_count': len(workouts),
             'consistency_score': self._calculate_consistency_score(workouts),
-            'training_load': self._calculate_training_load(workouts),
+            'training_load': self._calculate_training_load(workouts, load_state),
             'recent_form': self._calculate_recent_form(workouts[-5:] if len(workouts) >= 5 else workouts)
         }
 
-        # Analyse temporelle
+        # Analyse temporelle (index chronologique : première et dernière séance)
+        dates = workouts.time_index().timestamp
         if len(dates) >= 2:
-            date_range = (max(dates) - min(dates)).days
+            date_range = days_between(dates[0], dates[-1])
             features['training_period_days'] = date_range
             features['training_frequency'] = len(workouts) / max(1, date_range / 7)  # workouts per week
 
             # Dernière activité
-            last_workout = max(dates)
-            features['days_since_last_workout'] = (datetime.now() - last_workout).days
+            features['days_since_last_workout'] = days_between(dates[-1], utc_now())
 
         # Analyse par type d'entraînement
-        type_counts = {}
-        for workout in workouts:
-            type_counts[workout.type] = type_counts.get(workout.type, 0) + 1
-
         total_workouts = len(workouts)
-        features['endurance_ratio'] = type_counts.get('endurance', 0) / total_workouts
-        features['speed_ratio'] = type_counts.get('fractionné', 0) / total_workouts
-        features['recovery_ratio'] = type_counts.get('récupération', 0) / total_workouts
+        features['endurance_ratio'] = workouts.type_count(WorkoutType.endurance) / total_workouts
+        features['speed_ratio'] = workouts.type_count(WorkoutType.fractionne) / total_workouts
+        features['recovery_ratio'] = workouts.type_count(WorkoutType.recuperation) / total_workouts
 
         # Tendances récentes
         if len(workouts) >= 4:
@@ -232,12 +417,12 @@ class MLPredictorService:
             old = workouts[-8:-4] if len(workouts) >= 8 else workouts[:-4]
 
             if old:
-                recent_avg_pace = np.mean([self._pace_to_seconds(w.pace) for w in recent])
-                old_avg_pace = np.mean([self._pace_to_seconds(w.pace) for w in old])
+                recent_avg_pace = np.mean(recent.pace_seconds)
+                old_avg_pace = np.mean(old.pace_seconds)
                 features['pace_improvement'] = (old_avg_pace - recent_avg_pace) / old_avg_pace
 
-                recent_avg_distance = np.mean([w.distance for w in recent])
-                old_avg_distance = np.mean([w.distance for w in old])
+                recent_avg_distance = np.mean(recent.distance)
+                old_avg_distance = np.mean(old.distance)
                 features['distance_trend'] = (recent_avg_distance - old_avg_distance) / old_avg_distance
 
         # Features spécialisées
@@ -272,15 +457,7 @@ class MLPredictorService:
             'avg_weekly_distance': 15
         }
 
-    def _pace_to_seconds(self, pace_str: str) -> int:
-        """Conversion pace vers secondes"""
-        try:
-            parts = pace_str.split(":")
-            return int(parts[0]) * 60 + int(parts[1])
-        except:
-            return 300  # 5:00/km par défaut
-
-    def _calculate_consistency_score(self, workouts: List[WorkoutData]) -> float:
+    def _calculate_consistency_score(self, workouts: WorkoutFrame) -> float:
         """
         Calcul d'un score de consistance (0-1)
         """
@@ -288,11 +465,11 @@ class MLPredictorService:
             return 0.3
 
         # Variance des allures
-        paces = [self._pace_to_seconds(w.pace) for w in workouts]
+        paces = workouts.pace_seconds
         pace_cv = np.std(paces) / np.mean(paces)  # Coefficient de variation
 
         # Variance des distances
-        distances = [w.distance for w in workouts]
+        distances = workouts.distance
         distance_cv = np.std(distances) / np.mean(distances)
 
         # Score basé sur la faible variance (plus consistant = meilleur score)
@@ -300,28 +477,18 @@ class MLPredictorService:
 
         return max(0, consistency)
 
-    def _calculate_training_load(self, workouts: List[WorkoutData]) -> float:
+    def _calculate_training_load(self, workouts: WorkoutFrame, load_state: Optional[TrainingLoadState] = None) -> float:
         """
         Calcul de la charge d'entraînement
+        Lue directement dans l'état de charge de l'athlète lorsqu'il est fourni
         """
-        total_load = 0
+        if load_state is not None:
+            return load_state.total_load
 
-        for workout in workouts:
-            # Facteur d'intensité basé sur le type
-            intensity_factor = {
-                'récupération': 0.5,
-                'endurance': 1.0,
-                'course': 1.2,
-                'fractionné': 1.5
-            }.get(workout.type, 1.0)
+        # Load = distance * intensité * durée relative
+        return float(np.sum(workout_loads(workouts)))
 
-            # Load = distance * intensité * durée relative
-            load = workout.distance * intensity_factor * (workout.duration / 60)
-            total_load += load
-
-        return total_load
-
-    def _calculate_recent_form(self, recent_workouts: List[WorkoutData]) -> float:
+    def _calculate_recent_form(self, recent_workouts: WorkoutFrame) -> float:
         """
         Évaluation de la forme récente (0-1)
         """
@@ -329,8 +496,7 @@ class MLPredictorService:
             return 0.5
 
         # Moyenne des allures récentes vs historique personnel
-        recent_paces = [self._pace_to_seconds(w.pace) for w in recent_workouts]
-        avg_recent_pace = np.mean(recent_paces)
+        avg_recent_pace = np.mean(recent_workouts.pace_seconds)
 
         # Comparaison à une base théorique (5:30/km = forme correcte)
         baseline_pace = 330
@@ -344,10 +510,10 @@ class MLPredictorService:
         Calcul du nombre de jours jusqu'à la compétition
         """
         try:
-            race_date = datetime.fromisoformat(target_date.replace('Z', '+00:00'))
-            return (race_date - datetime.now()).days
-        except:
+            race_date = parse_date(target_date)
+        except ValueError:
             return 60  # 60 jours par défaut
+        return (race_date - datetime.now(timezone.utc)).days
 
     def _seconds_to_time_string(self, total_seconds: float) -> str:
         """
@@ -362,11 +528,11 @@ class MLPredictorService:
         else:
             return f"{minutes}:{seconds:02d}"
 
-    def _calculate_confidence(self, workout_history: List[WorkoutData], target_distance: float) -> float:
+    def _calculate_confidence(self, workout_history: WorkoutFrame, target_distances: np.ndarray) -> np.ndarray:
         """
-        Calcul du niveau de confiance de la prédiction
+        Calcul du niveau de confiance de la prédiction, pour chaque distance cible
         """
-        confidence = 0.5  # Base
+        confidence = np.full(target_distances.shape, 0.5)  # Base
 
         # Plus de données = plus de confiance
         if len(workout_history) > 20:
@@ -374,27 +540,26 @@ class MLPredictorService:
         elif len(workout_history) > 10:
             confidence += 0.1
 
-        # Expérience sur la distance
-        similar_distances = [w for w in workout_history if abs(w.distance - target_distance) <= target_distance * 0.2]
-        if len(similar_distances) >= 3:
-            confidence += 0.2
+        # Expérience sur la distance : séances à ±20% de chaque distance cible
+        similar_distances = np.count_nonzero(
+            np.abs(workout_history.distance[:, np.newaxis] - target_distances) <= target_distances * 0.2, axis=0
+        )
+        confidence[similar_distances >= 3] += 0.2
 
         # Récence des données
-        recent_workouts = len([w for w in workout_history[-10:]])
+        recent_workouts = len(workout_history[-10:])
         if recent_workouts >= 5:
             confidence += 0.1
 
-        return min(0.95, confidence)
+        return np.minimum(0.95, confidence)
 
-    def _assess_current_fitness(self, workout_history: List[WorkoutData]) -> str:
+    def _assess_current_fitness(self, workout_history: WorkoutFrame, features: Dict[str, float]) -> str:
         """
         Évaluation du niveau de forme actuel
         """
         if len(workout_history) < 5:
             return "débutant"
 
-        features = self._extract_features_from_history(workout_history)
-
         avg_pace = features.get('best_pace', 400)
         avg_distance = features.get('avg_distance', 3)
         consistency = features.get('consistency_score', 0.3)
@@ -431,7 +596,7 @@ class MLPredictorService:
         else:
             return "débutant"
 
-    def _calculate_improvement_potential(self, workout_history: List[WorkoutData], days_to_race: int, fitness_level: str) -> str:
+    def _calculate_improvement_potential(self, workout_history: WorkoutFrame, days_to_race: int, fitness_level: str) -> str:
         """
         Calcul du potentiel d'amélioration
         """
@@ -456,14 +621,12 @@ class MLPredictorService:
 
         return base_potential
 
-    def _generate_training_recommendations(self, workout_history: List[WorkoutData], target_distance: float, days_to_race: int) -> List[str]:
+    def _generate_training_recommendations(self, features: Dict[str, float], target_distance: float, days_to_race: int) -> List[str]:
         """
         Génération de recommandations d'entraînement spécialisées
         """
         recommendations = []
 
-        features = self._extract_features_from_history(workout_history)
-
         # Recommandations selon la distance cible
         if target_distance <= 10:
             recommendations.append("Intégrez 1-2 séances de fractionné par semaine pour la vitesse")
@@ -533,50 +696,50 @@ class MLPredictorService:
         """
         Clé de modèle selon la distance
         """
-        if distance <= 5:
-            return "5k_model"
-        elif distance <= 10:
-            return "10k_model"
-        elif distance <= 21.1:
-            return "half_marathon_model"
-        elif distance <= 42.2:
-            return "marathon_model"
-        else:
-            return "ultra_model"
+        return MODEL_KEYS[int(np.searchsorted(EMPIRICAL_DISTANCE_BOUNDS, distance))]
 
     def _features_to_vector(self, features: Dict[str, float]) -> np.ndarray:
         """
         Conversion des features en vecteur pour ML
         """
-        # Features sélectionnées pour le modèle
-        selected_features = [
-            'avg_pace', 'best_pace', 'avg_distance', 'max_distance',
-            'consistency_score', 'training_load', 'recent_form',
-            'training_frequency', 'endurance_ratio', 'speed_ratio'
-        ]
-
         vector = []
-        for feature in selected_features:
+        for feature in MODEL_FEATURES:
             vector.append(features.get(feature, 0))
 
         return np.array(vector)
 
     async def train_models_from_data(self, training_data: List[Dict[str, Any]]) -> bool:
         """
-        Entraînement des modèles ML à partir de données d'entraînement
-        Cette fonction serait appelée pour entraîner sur de vraies données
+        Entraînement des modèles ML à partir de données d'entraînement en mémoire
+        Une ligne par résultat de course : MODEL_FEATURES de l'historique préalable,
+        race_distance (km) et race_time_seconds
         """
         try:
-            # Cette fonction nécessiterait un dataset d'entraînement avec :
-            # - Historique d'entraînement
-            # - Temps réels de course
-            # - Caractéristiques de l'athlète
-
-            logger.info("Entraînement des modèles ML simulé")
-            self.is_trained = False  # Simulé pour cette version
+            from services.model_training import ChunkedModelTrainer
 
+            columns = {name: [row.get(name) for row in training_data] for name in {key for row in training_data for key in row}}
+            result = ChunkedModelTrainer().fit_chunks([columns])
+            self._publish_training(result)
             return True
 
         except Exception as e:
             logger.error(f"Erreur entraînement modèles: {e}")
-            return False
\ No newline at end of file
+            return False
+
+    def train_models_from_file(self, path: str, memory_limit_mb: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Entraînement hors mémoire depuis un fichier CSV ou Parquet lu par blocs
+        (mêmes colonnes que train_models_from_data), puis publication dans le registre
+        Retourne la version publiée et les statistiques d'entraînement par modèle
+        """
+        from services.model_training import ChunkedModelTrainer
+
+        result = ChunkedModelTrainer(memory_limit_mb).fit_file(path)
+        return self._publish_training(result)
+
+    def _publish_training(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Publication des modèles entraînés comme nouvelle version active, puis chargement"""
+        metadata = {key: value for key, value in result.items() if key != "models"}
+        version = self.registry.publish(result["models"], metadata=metadata)
+        self.reload_models(version)
+        return {"version": version, **metadata}
\ No newline at end of file
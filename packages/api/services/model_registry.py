@@ -0,0 +1,191 @@
+import os
+import json
+import time
+import shutil
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REGISTRY_DIR = "data/model_registry"
+
+# Fichier pointant vers la version active, remplacé par renommage atomique
+CURRENT_FILE = "CURRENT"
+MANIFEST_FILE = "manifest.json"
+MODEL_SUFFIX = ".joblib"
+SCALER_SUFFIX = ".scaler.joblib"
+
+
+def current_rss_bytes() -> int:
+    """
+    Mémoire résidente du processus (VmRSS sous Linux)
+    Repli sur le pic de mémoire résidente (getrusage) sur les autres systèmes
+    """
+    try:
+        with open("/proc/self/status", "r", encoding="ascii") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource
+    import sys
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class ModelSet:
+    """
+    Version chargée du registre : modèles et scalers par clé de distance (5k_model, ...)
+    Remplacée d'un bloc lors d'un changement de version
+    """
+
+    __slots__ = ("version", "models", "scalers", "metadata", "load_stats")
+
+    def __init__(
+        self,
+        version: Optional[str] = None,
+        models: Optional[Dict[str, Any]] = None,
+        scalers: Optional[Dict[str, Any]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        load_stats: Optional[Dict[str, Dict[str, Any]]] = None
+    ):
+        self.version = version
+        self.models = models or {}
+        self.scalers = scalers or {}
+        self.metadata = metadata or {}
+        self.load_stats = load_stats or {}
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "models": sorted(self.models),
+            "created_at": self.metadata.get("created_at"),
+            "load_stats": self.load_stats
+        }
+
+
+class ModelRegistry:
+    """
+    Registre versionné des modèles ML sur disque (MODEL_REGISTRY_DIR)
+    - une version = un dossier v0001, v0002... : un fichier joblib par modèle et par scaler,
+      plus un manifeste ; publiée par renommage atomique du dossier
+    - CURRENT désigne la version active ; le remplacer (renommage atomique) bascule
+      tous les processus qui surveillent le registre
+    - chargement avec mmap_mode="r" : les tableaux NumPy des modèles restent des pages
+      du fichier, partagées entre les workers qui chargent la même version
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or os.getenv("MODEL_REGISTRY_DIR", DEFAULT_REGISTRY_DIR)
+        os.makedirs(self.root, exist_ok=True)
+
+    def versions(self) -> List[str]:
+        """Versions publiées, de la plus ancienne à la plus récente"""
+        return sorted(
+            name for name in os.listdir(self.root)
+            if name.startswith("v") and name[1:].isdigit() and os.path.isdir(os.path.join(self.root, name))
+        )
+
+    def current_version(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self.root, CURRENT_FILE), "r", encoding="utf-8") as current:
+                return current.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def publish(
+        self,
+        models: Dict[str, Any],
+        scalers: Optional[Dict[str, Any]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        activate: bool = True
+    ) -> str:
+        """
+        Écriture d'une nouvelle version (dossier temporaire puis renommage atomique)
+        activate : la version devient la version active
+        Retourne le nom de la version
+        """
+        if not models:
+            raise ValueError("Aucun modèle à publier")
+        scalers = scalers or {}
+        import joblib
+
+        versions = self.versions()
+        version = f"v{int(versions[-1][1:]) + 1 if versions else 1:04d}"
+        staging = os.path.join(self.root, f".{version}.{os.getpid()}.tmp")
+        os.makedirs(staging)
+        try:
+            for model_key, model in models.items():
+                # Sans compression : condition du chargement en mémoire partagée (mmap)
+                joblib.dump(model, os.path.join(staging, f"{model_key}{MODEL_SUFFIX}"))
+            for model_key, scaler in scalers.items():
+                joblib.dump(scaler, os.path.join(staging, f"{model_key}{SCALER_SUFFIX}"))
+
+            manifest = {
+                "version": version,
+                "created_at": datetime.now().isoformat(),
+                "models": sorted(models),
+                "scalers": sorted(scalers),
+                **(metadata or {})
+            }
+            with open(os.path.join(staging, MANIFEST_FILE), "w", encoding="utf-8") as manifest_file:
+                json.dump(manifest, manifest_file, indent=2, default=str)
+
+            os.rename(staging, os.path.join(self.root, version))
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        logger.info(f"Registre de modèles: version {version} publiée ({len(models)} modèles)")
+        if activate:
+            self.activate(version)
+        return version
+
+    def activate(self, version: str) -> None:
+        """Bascule atomique de la version active"""
+        if version not in self.versions():
+            raise ValueError(f"Version de modèles inconnue: {version}")
+        pointer = os.path.join(self.root, CURRENT_FILE)
+        temporary = f"{pointer}.{os.getpid()}.tmp"
+        with open(temporary, "w", encoding="utf-8") as current:
+            current.write(version)
+        os.replace(temporary, pointer)
+        logger.info(f"Registre de modèles: version active {version}")
+
+    def load(self, version: Optional[str] = None) -> ModelSet:
+        """
+        Chargement d'une version (la version active par défaut) en mémoire partagée
+        Mesure par modèle : durée de chargement, mémoire résidente ajoutée, taille du fichier
+        """
+        version = version or self.current_version()
+        if version is None:
+            return ModelSet()
+
+        # joblib (et scikit-learn à la désérialisation) chargés seulement s'il y a des modèles
+        import joblib
+
+        directory = os.path.join(self.root, version)
+        with open(os.path.join(directory, MANIFEST_FILE), "r", encoding="utf-8") as manifest_file:
+            metadata = json.load(manifest_file)
+
+        models: Dict[str, Any] = {}
+        scalers: Dict[str, Any] = {}
+        load_stats: Dict[str, Dict[str, Any]] = {}
+        for model_key in metadata["models"]:
+            path = os.path.join(directory, f"{model_key}{MODEL_SUFFIX}")
+            rss_before = current_rss_bytes()
+            started_at = time.perf_counter()
+            models[model_key] = joblib.load(path, mmap_mode="r")
+            if model_key in metadata.get("scalers", ()):
+                scalers[model_key] = joblib.load(os.path.join(directory, f"{model_key}{SCALER_SUFFIX}"), mmap_mode="r")
+            load_stats[model_key] = {
+                "load_ms": round((time.perf_counter() - started_at) * 1000, 3),
+                "rss_bytes": current_rss_bytes() - rss_before,
+                "file_bytes": os.path.getsize(path)
+            }
+
+        total_ms = sum(stats["load_ms"] for stats in load_stats.values())
+        logger.info(f"Registre de modèles: version {version} chargée ({len(models)} modèles, {total_ms:.1f} ms)")
+        return ModelSet(version, models, scalers, metadata, load_stats)
@@ -0,0 +1,253 @@
+import os
+import sys
+import time
+import logging
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+import numpy as np
+
+from services.benchmark_tables import RIEGEL_EXPONENT
+from services.ml_predictor import EMPIRICAL_DISTANCE_BOUNDS, MODEL_FEATURES, MODEL_KEYS, MODEL_TARGET
+from services.model_registry import current_rss_bytes
+
+logger = logging.getLogger(__name__)
+
+# Colonnes du jeu d'entraînement : une ligne par résultat de course, avec les features de
+# l'historique qui la précède (MODEL_FEATURES), la distance et le temps réalisé
+# Les modèles apprennent le temps ramené à 1 km (MODEL_TARGET) : la distance fixe l'échelle du temps
+DISTANCE_COLUMN = "race_distance"
+TARGET_COLUMN = "race_time_seconds"
+# Distance en float64 : comparée aux bornes des tranches comme à la prédiction (21.1 reste en semi)
+TRAINING_DTYPES = {**{feature: "float32" for feature in MODEL_FEATURES}, DISTANCE_COLUMN: "float64", TARGET_COLUMN: "float32"}
+
+# Mémoire de travail de l'entraînement (TRAINING_MEMORY_MB) et taille maximale d'un bloc lu
+DEFAULT_MEMORY_LIMIT_MB = 512
+DEFAULT_CHUNK_ROWS = 100_000
+
+# Répartition du budget mémoire : blocs en cours de lecture, échantillons par modèle ;
+# le reste couvre les copies faites par l'apprentissage
+CHUNK_MEMORY_SHARE = 0.15
+SAMPLE_MEMORY_SHARE = 0.4
+# Octets par cellule numérique pendant la lecture d'un bloc (texte, objets pandas, conversion)
+PARSE_BYTES_PER_CELL = 32
+PARQUET_BUFFER_BYTES = 1 << 20
+
+VALIDATION_FRACTION = 0.1  # Lignes réservées à l'évaluation de chaque modèle
+MIN_TRAINING_ROWS = 50  # En dessous, la tranche de distance garde les formules empiriques
+
+
+class BucketSample:
+    """
+    Échantillon uniforme de taille bornée des lignes d'une tranche de distance
+    (échantillonnage par réservoir, vectorisé par bloc) : features, distances et temps
+    """
+
+    __slots__ = ("features", "distances", "targets", "seen", "size")
+
+    def __init__(self, capacity: int, width: int):
+        self.features = np.empty((capacity, width), dtype=np.float32)
+        self.distances = np.empty(capacity, dtype=np.float32)
+        self.targets = np.empty(capacity, dtype=np.float32)
+        self.seen = 0
+        self.size = 0
+
+    def add(self, features: np.ndarray, distances: np.ndarray, targets: np.ndarray, rng: np.random.Generator) -> None:
+        capacity = self.targets.shape[0]
+        # Remplissage initial du réservoir
+        free = min(capacity - self.size, targets.shape[0])
+        if free:
+            self.features[self.size:self.size + free] = features[:free]
+            self.distances[self.size:self.size + free] = distances[:free]
+            self.targets[self.size:self.size + free] = targets[:free]
+            self.size += free
+            self.seen += free
+            features, distances, targets = features[free:], distances[free:], targets[free:]
+        if not targets.shape[0]:
+            return
+
+        # Ligne de rang t conservée avec une probabilité capacity / t, à une position tirée au hasard
+        ranks = self.seen + np.arange(1, targets.shape[0] + 1)
+        slots = rng.integers(0, ranks)
+        kept = slots < capacity
+        self.features[slots[kept]] = features[kept]
+        self.distances[slots[kept]] = distances[kept]
+        self.targets[slots[kept]] = targets[kept]
+        self.seen += targets.shape[0]
+
+    def data(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return self.features[:self.size], self.distances[:self.size], self.targets[:self.size]
+
+
+def normalized_times(distances: np.ndarray, times: np.ndarray) -> np.ndarray:
+    """Temps de course ramenés à 1 km (Riegel), cible des modèles ; temps = cible * distance^RIEGEL_EXPONENT"""
+    return times / distances ** RIEGEL_EXPONENT
+
+
+def chunk_to_features(columns: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Bloc de colonnes -> (matrice MODEL_FEATURES dans l'ordre de _features_to_vector, distances, temps)
+    Feature absente ou manquante : 0, comme features.get(feature, 0) à la prédiction
+    """
+    if DISTANCE_COLUMN not in columns or TARGET_COLUMN not in columns:
+        raise ValueError(f"Colonnes {DISTANCE_COLUMN} et {TARGET_COLUMN} requises")
+    distances = np.asarray(columns[DISTANCE_COLUMN], dtype=np.float64)
+    targets = np.asarray(columns[TARGET_COLUMN], dtype=np.float32)
+    features = np.zeros((distances.shape[0], len(MODEL_FEATURES)), dtype=np.float32)
+    for index, feature in enumerate(MODEL_FEATURES):
+        if feature in columns:
+            features[:, index] = np.asarray(columns[feature], dtype=np.float32)
+    np.nan_to_num(features, copy=False, nan=0.0)
+
+    # Résultats inexploitables (distance ou temps manquant ou nul) écartés
+    valid = np.isfinite(distances) & np.isfinite(targets) & (distances > 0) & (targets > 0)
+    return features[valid], distances[valid], targets[valid]
+
+
+class ChunkedModelTrainer:
+    """
+    Entraînement des modèles de temps de course sur des jeux de données plus grands que la mémoire
+    - lecture par blocs (CSV ou Parquet) avec des types explicites (float32)
+    - features construites bloc par bloc, lignes réparties par tranche de distance (MODEL_KEYS)
+    - un échantillon uniforme borné par tranche ; un modèle ajusté par tranche sur le temps
+      ramené à 1 km (Riegel), remis à l'échelle de la distance demandée à la prédiction
+    La mémoire de travail (blocs + échantillons + apprentissage) reste sous memory_limit_mb
+    """
+
+    def __init__(self, memory_limit_mb: Optional[float] = None, chunk_rows: Optional[int] = None, seed: int = 0):
+        self.memory_limit = int((memory_limit_mb or float(os.getenv("TRAINING_MEMORY_MB", DEFAULT_MEMORY_LIMIT_MB))) * 2**20)
+        self.seed = seed
+
+        cells_per_row = len(TRAINING_DTYPES)
+        self.chunk_rows = max(1_000, min(
+            chunk_rows or DEFAULT_CHUNK_ROWS,
+            int(self.memory_limit * CHUNK_MEMORY_SHARE) // (cells_per_row * PARSE_BYTES_PER_CELL)
+        ))
+        # Échantillons d'entraînement et de validation de toutes les tranches (float32)
+        sample_rows = int(self.memory_limit * SAMPLE_MEMORY_SHARE) // ((len(MODEL_FEATURES) + 2) * 4)
+        self.sample_rows = max(MIN_TRAINING_ROWS, int(sample_rows * (1 - VALIDATION_FRACTION)) // len(MODEL_KEYS))
+        self.validation_rows = max(1, int(sample_rows * VALIDATION_FRACTION) // len(MODEL_KEYS))
+
+    def iter_chunks(self, path: str) -> Iterator[Dict[str, np.ndarray]]:
+        """Blocs de colonnes typées d'un fichier CSV ou Parquet (seules les colonnes connues sont lues)"""
+        if path.lower().endswith((".parquet", ".pq")):
+            import pyarrow.parquet as pq
+
+            # Lecture en flux des pages de chaque groupe de lignes plutôt que du groupe entier
+            parquet_file = pq.ParquetFile(path, buffer_size=PARQUET_BUFFER_BYTES, pre_buffer=False)
+            columns = [name for name in parquet_file.schema_arrow.names if name in TRAINING_DTYPES]
+            metadata = parquet_file.metadata
+            largest_group = max((metadata.row_group(index).num_rows for index in range(metadata.num_row_groups)), default=0)
+            if largest_group > self.chunk_rows:
+                # Un groupe de lignes est décodé en entier : il fixe le pic de lecture
+                logger.warning(
+                    f"{path}: groupes de lignes de {largest_group} lignes (> {self.chunk_rows}), "
+                    f"la mémoire de lecture peut dépasser le budget"
+                )
+            for batch in parquet_file.iter_batches(batch_size=self.chunk_rows, columns=columns):
+                yield {
+                    name: batch.column(index).to_numpy(zero_copy_only=False).astype(TRAINING_DTYPES[name], copy=False)
+                    for index, name in enumerate(batch.schema.names)
+                }
+        else:
+            import pandas as pd
+
+            reader = pd.read_csv(
+                path, usecols=lambda name: name in TRAINING_DTYPES, dtype=TRAINING_DTYPES, chunksize=self.chunk_rows
+            )
+            with reader:
+                for frame in reader:
+                    yield {name: frame[name].to_numpy() for name in frame.columns}
+
+    def fit_file(self, path: str) -> Dict[str, Any]:
+        logger.info(
+            f"Entraînement depuis {path}: blocs de {self.chunk_rows} lignes, "
+            f"{self.sample_rows} lignes max par modèle, budget {self.memory_limit / 2**20:.0f} Mo"
+        )
+        return {"source": os.path.basename(path), **self.fit_chunks(self.iter_chunks(path))}
+
+    def fit_chunks(self, chunks: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Passe unique sur les blocs puis ajustement d'un modèle par tranche de distance
+        Retourne les modèles ({clé: estimateur}) et les statistiques d'entraînement
+        """
+        from sklearn.ensemble import HistGradientBoostingRegressor
+        from sklearn.metrics import mean_absolute_error, r2_score
+
+        started_at = time.perf_counter()
+        rss_baseline = current_rss_bytes()
+        peak_rss = rss_baseline
+        rng = np.random.default_rng(self.seed)
+        width = len(MODEL_FEATURES)
+        training = {key: BucketSample(self.sample_rows, width) for key in MODEL_KEYS}
+        validation = {key: BucketSample(self.validation_rows, width) for key in MODEL_KEYS}
+
+        total_rows = 0
+        chunk_count = 0
+        for columns in chunks:
+            features, distances, targets = chunk_to_features(columns)
+            buckets = np.searchsorted(EMPIRICAL_DISTANCE_BOUNDS, distances)
+            held_out = rng.random(targets.shape[0]) < VALIDATION_FRACTION
+            for index, key in enumerate(MODEL_KEYS):
+                in_bucket = buckets == index
+                kept, held = in_bucket & ~held_out, in_bucket & held_out
+                training[key].add(features[kept], distances[kept], targets[kept], rng)
+                validation[key].add(features[held], distances[held], targets[held], rng)
+            total_rows += targets.shape[0]
+            chunk_count += 1
+            peak_rss = max(peak_rss, current_rss_bytes())
+            del columns, features, distances, targets
+
+        models: Dict[str, Any] = {}
+        bucket_stats: Dict[str, Dict[str, Any]] = {}
+        for key in MODEL_KEYS:
+            train_features, train_distances, train_targets = training[key].data()
+            stats: Dict[str, Any] = {"rows": training[key].seen + validation[key].seen, "training_rows": int(train_targets.shape[0])}
+            if train_targets.shape[0] < MIN_TRAINING_ROWS:
+                stats["skipped"] = f"moins de {MIN_TRAINING_ROWS} lignes"
+                bucket_stats[key] = stats
+                continue
+
+            model = HistGradientBoostingRegressor(random_state=self.seed)
+            model.fit(train_features, normalized_times(train_distances, train_targets))
+            models[key] = model
+            peak_rss = max(peak_rss, current_rss_bytes())
+
+            valid_features, valid_distances, valid_targets = validation[key].data()
+            if valid_targets.shape[0] >= 2:
+                # Erreurs mesurées sur les temps en secondes, comme à la prédiction
+                predicted = model.predict(valid_features) * valid_distances.astype(np.float64) ** RIEGEL_EXPONENT
+                stats["validation_rows"] = int(valid_targets.shape[0])
+                stats["mae_seconds"] = round(float(mean_absolute_error(valid_targets, predicted)), 2)
+                stats["r2"] = round(float(r2_score(valid_targets, predicted)), 4)
+            bucket_stats[key] = stats
+
+        if not models:
+            raise ValueError(f"Aucune tranche de distance avec au moins {MIN_TRAINING_ROWS} résultats")
+
+        elapsed = time.perf_counter() - started_at
+        logger.info(
+            f"Entraînement: {total_rows} résultats en {chunk_count} blocs, {len(models)} modèles, "
+            f"{elapsed:.1f}s, pic mémoire +{(peak_rss - rss_baseline) / 2**20:.0f} Mo"
+        )
+        return {
+            "models": models,
+            "features": list(MODEL_FEATURES),
+            "target": MODEL_TARGET,
+            "rows": total_rows,
+            "chunks": chunk_count,
+            "chunk_rows": self.chunk_rows,
+            "memory_limit_bytes": self.memory_limit,
+            "peak_rss_increase_bytes": peak_rss - rss_baseline,
+            "duration_s": round(elapsed, 2),
+            "buckets": bucket_stats
+        }
+
+
+if __name__ == "__main__":
+    # Lancement : python -m services.model_training resultats.csv|resultats.parquet [mémoire Mo]
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    from services.ml_predictor import MLPredictorService
+
+    summary = MLPredictorService().train_models_from_file(sys.argv[1], float(sys.argv[2]) if len(sys.argv) > 2 else None)
+    trained = [key for key, stats in summary["buckets"].items() if "skipped" not in stats]
+    print(f"Version {summary['version']} publiée : {summary['rows']} résultats, modèles {', '.join(trained)}")
@@ -0,0 +1,303 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from models.workout_frame import WorkoutFrame
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_TTL_SECONDS = 900
+# Niveau disque : taille maximale et intervalle minimal entre deux balayages (secondes)
+DEFAULT_DISK_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_DISK_SWEEP_SECONDS = 60
+
+# Version du format des clés : à incrémenter si le calcul des analyses change de façon incompatible
+CACHE_KEY_VERSION = b"v1"
+
+
+def frame_digest(frame: WorkoutFrame) -> "hashlib.blake2b":
+    """
+    Empreinte canonique d'un historique : calculée sur les colonnes décodées du WorkoutFrame,
+    donc identique quel que soit le format de la requête (JSON, colonnaire, MessagePack, Arrow)
+    L'ordre des séances envoyé est conservé (la dernière séance est celle analysée)
+    """
+    digest = hashlib.blake2b(CACHE_KEY_VERSION, digest_size=20)
+    digest.update(np.int64(len(frame)).tobytes())
+    digest.update("\x1f".join(str(workout_id) for workout_id in frame.ids.tolist()).encode())
+    for column in (frame.timestamp.astype(np.int64), frame.type_code, frame.duration,
+                   frame.distance, frame.pace_seconds, frame.heart_rate):
+        digest.update(np.ascontiguousarray(column).tobytes())
+    return digest
+
+
+class ResultCache:
+    """
+    Cache des résultats d'analyse adressé par contenu : clé = endpoint + empreinte canonique
+    de l'historique (+ paramètres), valeurs JSON
+    - niveau mémoire borné (nombre d'entrées et octets), éviction LRU, expiration (TTL)
+    - niveau disque optionnel (RESULT_CACHE_DIR) : les résultats survivent aux redémarrages ;
+      borné (RESULT_CACHE_DISK_MAX_BYTES), balayé régulièrement, accédé hors de la boucle d'événements
+    - requêtes identiques simultanées : un seul calcul, partagé
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        disk_dir: Optional[str] = None,
+        disk_max_bytes: Optional[int] = None
+    ):
+        self.max_entries = max_entries or int(os.getenv("RESULT_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+        self.max_bytes = max_bytes or int(os.getenv("RESULT_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+        self.ttl_seconds = ttl_seconds or float(os.getenv("RESULT_CACHE_TTL", DEFAULT_TTL_SECONDS))
+        self.disk_dir = disk_dir if disk_dir is not None else os.getenv("RESULT_CACHE_DIR")
+        self.disk_max_bytes = disk_max_bytes or int(os.getenv("RESULT_CACHE_DISK_MAX_BYTES", DEFAULT_DISK_MAX_BYTES))
+        self.disk_sweep_seconds = float(os.getenv("RESULT_CACHE_DISK_SWEEP", DEFAULT_DISK_SWEEP_SECONDS))
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+        self._sweep_lock = threading.Lock()
+        # Premier balayage à la première écriture
+        self._swept_at = float("-inf")
+        self.disk_bytes = 0
+
+        # clé -> (expiration, taille en octets, valeur)
+        self._entries: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.disk_evictions = 0
+
+    @staticmethod
+    def key(endpoint: str, frame: WorkoutFrame, *params: Any) -> str:
+        digest = frame_digest(frame)
+        digest.update(json.dumps([endpoint, *params], default=str).encode())
+        return digest.hexdigest()
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Résultat en cache (mémoire puis disque) ou calculé puis mis en cache
+        Le résultat calculé est converti en JSON (model_dump) pour être partagé et persisté
+        Les accès disque se font hors de la boucle d'événements
+        """
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            value = await self._load_disk(key)
+            if value is None:
+                self.misses += 1
+                result = await compute()
+                value = result.model_dump(mode="json") if hasattr(result, "model_dump") else result
+                encoded = self.put(key, value)
+                if encoded is not None:
+                    await self._save_disk(key, *encoded)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Marquée comme récupérée si aucune autre requête n'attendait ce calcul
+            future.exception()
+            raise
+        finally:
+            del self._in_flight[key]
+
+    def get(self, key: str) -> Optional[Any]:
+        """Résultat du niveau mémoire (None si absent ou expiré)"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, size, value = entry
+            if expires_at > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            self._remove(key)
+            self.expirations += 1
+        return None
+
+    def put(self, key: str, value: Any) -> Optional[Tuple[float, str]]:
+        """Insertion en mémoire ; retourne (expiration, JSON) à persister, None si trop volumineux"""
+        encoded = json.dumps(value, default=str)
+        size = len(encoded)
+        if size > self.max_bytes:
+            return None
+
+        expires_at = time.time() + self.ttl_seconds
+        self._store(key, expires_at, size, value)
+        return expires_at, encoded
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def _store(self, key: str, expires_at: float, size: int, value: Any) -> None:
+        """Insertion en mémoire puis éviction LRU jusqu'à respecter les deux bornes"""
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (expires_at, size, value)
+        self._bytes += size
+
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    # Niveau disque : un fichier JSON par clé, écrit par renommage atomique, date de modification
+    # = date d'expiration ; borné à disk_max_bytes (les fichiers qui expirent en premier partent d'abord)
+
+    async def _load_disk(self, key: str) -> Optional[Any]:
+        """Lecture disque sur un thread puis remontée en mémoire avec l'expiration d'origine"""
+        if not self.disk_dir:
+            return None
+        stored = await asyncio.get_running_loop().run_in_executor(None, self._read_disk, key, time.time())
+        if stored is None:
+            return None
+        expires_at, size, value = stored
+        self._store(key, expires_at, size, value)
+        self.disk_hits += 1
+        return value
+
+    async def _save_disk(self, key: str, expires_at: float, encoded: str) -> None:
+        if self.disk_dir:
+            await asyncio.get_running_loop().run_in_executor(None, self._write_disk, key, expires_at, encoded)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _read_disk(self, key: str, now: float) -> Optional[Tuple[float, int, Any]]:
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as cache_file:
+                stored = json.load(cache_file)
+            expires_at, value = stored["expires_at"], stored["value"]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Entrée de cache illisible {path}: {e}")
+            self._unlink(path)
+            return None
+
+        if expires_at <= now:
+            self.expirations += 1
+            self._unlink(path)
+            return None
+        return expires_at, len(json.dumps(value, default=str)), value
+
+    def _write_disk(self, key: str, expires_at: float, encoded: str) -> None:
+        path = self._disk_path(key)
+        temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temporary, "w", encoding="utf-8") as cache_file:
+                cache_file.write(f'{{"expires_at": {expires_at}, "value": {encoded}}}')
+            os.utime(temporary, (expires_at, expires_at))
+            os.replace(temporary, path)
+        except OSError as e:
+            logger.warning(f"Écriture du cache disque impossible {path}: {e}")
+            self._unlink(temporary)
+            return
+
+        # Estimation jusqu'au prochain balayage (qui recompte la taille réelle)
+        self.disk_bytes += len(encoded)
+        if self.disk_bytes > self.disk_max_bytes or time.monotonic() - self._swept_at >= self.disk_sweep_seconds:
+            self.sweep_disk()
+
+    def sweep_disk(self) -> int:
+        """
+        Suppression des fichiers expirés (et temporaires abandonnés) puis, au-delà de
+        disk_max_bytes, des fichiers qui expirent en premier ; retourne le nombre de fichiers supprimés
+        Un seul balayage à la fois (les autres appels sont ignorés)
+        """
+        if not self.disk_dir or not self._sweep_lock.acquire(blocking=False):
+            return 0
+        try:
+            now = time.time()
+            removed = 0
+            files = []
+            with os.scandir(self.disk_dir) as entries:
+                for entry in entries:
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    if entry.name.endswith(".tmp"):
+                        # Temporaire d'une écriture interrompue (plus ancien que la durée de vie)
+                        if stat.st_mtime + self.ttl_seconds <= now and self._unlink(entry.path):
+                            removed += 1
+                    elif entry.name.endswith(".json"):
+                        if stat.st_mtime <= now:
+                            if self._unlink(entry.path):
+                                removed += 1
+                                self.expirations += 1
+                        else:
+                            files.append((stat.st_mtime, stat.st_size, entry.path))
+
+            total = sum(size for _, size, _ in files)
+            if total > self.disk_max_bytes:
+                for _, size, path in sorted(files):
+                    if total <= self.disk_max_bytes:
+                        break
+                    if self._unlink(path):
+                        removed += 1
+                        self.disk_evictions += 1
+                    total -= size
+            self.disk_bytes = total
+            self._swept_at = time.monotonic()
+            return removed
+        finally:
+            self._sweep_lock.release()
+
+    @staticmethod
+    def _unlink(path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
+
+    def metrics(self) -> Dict[str, Any]:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "disk_tier": bool(self.disk_dir),
+            "disk_bytes": self.disk_bytes,
+            "disk_max_bytes": self.disk_max_bytes,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "disk_evictions": self.disk_evictions
+        }
@@ -0,0 +1,92 @@
+import os
+import sys
+import glob
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from .gpx_route import GpxTrack
+
+logger = logging.getLogger(__name__)
+
+CHUNKS_PER_WORKER = 4  # Découpage pour équilibrer la charge sans trop d'aller-retours IPC
+PROGRESS_STEPS = 20    # Nombre de rapports de progression sur un lot
+
+
+def _summarize_route_file(path: str) -> Tuple[str, Dict[str, Any]]:
+    """
+    Traitement d'une trace dans un processus worker
+    Seul le résumé compact est renvoyé au parent, jamais les tableaux de points
+    """
+    try:
+        with open(path, "rb") as route_file:
+            track = GpxTrack.from_bytes(route_file.read())
+        summary = track.route_summary()
+        summary["points"] = len(track)
+        return path, summary
+    except Exception as e:
+        return path, {"error": str(e)}
+
+
+class RouteBatchService:
+    """
+    Traitement par lots des traces GPX (workout-routes/route_*.gpx) sur un pool de processus
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+    def process_directory(self, directory: str, pattern: str = "route_*.gpx") -> Dict[str, Dict[str, Any]]:
+        """
+        Traitement de toutes les traces d'un dossier workout-routes
+        """
+        paths = sorted(glob.glob(os.path.join(directory, pattern)))
+        return self.process_files(paths)
+
+    def process_files(self, paths: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Répartition des traces sur le pool de processus par paquets
+        Retourne un résumé par nom de fichier
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        total = len(paths)
+        if not total:
+            return results
+
+        workers = min(self.max_workers, total)
+        chunksize = max(1, total // (workers * CHUNKS_PER_WORKER))
+        report_every = max(1, total // PROGRESS_STEPS)
+        started_at = time.perf_counter()
+        failures = 0
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for done, (path, summary) in enumerate(pool.map(_summarize_route_file, paths, chunksize=chunksize), 1):
+                results[os.path.basename(path)] = summary
+                if "error" in summary:
+                    failures += 1
+                    logger.warning(f"Trace GPX illisible {path}: {summary['error']}")
+
+                if done % report_every == 0 or done == total:
+                    self._report_progress(done, total, workers, time.perf_counter() - started_at)
+
+        logger.info(f"Traitement des traces terminé: {total - failures}/{total} réussies")
+        return results
+
+    def _report_progress(self, done: int, total: int, workers: int, elapsed: float) -> None:
+        """Rapport de progression : débit global et par worker"""
+        rate = done / elapsed if elapsed else 0.0
+        remaining = (total - done) / rate if rate else 0.0
+        logger.info(
+            f"Traces GPX {done}/{total} ({done * 100 / total:.0f}%) - "
+            f"{rate:.0f} traces/s sur {workers} workers ({rate / workers:.0f}/s par worker), "
+            f"reste ~{remaining:.0f}s"
+        )
+
+
+if __name__ == "__main__":
+    # Lancement : python -m services.route_batch chemin/vers/workout-routes [workers]
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    service = RouteBatchService(int(sys.argv[2]) if len(sys.argv) > 2 else None)
+    summaries = service.process_directory(sys.argv[1])
+    print(f"{len(summaries)} traces traitées")
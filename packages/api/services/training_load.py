@@ -0,0 +1,59 @@
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+from models.workout_frame import WorkoutFrame
+from models.training_load import TrainingLoadState
+from database.connection import get_database_connection
+
+logger = logging.getLogger(__name__)
+
+
+class TrainingLoadService:
+    """
+    Suivi incrémental de la charge d'entraînement (ATL/CTL/ACWR) par athlète
+    L'état est persisté via DatabaseConnection : seules les nouvelles séances sont intégrées
+    Chaque ajout est une lecture-modification-écriture atomique (transaction SQLite),
+    y compris entre plusieurs workers ; le stockage mémoire n'est pas partagé entre workers
+    """
+
+    async def get_state(self, athlete_id: str) -> TrainingLoadState:
+        """État courant d'un athlète (état vide s'il est inconnu)"""
+        db = await get_database_connection()
+        data = await db.get_training_load(athlete_id)
+        if data is None:
+            return TrainingLoadState(athlete_id)
+        return TrainingLoadState.from_dict(data)
+
+    async def append_workouts(self, athlete_id: str, workouts: WorkoutFrame) -> Tuple[TrainingLoadState, Dict[str, Any]]:
+        """
+        Intégration des séances dans l'état de l'athlète puis sauvegarde
+        - les séances déjà intégrées (renvoi de l'historique complet) sont ignorées
+        - un historique complet contenant des séances antérieures jamais intégrées
+          (ajout tardif) reconstruit l'état à partir de cet historique
+        - les autres séances antérieures à la dernière séance connue sont ignorées et comptées
+        Retourne l'état et le bilan {added, ignored, rebuilt}
+        """
+        workouts = WorkoutFrame.coerce(workouts)
+
+        def update(data: Optional[Dict[str, Any]]):
+            state = TrainingLoadState.from_dict(data) if data is not None else TrainingLoadState(athlete_id)
+            rebuilt = state.is_backfill(workouts)
+            if rebuilt:
+                state = TrainingLoadState.from_frame(workouts, athlete_id)
+                added = state.workout_count
+            else:
+                added = state.extend(workouts)
+            # Séances déjà intégrées, ou antérieures à la dernière séance connue dans un historique partiel
+            report = {"added": added, "ignored": len(workouts) - added, "rebuilt": rebuilt}
+            return (state.to_dict() if added else None), (state, report)
+
+        db = await get_database_connection()
+        state, report = await db.update_training_load(athlete_id, update)
+        if report["rebuilt"]:
+            logger.info(f"Charge d'entraînement {athlete_id}: ajout tardif détecté, état reconstruit ({report['added']} séances)")
+        elif report["added"] or report["ignored"]:
+            logger.info(
+                f"Charge d'entraînement {athlete_id}: {report['added']} séance(s) intégrée(s), "
+                f"{report['ignored']} ignorée(s)"
+            )
+        return state, report
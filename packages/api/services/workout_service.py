@@ -1,12 +1,19 @@
-from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
+import numpy as np
+from typing import List, Dict, Any, Optional, Union
+from datetime import datetime, timedelta, timezone
 import logging
 import asyncio
 
-from models.workout import WorkoutData, WorkoutCreate
+from models.workout import WorkoutData, WorkoutCreate, WorkoutType, parse_pace, parse_date
+from models.workout_frame import WorkoutFrame, WorkoutCalendar, WORKOUT_TYPES, WORKOUT_TYPE_CODES
+from models.rolling_window import RollingStats, RollingWindow
 
 logger = logging.getLogger(__name__)
 
+# Fenêtres glissantes de l'analyse des cycles : en séances puis en jours (semaine, mois)
+CYCLE_WINDOW_WORKOUTS = 5
+CYCLE_TIME_WINDOWS = {"7d": RollingWindow.days(7), "28d": RollingWindow.days(28)}
+
 class WorkoutService:
     """
     Service pour la gestion et l'analyse des entraînements
@@ -41,24 +48,18 @@ class WorkoutService:
 
         # Validation de l'allure
         try:
-            pace_parts = workout.pace.split(":")
-            minutes = int(pace_parts[0])
-            seconds = int(pace_parts[1])
-
-            if minutes < 0 or seconds < 0 or seconds >= 60:
-                validation_result["is_valid"] = False
-                validation_result["errors"].append("Format d'allure invalide")
-
+            pace_seconds = parse_pace(workout.pace)
+        except ValueError as e:
+            validation_result["is_valid"] = False
+            validation_result["errors"].append(str(e))
+        else:
             # Vérification de cohérence allure/distance/durée
-            expected_duration = (minutes * 60 + seconds) * workout.distance / 60
-            duration_diff = abs(expected_duration - workout.duration) / workout.duration
+            if workout.duration > 0:
+                expected_duration = pace_seconds * workout.distance / 60
+                duration_diff = abs(expected_duration - workout.duration) / workout.duration
 
-            if duration_diff > 0.15:  # Plus de 15% de différence
-                validation_result["warnings"].append("Incohérence entre allure, distance et durée")
-
-        except:
-            validation_result["is_valid"] = False
-            validation_result["errors"].append("Format d'allure invalide (attendu MM:SS)")
+                if duration_diff > 0.15:  # Plus de 15% de différence
+                    validation_result["warnings"].append("Incohérence entre allure, distance et durée")
 
         # Validation de la fréquence cardiaque
         if workout.heart_rate:
@@ -67,19 +68,25 @@ class WorkoutService:
 
         # Validation de la date
         try:
-            workout_date = datetime.fromisoformat(workout.date.replace('Z', '+00:00'))
-            if workout_date > datetime.now():
-                validation_result["warnings"].append("Date d'entraînement dans le futur")
-        except:
+            workout_date = parse_date(workout.date)
+        except ValueError as e:
             validation_result["is_valid"] = False
-            validation_result["errors"].append("Format de date invalide")
+            validation_result["errors"].append(str(e))
+        else:
+            if workout_date > datetime.now(timezone.utc):
+                validation_result["warnings"].append("Date d'entraînement dans le futur")
 
         return validation_result
 
-    async def analyze_workout_quality(self, workout: WorkoutData, history: List[WorkoutData]) -> Dict[str, Any]:
+    async def analyze_workout_quality(
+        self,
+        workout: WorkoutData,
+        history: Union[List[WorkoutData], WorkoutFrame]
+    ) -> Dict[str, Any]:
         """
         Analyse de la qualité d'un entraînement
         """
+        history = WorkoutFrame.coerce(history).chronological()
         analysis = {
             "overall_rating": "moyen",
             "technical_score": 0,
@@ -98,7 +105,7 @@ class WorkoutService:
             technical_score += 10
 
         # Évaluation de l'allure
-        pace_seconds = self._pace_to_seconds(workout.pace)
+        pace_seconds = workout.pace_seconds
         if pace_seconds < 300:  # Moins de 5min/km
             technical_score += 15
         elif pace_seconds < 360:  # Moins de 6min/km
@@ -142,10 +149,11 @@ class WorkoutService:
 
         return analysis
 
-    async def detect_training_patterns(self, workouts: List[WorkoutData]) -> Dict[str, Any]:
+    async def detect_training_patterns(self, workouts: Union[List[WorkoutData], WorkoutFrame]) -> Dict[str, Any]:
         """
         Détection de patterns dans l'entraînement
         """
+        workouts = WorkoutFrame.coerce(workouts).chronological()
         if len(workouts) < 5:
             return {"message": "Historique insuffisant pour détecter des patterns"}
 
@@ -157,11 +165,14 @@ class WorkoutService:
             "risk_patterns": []
         }
 
+        # Agrégats calendaires (semaines, mois, jours) calculés en une passe
+        calendar = WorkoutCalendar(workouts)
+
         # Analyse des patterns hebdomadaires
-        patterns["weekly_patterns"] = self._analyze_weekly_patterns(workouts)
+        patterns["weekly_patterns"] = self._analyze_weekly_patterns(calendar)
 
         # Tendances mensuelles
-        patterns["monthly_trends"] = self._analyze_monthly_trends(workouts)
+        patterns["monthly_trends"] = self._analyze_monthly_trends(calendar)
 
         # Préférences par type d'entraînement
         patterns["type_preferences"] = self._analyze_type_preferences(workouts)
@@ -174,14 +185,15 @@ class WorkoutService:
 
         return patterns
 
-    async def suggest_next_workout(self, workout_history: List[WorkoutData]) -> Dict[str, Any]:
+    async def suggest_next_workout(self, workout_history: Union[List[WorkoutData], WorkoutFrame]) -> Dict[str, Any]:
         """
         Suggestion du prochain entraînement basée sur l'historique
         """
+        workout_history = WorkoutFrame.coerce(workout_history).chronological()
         if not workout_history:
             return self._get_beginner_workout_suggestion()
 
-        recent_workouts = workout_history[-7:]  # 7 derniers
+        recent_workouts = workout_history.time_index().last_days(7)  # 7 derniers jours
 
         suggestion = {
             "recommended_type": "endurance",
@@ -194,8 +206,8 @@ class WorkoutService:
         }
 
         # Analyse de la charge récente
-        recent_load = sum([w.distance for w in recent_workouts])
-        recent_intensity = len([w for w in recent_workouts if w.type == "fractionné"])
+        recent_load = float(np.sum(recent_workouts.distance))
+        recent_intensity = recent_workouts.type_count(WorkoutType.fractionne)
 
         # Logique de suggestion basée sur les patterns
         if recent_intensity >= 2:
@@ -206,8 +218,7 @@ class WorkoutService:
             suggestion["suggested_distance"] = max(3, min(8, recent_load / 10))
             suggestion["reasoning"].append("Volume élevé récent - maintien en endurance")
         else:
-            last_workout = recent_workouts[-1]
-            if last_workout.type == "endurance":
+            if recent_workouts.type_code[-1] == WORKOUT_TYPE_CODES[WorkoutType.endurance]:
                 suggestion["recommended_type"] = "fractionné"
                 suggestion["reasoning"].append("Dernière séance en endurance - temps pour du fractionné")
 
@@ -224,14 +235,6 @@ class WorkoutService:
 
     # Méthodes utilitaires privées
 
-    def _pace_to_seconds(self, pace_str: str) -> int:
-        """Conversion pace vers secondes par km"""
-        try:
-            parts = pace_str.split(":")
-            return int(parts[0]) * 60 + int(parts[1])
-        except:
-            return 300  # 5:00/km par défaut
-
     def _seconds_to_pace(self, seconds: int) -> str:
         """Conversion secondes vers format pace"""
         minutes = seconds // 60
@@ -252,25 +255,25 @@ class WorkoutService:
         else:  # Facile
             return int(max_hr * 0.65)
 
-    def _compare_with_history(self, workout: WorkoutData, history: List[WorkoutData]) -> Dict[str, Any]:
+    def _compare_with_history(self, workout: WorkoutData, history: WorkoutFrame) -> Dict[str, Any]:
         """Comparaison avec l'historique"""
         comparisons = {}
 
         # Comparaison de distance
-        avg_distance = sum([w.distance for w in history[-10:]]) / min(len(history), 10)
+        avg_distance = float(np.mean(history.distance[-10:]))
         comparisons["distance_vs_average"] = (workout.distance - avg_distance) / avg_distance
 
         # Comparaison d'allure
-        recent_paces = [self._pace_to_seconds(w.pace) for w in history[-5:]]
-        if recent_paces:
-            avg_pace = sum(recent_paces) / len(recent_paces)
-            current_pace = self._pace_to_seconds(workout.pace)
+        recent_paces = history.pace_seconds[-5:]
+        if recent_paces.size:
+            avg_pace = float(np.mean(recent_paces))
+            current_pace = workout.pace_seconds
             comparisons["pace_improvement"] = (avg_pace - current_pace) / avg_pace
 
         # Comparaison par type
-        same_type = [w for w in history if w.type == workout.type]
-        if same_type:
-            type_avg_distance = sum([w.distance for w in same_type]) / len(same_type)
+        same_type_distances = history.distance[history.type_mask(workout.type)]
+        if same_type_distances.size:
+            type_avg_distance = float(np.mean(same_type_distances))
             comparisons[f"distance_vs_{workout.type}_average"] = (workout.distance - type_avg_distance) / type_avg_distance
 
         return comparisons
@@ -289,12 +292,12 @@ class WorkoutService:
         else:
             return "normal"
 
-    def _generate_workout_recommendations(self, workout: WorkoutData, history: List[WorkoutData]) -> List[str]:
+    def _generate_workout_recommendations(self, workout: WorkoutData, history: WorkoutFrame) -> List[str]:
         """Génération de recommandations post-entraînement"""
         recommendations = []
 
         # Recommandations basées sur l'allure
-        pace = self._pace_to_seconds(workout.pace)
+        pace = workout.pace_seconds
         if pace > 400:  # Plus de 6:40/km
             recommendations.append("Considérez un travail progressif de l'allure")
 
@@ -304,13 +307,12 @@ class WorkoutService:
 
         # Recommandations basées sur l'historique
         if history and len(history) >= 3:
-            recent_types = [w.type for w in history[-3:]]
-            if all(t == workout.type for t in recent_types):
+            if np.all(history.type_code[-3:] == WORKOUT_TYPE_CODES[WorkoutType(workout.type)]):
                 recommendations.append("Variez les types d'entraînement pour un développement équilibré")
 
         return recommendations or ["Bon entraînement ! Continuez sur cette voie."]
 
-    def _analyze_weekly_patterns(self, workouts: List[WorkoutData]) -> Dict[str, Any]:
+    def _analyze_weekly_patterns(self, calendar: WorkoutCalendar) -> Dict[str, Any]:
         """Analyse des patterns hebdomadaires"""
         weekly_stats = {
             "average_weekly_distance": 0,
@@ -318,57 +320,25 @@ class WorkoutService:
             "consistency_score": 0
         }
 
-        # Grouper par semaine
-        weekly_data = {}
-        for workout in workouts:
-            try:
-                date = datetime.fromisoformat(workout.date.replace('Z', '+00:00'))
-                week_key = date.strftime("%Y-W%U")
-                if week_key not in weekly_data:
-                    weekly_data[week_key] = []
-                weekly_data[week_key].append(workout)
-            except:
-                continue
-
-        if weekly_data:
-            weekly_distances = [sum(w.distance for w in week_workouts) for week_workouts in weekly_data.values()]
-            weekly_stats["average_weekly_distance"] = sum(weekly_distances) / len(weekly_distances)
-
-            # Jour le plus actif
-            day_counts = {}
-            for workout in workouts:
-                try:
-                    date = datetime.fromisoformat(workout.date.replace('Z', '+00:00'))
-                    day = date.strftime("%A")
-                    day_counts[day] = day_counts.get(day, 0) + 1
-                except:
-                    continue
-
-            if day_counts:
-                weekly_stats["most_active_day"] = max(day_counts.items(), key=lambda x: x[1])[0]
+        if calendar.week_distances.size:
+            weekly_stats["average_weekly_distance"] = float(np.mean(calendar.week_distances))
+            weekly_stats["most_active_day"] = calendar.most_active_day()
 
         return weekly_stats
 
-    def _analyze_monthly_trends(self, workouts: List[WorkoutData]) -> Dict[str, Any]:
+    def _analyze_monthly_trends(self, calendar: WorkoutCalendar) -> Dict[str, Any]:
         """Analyse des tendances mensuelles"""
-        monthly_data = {}
-
-        for workout in workouts:
-            try:
-                date = datetime.fromisoformat(workout.date.replace('Z', '+00:00'))
-                month_key = date.strftime("%Y-%m")
-                if month_key not in monthly_data:
-                    monthly_data[month_key] = {"distance": 0, "count": 0}
-                monthly_data[month_key]["distance"] += workout.distance
-                monthly_data[month_key]["count"] += 1
-            except:
-                continue
+        monthly_data = {
+            month: {"distance": distance, "count": count}
+            for month, distance, count in zip(
+                calendar.month_labels(), calendar.month_distances.tolist(), calendar.month_counts.tolist()
+            )
+        }
 
         trend = "stable"
         if len(monthly_data) >= 2:
-            months = sorted(monthly_data.keys())
-            recent_distance = monthly_data[months[-1]]["distance"]
-            old_distance = monthly_data[months[-2]]["distance"]
+            recent_distance = calendar.month_distances[-1]
+            old_distance = calendar.month_distances[-2]
 
             if recent_distance > old_distance * 1.1:
                 trend = "progression"
@@ -381,21 +351,22 @@ class WorkoutService:
             "months_tracked": len(monthly_data)
         }
 
-    def _analyze_type_preferences(self, workouts: List[WorkoutData]) -> Dict[str, Any]:
+    def _analyze_type_preferences(self, workouts: WorkoutFrame) -> Dict[str, Any]:
         """Analyse des préférences par type"""
         type_stats = {}
 
-        for workout in workouts:
-            if workout.type not in type_stats:
-                type_stats[workout.type] = {
-                    "count": 0,
-                    "total_distance": 0,
-                    "avg_distance": 0,
-                    "percentage": 0
-                }
-
-            type_stats[workout.type]["count"] += 1
-            type_stats[workout.type]["total_distance"] += workout.distance
+        # Types dans l'ordre de première apparition
+        codes, first_seen = np.unique(workouts.type_code, return_index=True)
+        counts = workouts.type_counts()
+        total_distances = np.bincount(workouts.type_code, weights=workouts.distance, minlength=len(WORKOUT_TYPES))
+
+        for code in codes[np.argsort(first_seen)]:
+            type_stats[WORKOUT_TYPES[code]] = {
+                "count": int(counts[code]),
+                "total_distance": float(total_distances[code]),
+                "avg_distance": 0,
+                "percentage": 0
+            }
 
         total_workouts = len(workouts)
         for workout_type in type_stats:
@@ -405,24 +376,21 @@ class WorkoutService:
 
         return type_stats
 
-    def _analyze_performance_cycles(self, workouts: List[WorkoutData]) -> Dict[str, Any]:
+    def _analyze_performance_cycles(self, workouts: WorkoutFrame) -> Dict[str, Any]:
         """Analyse des cycles de performance"""
         if len(workouts) < 10:
             return {"message": "Historique insuffisant pour analyser les cycles"}
 
-        # Analyser l'évolution des allures sur des fenêtres glissantes
-        window_size = 5
-        performance_data = []
-
-        for i in range(window_size, len(workouts)):
-            window = workouts[i-window_size:i]
-            avg_pace = sum([self._pace_to_seconds(w.pace) for w in window]) / window_size
-            performance_data.append(avg_pace)
+        # Analyser l'évolution des allures sur des fenêtres glissantes :
+        # moyenne des 5 séances précédant chaque séance, à partir de la 6e
+        paces = RollingStats(workouts.pace_seconds, workouts.timestamp)
+        window_size = CYCLE_WINDOW_WORKOUTS
+        performance_data = paces.mean(RollingWindow.workouts(window_size))[window_size - 1:-1]
 
         # Détecter les tendances
         if len(performance_data) >= 3:
-            recent_avg = sum(performance_data[-3:]) / 3
-            old_avg = sum(performance_data[:3]) / 3
+            recent_avg = float(np.sum(performance_data[-3:])) / 3
+            old_avg = float(np.sum(performance_data[:3])) / 3
 
             cycle_trend = "stable"
             if recent_avg < old_avg * 0.95:
@@ -432,36 +400,58 @@ class WorkoutService:
 
             return {
                 "cycle_trend": cycle_trend,
-                "performance_volatility": max(performance_data) - min(performance_data),
-                "periods_analyzed": len(performance_data)
+                "performance_volatility": float(np.ptp(performance_data)),
+                "periods_analyzed": len(performance_data),
+                "time_windows": self._summarize_time_windows(workouts, paces)
             }
 
         return {"message": "Données insuffisantes pour l'analyse cyclique"}
 
-    def _detect_risk_patterns(self, workouts: List[WorkoutData]) -> List[str]:
+    def _summarize_time_windows(self, workouts: WorkoutFrame, paces: RollingStats) -> Dict[str, Dict[str, float]]:
+        """
+        Fenêtres de 7 et 28 jours terminant à la dernière séance : volume, allure moyenne,
+        volatilité (écart-type glissant) et amplitude des allures de la dernière fenêtre,
+        avec l'écart-type médian sur tout l'historique
+        """
+        distances = RollingStats(workouts.distance, workouts.timestamp)
+        summary = {}
+        for name, window in CYCLE_TIME_WINDOWS.items():
+            pace_std = paces.std(window)
+            # Seule la dernière fenêtre est utile : amplitude directe, sans min / max glissants
+            last_window = workouts.pace_seconds[paces.starts(window)[-1]:]
+            summary[name] = {
+                "workouts": int(paces.counts(window)[-1]),
+                "distance": round(float(distances.sum(window)[-1]), 2),
+                "average_pace": round(float(paces.mean(window)[-1]), 1),
+                "pace_volatility": round(float(pace_std[-1]), 1),
+                "pace_range": round(float(np.ptp(last_window)), 1),
+                "typical_pace_volatility": round(float(np.median(pace_std)), 1)
+            }
+        return summary
+
+    def _detect_risk_patterns(self, workouts: WorkoutFrame) -> List[str]:
         """Détection de patterns à risque"""
         risk_patterns = []
 
-        # Surcharge récente
-        recent = workouts[-7:]
+        # Surcharge récente (7 derniers jours)
+        recent = workouts.time_index().last_days(7)
         if len(recent) > 5:
             risk_patterns.append("Fréquence d'entraînement très élevée (>5/semaine)")
 
         # Manque de variété
-        recent_types = [w.type for w in recent]
-        if len(set(recent_types)) == 1 and len(recent) > 3:
+        if recent.distinct_types() == 1 and len(recent) > 3:
             risk_patterns.append("Manque de variété dans les types d'entraînement")
 
         # Progression trop rapide
         if len(workouts) >= 4:
-            old_distances = [w.distance for w in workouts[-4:-2]]
-            new_distances = [w.distance for w in workouts[-2:]]
+            old_distances = workouts.distance[-4:-2]
+            new_distances = workouts.distance[-2:]
 
-            if sum(new_distances) > sum(old_distances) * 1.3:
+            if np.sum(new_distances) > np.sum(old_distances) * 1.3:
                 risk_patterns.append("Progression du volume trop rapide (>30%)")
 
         # Intensité excessive
-        intense_workouts = len([w for w in recent if w.type == "fractionné"])
+        intense_workouts = recent.type_count(WorkoutType.fractionne)
         if intense_workouts > len(recent) * 0.4:
             risk_patterns.append("Proportion d'entraînements intenses trop élevée")
 
@@ -490,14 +480,13 @@ class WorkoutService:
             ]
         }
 
-    def _calculate_suggested_parameters(self, suggestion: Dict[str, Any], history: List[WorkoutData]) -> Dict[str, Any]:
+    def _calculate_suggested_parameters(self, suggestion: Dict[str, Any], history: WorkoutFrame) -> Dict[str, Any]:
         """Calcul des paramètres suggérés basés sur l'historique"""
         if not history:
             return suggestion
 
         # Calcul de l'allure cible
-        recent_paces = [self._pace_to_seconds(w.pace) for w in history[-5:]]
-        avg_recent_pace = sum(recent_paces) / len(recent_paces)
+        avg_recent_pace = float(np.mean(history.pace_seconds[-5:]))
 
         # Ajustement selon le type suggéré
         if suggestion["recommended_type"] == "récupération":
@@ -547,19 +536,18 @@ class WorkoutService:
 
         return alternatives
 
-    def _generate_workout_precautions(self, recent_workouts: List[WorkoutData]) -> List[str]:
+    def _generate_workout_precautions(self, recent_workouts: WorkoutFrame) -> List[str]:
         """Génération de précautions basées sur l'activité récente"""
         precautions = []
 
         if len(recent_workouts) >= 4:
             precautions.append("Surveillez les signaux de fatigue")
 
-        intense_recent = len([w for w in recent_workouts if w.type == "fractionné"])
+        intense_recent = recent_workouts.type_count(WorkoutType.fractionne)
         if intense_recent >= 2:
             precautions.append("Privilégiez la récupération si fatigue musculaire")
 
-        last_workout = recent_workouts[-1] if recent_workouts else None
-        if last_workout and last_workout.distance > 15:
+        if recent_workouts and recent_workouts.distance[-1] > 15:
             precautions.append("Récupération importante après la longue sortie récente")
 
         precautions.append("Échauffement et étirements essentiels")
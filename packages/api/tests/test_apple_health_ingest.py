@@ -0,0 +1,43 @@
+import zipfile
+
+from benchmarks.bench_gpx_route import build_gpx
+from services.apple_health_ingest import AppleHealthIngestService
+
+WORKOUT = (
+    '<Workout workoutActivityType="HKWorkoutActivityTypeRunning" duration="{minutes}" durationUnit="min" '
+    'totalDistance="{km}" totalDistanceUnit="km" startDate="2024-01-{day:02d} 08:00:00 +0100" '
+    'endDate="2024-01-{day:02d} 09:00:00 +0100">{reference}</Workout>'
+)
+
+
+def build_export(path, days, routes):
+    """Archive d'export avec une course par jour et les traces GPX données {nom: contenu}"""
+    workouts = "".join(
+        WORKOUT.format(
+            minutes=50, km=10, day=day,
+            reference=f'<WorkoutRoute><FileReference path="/workout-routes/ref_{day}.gpx"/></WorkoutRoute>' if day % 2 else ""
+        )
+        for day in days
+    )
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("apple_health_export/export.xml", f'<?xml version="1.0"?><HealthData>{workouts}</HealthData>')
+        for name, content in routes.items():
+            archive.writestr(f"apple_health_export/workout-routes/{name}", content)
+
+
+def test_routes_are_matched_in_file_order_with_a_bounded_window(tmp_path):
+    days = list(range(1, 11))
+    gpx = build_gpx(300)
+    routes = {f"ref_{day}.gpx": gpx for day in days if day % 2}
+    routes.update({f"route_2024-01-{day:02d}_08-00-00_1.gpx": gpx for day in days if not day % 2 and day != 10})
+    routes["route_2024-01-10_08-00-00_1.gpx"] = b"<gpx><trk"
+    routes["route_2023-12-31_08-00-00_1.gpx"] = gpx
+    path = tmp_path / "export.zip"
+    build_export(path, days, routes)
+
+    workouts = list(AppleHealthIngestService().iter_workouts_from_zip(str(path), max_workers=1))
+
+    assert [workout.date[:10] for workout in workouts] == [f"2024-01-{day:02d}" for day in days]
+    # Trace rapprochée par FileReference (jours impairs) ou par date ; trace illisible ignorée
+    assert all(workout.elevation_gain is not None for workout in workouts[:-1])
+    assert workouts[-1].elevation_gain is None
@@ -0,0 +1,35 @@
+import asyncio
+
+from services.kaggle_service import KaggleDataService
+
+
+def test_snapshot_rebuild_waits_for_the_lock_without_blocking_the_loop(tmp_path, monkeypatch):
+    monkeypatch.setenv("BENCHMARK_STORE_DIR", str(tmp_path))
+    holder = KaggleDataService()
+
+    async def scenario():
+        lock = holder.store.writer_lock()
+        lock.__enter__()
+        rebuild = asyncio.create_task(KaggleDataService().get_benchmark_snapshot())
+        # La boucle continue de tourner pendant que le verrou est détenu ailleurs
+        ticks = 0
+        for _ in range(5):
+            await asyncio.sleep(0.02)
+            ticks += 1
+        assert not rebuild.done()
+        lock.__exit__(None, None, None)
+        return ticks, await rebuild
+
+    ticks, snapshot = asyncio.run(scenario())
+    assert ticks == 5
+    assert snapshot.version == 1
+
+
+def test_concurrent_cold_starts_publish_a_single_version(tmp_path, monkeypatch):
+    monkeypatch.setenv("BENCHMARK_STORE_DIR", str(tmp_path))
+
+    async def scenario():
+        return await asyncio.gather(*(KaggleDataService().get_benchmark_snapshot() for _ in range(4)))
+
+    snapshots = asyncio.run(scenario())
+    assert {snapshot.version for snapshot in snapshots} == {1}
@@ -0,0 +1,77 @@
+import asyncio
+import copy
+import logging
+
+import numpy as np
+import pytest
+
+from services.benchmark_tables import BenchmarkTables, parse_race_time
+from services.kaggle_service import KaggleDataService
+
+BENCHMARKS = asyncio.run(KaggleDataService()._load_simulated_benchmark_data())
+
+
+@pytest.fixture(scope="module")
+def tables():
+    return BenchmarkTables.compile(BENCHMARKS)
+
+
+def test_race_times_are_parsed_to_seconds():
+    assert parse_race_time("18:00") == 1080
+    assert parse_race_time("3:15:00") == 11700
+    assert parse_race_time(1500) == 1500.0
+
+
+def test_level_times_map_to_their_percentiles(tables):
+    # 5 km, homme de 25 ans : excellent 15:30, good 18:00, average 22:00, below_average 27:00
+    times = [parse_race_time(value) for value in ("15:30", "18:00", "20:00", "22:00", "27:00")]
+
+    np.testing.assert_allclose(tables.percentiles(5.0, times, 25, "male"), [95.0, 75.0, 62.5, 50.0, 25.0])
+    assert tables.levels(5.0, times, 25, "male") == ["excellent", "good", "average", "average", "below_average"]
+
+
+def test_percentiles_are_extrapolated_within_bounds(tables):
+    percentiles = tables.percentiles(5.0, [parse_race_time("10:00"), parse_race_time("16:45"), parse_race_time("45:00")], 25, "male")
+
+    np.testing.assert_allclose(percentiles, [99.0, 85.0, 1.0])
+
+
+def test_age_bracket_and_gender_lookup(tables):
+    # Même temps (10 km en 44:00) : good pour une femme de 35 ans, entre good et average ailleurs
+    percentiles = tables.percentiles(
+        10.0, parse_race_time("44:00"), [35, 35, 45, 18, 70], ["F", "male", "femme", "female", "homme"]
+    )
+
+    np.testing.assert_allclose(percentiles, [
+        75.0,                            # femme 30-40 : good 44:00
+        75.0 - 25.0 * 5 / 8,             # homme 30-40 : good 39:00, average 47:00
+        95.0 - 20.0 * 5 / 8,             # femme 40-50 : excellent 39:00, good 47:00
+        75.0 - 25.0 * 2 / 9,             # femme de 18 ans : première tranche (20-30), good 42:00, average 51:00
+        95.0 - 20.0 * 6 / 7,             # homme 50+ : excellent 38:00, good 45:00
+    ])
+
+
+def test_unknown_gender_uses_the_average_of_the_tables(tables):
+    # Moyenne homme / femme 20-30 sur 5 km : good (18:00 + 20:30) / 2 = 19:15
+    assert tables.percentiles(5.0, parse_race_time("19:15"), 25, "x")[0] == pytest.approx(75.0)
+    assert tables.percentiles(5.0, parse_race_time("19:15"), 25, [None])[0] == pytest.approx(75.0)
+
+
+def test_other_distances_are_converted_with_riegel(tables):
+    # 8 km ramenés à 10 km : 36:00 * (10 / 8) ** 1.06
+    equivalent = parse_race_time("36:00") * (10 / 8) ** 1.06
+    expected = tables.percentiles(10.0, equivalent, 25, "male")
+
+    np.testing.assert_allclose(tables.percentiles(8.0, parse_race_time("36:00"), 25, "male"), expected)
+
+
+def test_unknown_gender_table_is_skipped_with_a_warning(tables, caplog):
+    benchmarks = copy.deepcopy(BENCHMARKS)
+    benchmarks["running_benchmarks"]["5k_times"]["non_binary"] = {"18-25": {"excellent": "16:00"}}
+
+    with caplog.at_level(logging.WARNING, logger="services.benchmark_tables"):
+        compiled = BenchmarkTables.compile(benchmarks)
+
+    assert "genre inconnu ignoré (non_binary)" in caplog.text
+    assert compiled.age_labels == tables.age_labels
+    np.testing.assert_array_equal(compiled.times, tables.times)
@@ -0,0 +1,133 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from database import connection as connection_module
+from database.connection import DatabaseConnection
+from database.sqlite_store import SQLiteStore, sqlite_path_from_url
+
+DAY = 24 * 3600
+
+
+def connect(monkeypatch, url):
+    monkeypatch.setenv("DATABASE_URL", url)
+    database = DatabaseConnection()
+    assert asyncio.run(database.connect())
+    return database
+
+
+@pytest.fixture(params=["sqlite", "memory"])
+def database(request, tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'runcoach.db'}" if request.param == "sqlite" else "memory://"
+    database = connect(monkeypatch, url)
+    yield database
+    asyncio.run(database.disconnect())
+
+
+def test_sqlite_url_parsing():
+    assert sqlite_path_from_url("sqlite:///./runcoach.db") == "./runcoach.db"
+    assert sqlite_path_from_url("sqlite:///") == ":memory:"
+    assert sqlite_path_from_url("memory://") is None
+
+
+def test_reads_use_a_separate_wal_connection_and_see_only_committed_writes(tmp_path):
+    store = SQLiteStore(str(tmp_path / "runcoach.db"))
+    try:
+        assert store.reader is not store.writer
+        assert store.reader.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+        with store._transaction():
+            store.put_user("u1", {"name": "Alice"}, time.time())
+            # Écriture en cours : la lecture n'est pas bloquée et voit le dernier état validé
+            assert store.get_user("u1") is None
+        assert store.get_user("u1") == {"name": "Alice"}
+    finally:
+        store.close()
+
+    memory = SQLiteStore(":memory:")
+    assert memory.reader is memory.writer
+    memory.close()
+
+
+def test_memory_url_falls_back_to_the_in_process_store(monkeypatch):
+    database = connect(monkeypatch, "memory://")
+
+    async def scenario():
+        await database.store_user_data("u1", {"name": "Alice"})
+        await database.store_workout_analysis("w1", {"score": 80}, user_id="u1")
+        await database.store_performance_prediction("u1", {"10k": "45:00"})
+        return (
+            await database.get_user_data("u1"),
+            await database.get_workout_analysis("w1"),
+            await database.get_user_predictions("u1"),
+            await database.get_database_stats(),
+            await database.migrate_to_persistent_storage(),
+        )
+
+    user, analysis, predictions, stats, migrated = asyncio.run(scenario())
+
+    assert database.connection is None
+    assert user == {"name": "Alice"} and analysis == {"score": 80} and predictions == [{"10k": "45:00"}]
+    assert stats["database_type"] == "memory_store"
+    assert stats["analyses_count"] == 1 and stats["predictions_count"] == 1
+    assert not migrated
+
+
+def test_memory_data_is_migrated_to_sqlite(tmp_path, monkeypatch):
+    database = connect(monkeypatch, f"sqlite:///{tmp_path / 'runcoach.db'}")
+    created_at = time.time() - 3600
+    database.memory_store["users"]["u1"] = {"name": "Alice"}
+    database.memory_store["analyses"]["w1"] = {"analysis": {"score": 80}, "user_id": "u1", "created_at": created_at}
+    database.memory_store["predictions"]["u1"] = [
+        {"prediction": {"10k": "45:00"}, "created_at": created_at},
+        {"prediction": {"10k": "44:30"}, "created_at": created_at + 60},
+    ]
+    database.memory_store["training_loads"]["u1"] = {"workout_count": 3}
+
+    async def scenario():
+        migrated = await database.migrate_to_persistent_storage()
+        stats = await database.get_database_stats()
+        cleaned = await database.cleanup_old_data(max_age_hours=24)
+        return migrated, stats, cleaned, await database.get_user_predictions("u1")
+
+    migrated, stats, cleaned, predictions = asyncio.run(scenario())
+
+    assert migrated
+    assert all(not table for table in database.memory_store.values())
+    assert stats["database_type"] == "sqlite"
+    assert (stats["users_count"], stats["analyses_count"], stats["predictions_count"], stats["training_loads_count"]) == (1, 1, 2, 1)
+    # Les dates de création d'origine sont conservées
+    assert cleaned == 0
+    assert predictions == [{"10k": "45:00"}, {"10k": "44:30"}]
+    assert database.connection.get_analysis("w1") == {"score": 80}
+    assert database.connection.get_training_load("u1") == {"workout_count": 3}
+    asyncio.run(database.disconnect())
+
+
+def test_cleanup_removes_entries_older_than_the_wall_clock_cutoff(database, monkeypatch):
+    now = time.time()
+
+    async def store(created_at, suffix):
+        monkeypatch.setattr(connection_module, "time", SimpleNamespace(time=lambda: created_at))
+        await database.store_workout_analysis(f"w{suffix}", {"score": 80}, user_id="u1")
+        await database.store_performance_prediction("u1", {"10k": suffix})
+
+    async def scenario():
+        await store(now - 2 * DAY, "old")
+        await store(now - 3600, "recent")
+        monkeypatch.setattr(connection_module, "time", time)
+        cleaned = await database.cleanup_old_data(max_age_hours=24)
+        return (
+            cleaned,
+            await database.get_workout_analysis("wold"),
+            await database.get_workout_analysis("wrecent"),
+            await database.get_user_predictions("u1"),
+        )
+
+    cleaned, old, recent, predictions = asyncio.run(scenario())
+
+    assert cleaned == 2
+    assert old is None and recent == {"score": 80}
+    assert predictions == [{"10k": "recent"}]
@@ -0,0 +1,97 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.dataset_profile import PERCENTILES, DatasetProfile, RunningMoments, TDigest
+from services.kaggle_service import KaggleDataService
+
+MARATHON_DISTANCES = np.array([5.0, 10.0, 21.0975, 42.195])
+
+
+def results(rows, seed=7):
+    """Résultats synthétiques : allure continue, distances standard, âge entier, genre"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "pace": rng.lognormal(np.log(330), 0.18, rows),
+        "distance": rng.choice(MARATHON_DISTANCES, rows, p=[0.4, 0.3, 0.2, 0.1]),
+        "age": rng.integers(18, 80, rows).astype(float),
+        "gender": rng.choice(["F", "M"], rows),
+    })
+
+
+def profile(df):
+    part = DatasetProfile()
+    part.update({name: df[name].to_numpy(dtype=object if name == "gender" else np.float64) for name in df.columns})
+    return part
+
+
+def merged_profile(df, parts):
+    merged = DatasetProfile()
+    for chunk in np.array_split(np.arange(len(df)), parts):
+        merged.merge(profile(df.iloc[chunk]))
+    return merged
+
+
+def test_split_then_merged_quantiles_match_numpy():
+    df = results(100_000)
+    digest = merged_profile(df, 4).columns["pace"].digest
+    paces = np.sort(df["pace"].to_numpy())
+
+    estimates = digest.quantile(PERCENTILES)
+    # Erreur de rang bornée (t-digest, compression 200)
+    ranks = np.searchsorted(paces, estimates) / len(paces)
+    np.testing.assert_allclose(ranks, PERCENTILES, atol=2e-3)
+    np.testing.assert_allclose(estimates, np.quantile(paces, PERCENTILES), rtol=2e-3)
+    assert digest.means.shape[0] <= digest.compression
+
+
+def test_quantiles_are_exact_for_discrete_values():
+    df = results(50_000)
+    digest = TDigest()
+    for part in np.array_split(df["distance"].to_numpy(), 5):
+        chunk = TDigest()
+        chunk.update(part)
+        digest.merge(chunk)
+    quantiles = (0.0, 0.1, 0.25, 0.5, 0.6, 0.75, 0.9, 0.95, 1.0)
+
+    np.testing.assert_allclose(digest.quantile(quantiles), np.quantile(df["distance"], quantiles), rtol=1e-12)
+
+
+def test_merged_moments_match_pandas():
+    df = results(30_000)
+    moments = RunningMoments()
+    for part in np.array_split(df["pace"].to_numpy(), 7):
+        chunk = RunningMoments()
+        chunk.update(part)
+        moments.merge(chunk)
+
+    assert moments.count == len(df)
+    assert moments.mean == pytest.approx(df["pace"].mean(), rel=1e-12)
+    assert moments.std == pytest.approx(df["pace"].std(), rel=1e-9)
+    assert (moments.minimum, moments.maximum) == (df["pace"].min(), df["pace"].max())
+
+    by_gender = merged_profile(df, 3).result()["demographic_analysis"]["pace_by_gender"]
+    expected = df.groupby("gender")["pace"].mean().to_dict()
+    assert by_gender == pytest.approx(expected, rel=1e-12)
+
+
+def test_files_are_processed_in_streaming_mode(tmp_path, monkeypatch):
+    df = results(20_000)
+    path = tmp_path / "results.csv"
+    df.to_csv(path, index=False)
+    monkeypatch.setenv("DATASET_CHUNK_ROWS", "3000")
+    service = KaggleDataService()
+
+    streamed = asyncio.run(service.process_running_dataset(str(path), max_workers=1))
+    in_memory = asyncio.run(service.process_running_dataset(df))
+
+    assert streamed["rows"] == len(df)
+    for name in ("pace_statistics", "distance_statistics"):
+        assert streamed[name]["mean"] == pytest.approx(in_memory[name]["mean"], rel=1e-9)
+        assert streamed[name]["std"] == pytest.approx(in_memory[name]["std"], rel=1e-9)
+    assert streamed["distance_statistics"]["percentiles"] == pytest.approx(in_memory["distance_statistics"]["percentiles"])
+    demographics = streamed["demographic_analysis"]
+    assert demographics["age_distribution"] == {str(k): v for k, v in in_memory["demographic_analysis"]["age_distribution"].items()}
+    assert demographics["gender_distribution"] == in_memory["demographic_analysis"]["gender_distribution"]
@@ -0,0 +1,59 @@
+import asyncio
+
+from services.execution import ExecutionLayer
+
+
+async def _uses_default_executor():
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, sum, [1, 2, 3])
+
+
+def test_shutdown_closes_worker_loops_and_their_default_executors():
+    execution = ExecutionLayer(mode="thread", max_workers=2)
+
+    async def scenario():
+        return await asyncio.gather(*(execution.run(_uses_default_executor) for _ in range(4)))
+
+    assert asyncio.run(scenario()) == [6, 6, 6, 6]
+    loops = list(execution.pools["analytics"]._loops)
+    assert loops
+
+    execution.shutdown()
+    assert all(loop.is_closed() for loop in loops)
+    assert all(loop._default_executor is None for loop in loops)
+
+
+def test_model_endpoints_report_the_ml_worker_state():
+    from fastapi.testclient import TestClient
+    from main import app
+
+    client = TestClient(app)
+    assert "worker_pid" in client.get("/models").json()
+    assert "worker_pid" in client.get("/metrics/ml").json()
+
+
+def test_batch_body_is_decoded_on_the_execution_pools():
+    from fastapi.testclient import TestClient
+    from main import app, execution
+    from models.workout_codec import decode_batch_request
+
+    client = TestClient(app)
+    submitted = execution.pools["analytics"].submitted
+    response = client.post("/batch/analyze", json={"athletes": []})
+    assert response.status_code == 200
+    assert execution.pools["analytics"].submitted == submitted + 1
+
+    invalid = client.post("/batch/analyze", json={"athletes": [{"workouts": []}]})
+    assert invalid.status_code == 422
+    assert invalid.json()["detail"][0]["loc"][-1] == "athlete_id"
+    assert client.post("/batch/analyze", content=b"\x80", headers={"Content-Type": "application/msgpack"}).status_code == 415
+    assert "requestBody" in app.openapi()["paths"]["/batch/analyze"]["post"]
+
+    # Décodeur transmissible à un pool de processus (EXECUTION_MODE=process)
+    processes = ExecutionLayer(mode="process", max_workers=1)
+    try:
+        body = b'{"athletes": [{"athlete_id": "a1", "workouts": []}]}'
+        decoded = asyncio.run(processes.run(decode_batch_request, body, "application/json"))
+    finally:
+        processes.shutdown()
+    assert decoded.athletes[0].athlete_id == "a1"
@@ -0,0 +1,45 @@
+import warnings
+
+import numpy as np
+
+from services.gpx_route import GpxTrack
+
+POINTS = (
+    '<trkpt lat="48.8500000" lon="2.3500000"><ele>50.0</ele><time>{first}</time></trkpt>'
+    '<trkpt lon="2.3510000" lat="48.8510000"><ele>52.0</ele><time>{second}</time></trkpt>'
+)
+
+
+def build_gpx(first="2024-01-15T08:00:00Z", second="2024-01-15T08:05:00Z", extra=""):
+    return (
+        '<?xml version="1.0"?><gpx version="1.1" xmlns="http://www.topografix.com/GPX/1/1">'
+        '<metadata><bounds minlat="48.0" minlon="2.0" maxlat="49.0" maxlon="3.0"/></metadata>'
+        f'<trk><trkseg>{POINTS.format(first=first, second=second)}</trkseg></trk>{extra}</gpx>'
+    ).encode()
+
+
+def test_coordinates_of_other_elements_are_ignored():
+    route = '<rte><rtept lat="11.0" lon="21.0"/></rte>'
+    # Point de passage complet : autant de lat/ele/time que de points, le chemin rapide est emprunté
+    waypoint = '<wpt lat="10.0" lon="20.0"><ele>1.0</ele><time>2024-01-15T09:00:00Z</time></wpt>'
+    for data in (build_gpx(extra=route), build_gpx(extra=waypoint)):
+        track = GpxTrack.from_bytes(data)
+
+        np.testing.assert_array_equal(track.lat, [48.85, 48.851])
+        np.testing.assert_array_equal(track.lon, [2.35, 2.351])
+
+
+def test_time_offsets_are_converted_to_utc_without_warning():
+    expected = np.array(["2024-01-15T06:00:00", "2024-01-15T13:05:00"], dtype="datetime64[ms]")
+    offsets = build_gpx("2024-01-15T08:00:00+02:00", "2024-01-15T08:05:00-05:00")
+    # Altitude manquante : passage par l'arbre XML
+    partial = offsets.replace(b"<ele>52.0</ele>", b"")
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        for data in (offsets, partial):
+            np.testing.assert_array_equal(GpxTrack.from_bytes(data).time, expected)
+        np.testing.assert_array_equal(
+            GpxTrack.from_bytes(build_gpx()).time,
+            np.array(["2024-01-15T08:00:00", "2024-01-15T08:05:00"], dtype="datetime64[ms]")
+        )
@@ -0,0 +1,68 @@
+import os
+
+import numpy as np
+import pytest
+
+from services.model_registry import CURRENT_FILE, ModelRegistry
+
+
+def coefficients(value):
+    return {"coef": np.full(8, value, dtype=np.float64)}
+
+
+def test_publish_activate_and_load_switch_the_current_version(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    assert registry.load().version is None
+
+    first = registry.publish({"5k_model": coefficients(1.0)}, scalers={"5k_model": coefficients(0.5)}, metadata={"rows": 10})
+    second = registry.publish({"5k_model": coefficients(2.0), "10k_model": coefficients(3.0)}, activate=False)
+
+    assert (first, second) == ("v0001", "v0002")
+    assert registry.versions() == [first, second]
+    assert registry.current_version() == first
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+    loaded = registry.load()
+    assert loaded.version == first and loaded.metadata["rows"] == 10
+    assert sorted(loaded.models) == ["5k_model"] and sorted(loaded.scalers) == ["5k_model"]
+    # Chargement en mémoire partagée : les tableaux restent des pages du fichier
+    assert isinstance(loaded.models["5k_model"]["coef"], np.memmap)
+    np.testing.assert_array_equal(loaded.models["5k_model"]["coef"], 1.0)
+    assert set(loaded.load_stats["5k_model"]) == {"load_ms", "rss_bytes", "file_bytes"}
+
+    registry.activate(second)
+    with open(tmp_path / CURRENT_FILE, encoding="utf-8") as current:
+        assert current.read() == second
+    switched = registry.load()
+    assert switched.version == second and sorted(switched.models) == ["10k_model", "5k_model"]
+    np.testing.assert_array_equal(switched.models["5k_model"]["coef"], 2.0)
+    # Une version précise reste chargeable après la bascule
+    assert registry.load(first).version == first
+
+    with pytest.raises(ValueError):
+        registry.activate("v0009")
+    with pytest.raises(ValueError):
+        registry.publish({})
+    assert registry.current_version() == second
+
+
+def test_predictor_follows_the_current_version(tmp_path, monkeypatch):
+    from services.ml_predictor import MLPredictorService
+
+    monkeypatch.setenv("MODEL_REGISTRY_DIR", str(tmp_path))
+    monkeypatch.setenv("MODEL_REGISTRY_POLL", "0")
+    registry = ModelRegistry(str(tmp_path))
+    first = registry.publish({"5k_model": coefficients(1.0)})
+    predictor = MLPredictorService()
+
+    predictor._refresh_models()
+    assert predictor.model_set.version == first
+
+    second = registry.publish({"5k_model": coefficients(2.0)})
+    predictor._refresh_models()
+    assert predictor.model_set.version == second
+    np.testing.assert_array_equal(predictor.models["5k_model"]["coef"], 2.0)
+
+    registry.activate(first)
+    predictor._refresh_models()
+    assert predictor.model_status()["version"] == predictor.model_status()["active_version"] == first
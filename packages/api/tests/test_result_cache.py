@@ -0,0 +1,52 @@
+import asyncio
+import json
+import os
+import time
+
+from services.result_cache import ResultCache
+
+
+def compute(value):
+    async def run():
+        return value
+    return run
+
+
+def test_disk_tier_survives_a_restart(tmp_path):
+    cache = ResultCache(disk_dir=str(tmp_path))
+    asyncio.run(cache.get_or_compute("k1", compute({"score": 1})))
+
+    restarted = ResultCache(disk_dir=str(tmp_path))
+    assert asyncio.run(restarted.get_or_compute("k1", compute({"score": 2}))) == {"score": 1}
+    assert restarted.disk_hits == 1
+
+
+def test_disk_tier_is_bounded_and_swept(tmp_path):
+    cache = ResultCache(disk_dir=str(tmp_path), disk_max_bytes=2000)
+    payload = {"notes": "x" * 400}
+
+    async def fill():
+        for index in range(20):
+            await cache.get_or_compute(f"k{index}", compute(payload))
+            time.sleep(0.01)
+
+    asyncio.run(fill())
+    files = sorted(os.listdir(tmp_path))
+    assert sum(os.path.getsize(tmp_path / name) for name in files) <= 2000
+    assert cache.disk_evictions > 0
+    # Les entrées les plus récentes sont conservées
+    assert "k19.json" in files
+
+    expired = tmp_path / "expired.json"
+    expired.write_text(json.dumps({"expires_at": time.time() - 1, "value": 1}))
+    os.utime(expired, (time.time() - 1, time.time() - 1))
+    cache.sweep_disk()
+    assert not expired.exists()
+
+
+def test_entry_without_expiration_is_a_miss(tmp_path):
+    (tmp_path / "k1.json").write_text(json.dumps({"value": {"score": 1}}))
+    cache = ResultCache(disk_dir=str(tmp_path))
+
+    assert asyncio.run(cache.get_or_compute("k1", compute({"score": 2}))) == {"score": 2}
+    assert cache.misses == 1
@@ -0,0 +1,112 @@
+import asyncio
+
+import numpy as np
+
+from models.training_load import TrainingLoadState
+from models.workout_frame import WorkoutFrame
+from services import training_load as training_load_module
+from services.training_load import TrainingLoadService
+
+
+def frame(days):
+    """Une séance d'endurance de 10 km par jour indiqué (mars 2024)"""
+    count = len(days)
+    return WorkoutFrame.from_columns({
+        "id": [f"w{day}" for day in days],
+        "date": [f"2024-03-{day:02d}T07:00:00" for day in days],
+        "type": ["endurance"] * count,
+        "duration": [50] * count,
+        "distance": [10.0] * count,
+        "pace": ["5:00"] * count,
+    })
+
+
+def test_full_history_with_a_late_workout_rebuilds_the_state():
+    state = TrainingLoadState.from_frame(frame([1, 3, 5]), "a1")
+    history = frame([1, 2, 3, 5])
+
+    assert state.is_backfill(history)
+    assert not state.is_backfill(frame([1, 3, 5, 6]))
+    assert not state.is_backfill(frame([2, 6]))
+
+
+def test_from_dict_does_not_share_lists_with_stored_data():
+    stored = TrainingLoadState.from_frame(frame([1, 3, 5]), "a1").to_dict()
+    state = TrainingLoadState.from_dict(stored)
+    state.extend(frame([6, 7]))
+
+    assert len(stored["window"]) == 3
+    assert stored["last_ids"] == ["w5"]
+
+
+class MemoryDatabase:
+    def __init__(self):
+        self.states = {}
+
+    async def get_training_load(self, athlete_id):
+        return self.states.get(athlete_id)
+
+    async def update_training_load(self, athlete_id, update):
+        state, result = update(self.states.get(athlete_id))
+        if state is not None:
+            self.states[athlete_id] = state
+        return result
+
+
+def test_append_workouts_reports_ignored_workouts_and_rebuilds_on_backfill(monkeypatch):
+    database = MemoryDatabase()
+
+    async def get_database_connection():
+        return database
+
+    monkeypatch.setattr(training_load_module, "get_database_connection", get_database_connection)
+    service = TrainingLoadService()
+
+    async def scenario():
+        await service.append_workouts("a1", frame([1, 3, 5]))
+        _, resend = await service.append_workouts("a1", frame([1, 3, 5, 6]))
+        _, partial = await service.append_workouts("a1", frame([4]))
+        state, backfill = await service.append_workouts("a1", frame([1, 2, 3, 5, 6]))
+        return resend, partial, state, backfill
+
+    resend, partial, state, backfill = asyncio.run(scenario())
+    expected = TrainingLoadState.from_frame(frame([1, 2, 3, 5, 6]), "a1")
+
+    assert resend == {"added": 1, "ignored": 3, "rebuilt": False}
+    assert partial == {"added": 0, "ignored": 1, "rebuilt": False}
+    assert backfill == {"added": 5, "ignored": 0, "rebuilt": True}
+    assert np.isclose(state.chronic_load, expected.chronic_load)
+    assert state.workout_count == 5
+
+
+def test_concurrent_appends_from_two_workers_are_not_lost(tmp_path, monkeypatch):
+    from database.connection import DatabaseConnection
+
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'loads.db'}")
+    workers = [DatabaseConnection(), DatabaseConnection()]
+
+    async def scenario():
+        for database in workers:
+            await database.connect()
+        # Deux connexions distinctes sur le même fichier, comme deux workers uvicorn
+        connections = iter(workers * 10)
+
+        async def get_database_connection():
+            return next(connections)
+
+        monkeypatch.setattr(training_load_module, "get_database_connection", get_database_connection)
+        service = TrainingLoadService()
+        columns = {
+            "id": ["s"], "date": ["2024-03-01T07:00:00"], "type": ["endurance"],
+            "duration": [50], "distance": [10.0], "pace": ["5:00"]
+        }
+        # Même date, identifiants distincts : chaque séance est nouvelle quel que soit l'ordre d'exécution
+        sessions = [WorkoutFrame.from_columns({**columns, "id": [f"s{index}"]}) for index in range(10)]
+        await asyncio.gather(*(service.append_workouts("a1", session) for session in sessions))
+        state = await service.get_state("a1")
+        for database in workers:
+            await database.disconnect()
+        return state
+
+    state = asyncio.run(scenario())
+    assert state.workout_count == 10
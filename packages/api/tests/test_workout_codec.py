@@ -0,0 +1,119 @@
+import json
+import warnings
+
+import numpy as np
+import pytest
+
+from models.workout_codec import (
+    CONTENT_TYPE_ARROW, CONTENT_TYPE_COLUMNAR_JSON, CONTENT_TYPE_JSON, CONTENT_TYPE_MSGPACK,
+    decode_workout_frame
+)
+
+WORKOUTS = [
+    {"id": "w1", "date": "2024-03-01T07:30:00", "type": "endurance", "duration": 62, "distance": 12.4, "pace": "5:00", "heart_rate": 148},
+    {"id": "w2", "date": "2024-03-03T18:00:00", "type": "fractionné", "duration": 45, "distance": 9.0, "pace": "5:00", "heart_rate": None},
+    {"id": "w3", "date": "2024-03-05T06:45:00", "type": "récupération", "duration": 35, "distance": 5.2, "pace": "6:44", "heart_rate": 132},
+]
+
+ENCODINGS = [CONTENT_TYPE_JSON, CONTENT_TYPE_COLUMNAR_JSON, CONTENT_TYPE_MSGPACK, CONTENT_TYPE_ARROW]
+
+
+def _columns(workouts):
+    return {name: [workout[name] for workout in workouts] for name in workouts[0]}
+
+
+def encode(workouts, content_type):
+    """Même historique dans chacun des formats de corps de requête acceptés"""
+    if content_type == CONTENT_TYPE_JSON:
+        return json.dumps(workouts).encode("utf-8")
+    if content_type == CONTENT_TYPE_COLUMNAR_JSON:
+        return json.dumps(_columns(workouts)).encode("utf-8")
+    if content_type == CONTENT_TYPE_MSGPACK:
+        msgpack = pytest.importorskip("msgpack")
+        return msgpack.packb(_columns(workouts))
+    pa = pytest.importorskip("pyarrow")
+    table = pa.table(_columns(workouts))
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def decode_error(workouts, content_type):
+    with pytest.raises(ValueError) as error:
+        decode_workout_frame(encode(workouts, content_type), content_type)
+    return str(error.value)
+
+
+@pytest.mark.parametrize("content_type", ENCODINGS[1:])
+def test_all_encodings_decode_to_the_same_frame(content_type):
+    expected = decode_workout_frame(encode(WORKOUTS, CONTENT_TYPE_JSON), CONTENT_TYPE_JSON)
+    frame = decode_workout_frame(encode(WORKOUTS, content_type), content_type)
+
+    assert list(frame.ids) == list(expected.ids)
+    for name in ("distance", "duration", "pace_seconds", "heart_rate", "type_code", "timestamp"):
+        np.testing.assert_array_equal(getattr(frame, name), getattr(expected, name))
+
+
+@pytest.mark.parametrize("field", ["distance", "duration"])
+def test_non_positive_values_are_rejected_identically(field):
+    workouts = [dict(WORKOUTS[0]), *WORKOUTS[1:]]
+    workouts[0][field] = 0
+    errors = {content_type: decode_error(workouts, content_type) for content_type in ENCODINGS}
+
+    assert set(errors.values()) == {"Distance et durée doivent être strictement positives"}
+
+
+@pytest.mark.parametrize("content_type", [CONTENT_TYPE_COLUMNAR_JSON, CONTENT_TYPE_MSGPACK])
+def test_scalar_column_is_a_validation_error(content_type):
+    columns = _columns(WORKOUTS)
+    columns["id"] = "w1"
+    body = json.dumps(columns).encode("utf-8") if content_type == CONTENT_TYPE_COLUMNAR_JSON else pytest.importorskip("msgpack").packb(columns)
+
+    with pytest.raises(ValueError, match="Colonne id: tableau de valeurs attendu"):
+        decode_workout_frame(body, content_type)
+
+
+def test_column_length_mismatch_is_reported():
+    columns = _columns(WORKOUTS)
+    columns["distance"] = columns["distance"][:2]
+
+    with pytest.raises(ValueError, match="Colonne distance: 2 valeurs au lieu de 3"):
+        decode_workout_frame(json.dumps(columns).encode("utf-8"), CONTENT_TYPE_COLUMNAR_JSON)
+
+
+@pytest.mark.parametrize("content_type", ENCODINGS)
+def test_invalid_body_is_a_422_in_every_encoding(content_type):
+    from fastapi.testclient import TestClient
+    from main import app
+
+    workouts = [dict(WORKOUTS[0]), *WORKOUTS[1:]]
+    workouts[0]["distance"] = 0
+    response = TestClient(app).post(
+        "/analyze/workout", content=encode(workouts, content_type), headers={"Content-Type": content_type}
+    )
+
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Distance et durée doivent être strictement positives"
+
+
+def test_canonical_fields_are_computed_and_not_accepted_as_input():
+    from models.workout import WorkoutData
+
+    workout = WorkoutData(**{**WORKOUTS[0], "pace_seconds": 1, "timestamp": "1999-01-01T00:00:00"})
+    schema = WorkoutData.model_json_schema()
+
+    assert workout.pace_seconds == 300
+    assert workout.timestamp.year == 2024
+    assert "pace_seconds" not in schema["properties"] and "timestamp" not in schema["properties"]
+
+
+@pytest.mark.parametrize("separator", ["T", " "])
+def test_offset_dates_are_converted_to_utc_with_either_separator(separator):
+    workouts = [{**WORKOUTS[0], "date": f"2024-03-01{separator}07:30:00+02:00"}, *WORKOUTS[1:]]
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        frame = decode_workout_frame(encode(workouts, CONTENT_TYPE_COLUMNAR_JSON), CONTENT_TYPE_COLUMNAR_JSON)
+
+    assert frame.timestamp[0] == np.datetime64("2024-03-01T05:30:00", "s")